@@ -0,0 +1,9 @@
+"""Benchmarks for Smart Lux Control.
+
+Times the regression and filtering hot paths and sample persistence at
+growing sample counts, with tracemalloc memory figures, and writes the
+results as JSON so releases can be compared:
+
+    python -m benchmarks --output bench.json
+    python -m benchmarks --compare bench.json
+"""
@@ -0,0 +1,95 @@
+"""Command line entry point: python -m benchmarks."""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from . import hot_paths, storage
+from .measure import compare, max_rss_kb
+
+DEFAULT_SIZES = "100,1000,10000,100000,1000000"
+SUITES = {"hot_paths": hot_paths.async_run, "storage": storage.async_run}
+
+
+async def async_main(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the selected suites at every size."""
+    results: List[Dict[str, Any]] = []
+    for size in args.sizes:
+        for suite in args.suites:
+            for measurement in await SUITES[suite](size, args.repeat, args.seed):
+                results.append(measurement.as_dict())
+                print(
+                    f"{measurement.name:22} {size:>9} samples  "
+                    f"median {measurement.median_seconds * 1e3:11.3f} ms  "
+                    f"peak {measurement.peak_bytes / 1024:10.1f} KiB  "
+                    f"retained {measurement.retained_bytes / 1024:9.1f} KiB",
+                    file=sys.stderr,
+                )
+    return {
+        "component_version": _component_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "repeat": args.repeat,
+        "max_rss_kb": max_rss_kb(),
+        "results": results,
+    }
+
+
+def _component_version() -> str:
+    """Get the version from the component's manifest."""
+    from pathlib import Path
+
+    manifest = Path(__file__).resolve().parent.parent / "custom_components" / "smart_lux_control" / "manifest.json"
+    return json.loads(manifest.read_text(encoding="utf-8")).get("version", "unknown")
+
+
+def main() -> None:
+    """Run the benchmarks, write the JSON report and optionally compare it with a baseline."""
+    parser = argparse.ArgumentParser(description="Benchmark Smart Lux Control hot paths and storage.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma separated sample counts")
+    parser.add_argument("--suites", default=",".join(SUITES), help="comma separated: hot_paths, storage")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="baseline JSON report to compare median times with")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in args.sizes.split(",") if size]
+    args.suites = [suite for suite in args.suites.split(",") if suite]
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("custom_components.smart_lux_control").setLevel(logging.ERROR)
+    report = asyncio.run(async_main(args))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        rows = compare(baseline["results"], report["results"], args.threshold)
+        for row in rows:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(
+                f"{row['name']:22} {row['samples']:>9} samples  x{row['ratio']:.2f}{flag}",
+                file=sys.stderr,
+            )
+        if any(row["regression"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
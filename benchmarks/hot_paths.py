@@ -0,0 +1,75 @@
+"""Benchmarks for the regression and filtering hot paths."""
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, List
+
+from simulation.clock import WallClock
+from simulation.hass import SimConfigEntry, SimHass, patch_homeassistant
+
+from .measure import Measurement, async_measure
+
+HISTORY_SECONDS = 7 * 86400  # Sample timestamps are spread over the last week
+
+
+def _fill(coordinator: Any, samples: int, now_ts: float, seed: int) -> None:
+    """Fill the coordinator with noisy linear samples (average error above the adaptive learning trigger)."""
+    rng = random.Random(seed)
+    for index in range(samples):
+        brightness = rng.uniform(1, 255)
+        lux = min(10000.0, max(0.0, 1.8 * brightness + 20 + rng.gauss(0, 30)))
+        epoch = now_ts - HISTORY_SECONDS * (1 - index / samples)
+        coordinator._append_sample(brightness, lux, epoch)
+
+
+async def async_run(samples: int, repeat: int, seed: int = 0) -> List[Measurement]:
+    """Benchmark the hot paths of one coordinator holding samples samples."""
+    from custom_components.smart_lux_control import SmartLuxCoordinator
+
+    loop = asyncio.get_running_loop()
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = SimHass(loop, WallClock(loop, datetime.now(timezone.utc)), config_dir)
+        with patch_homeassistant(hass):
+            coordinator = SmartLuxCoordinator(hass, SimConfigEntry({
+                "room_name": "bench",
+                "light_entity": ["light.bench"],
+                "lux_sensor": "sensor.bench_lux",
+                "motion_sensor": "binary_sensor.bench_motion",
+                "max_samples": samples,
+            }))
+            now_ts = hass.clock.utcnow().timestamp()
+            _fill(coordinator, samples, now_ts, seed)
+
+            # Inputs of _weighted_regression as async_adaptive_learning builds them
+            brightness_vals, lux_vals = coordinator._filter_samples()
+            epochs = coordinator.samples.epoch_view()
+            weights = [math.exp(-(now_ts - epochs[i]) / 3600 / 24.0) for i in range(len(brightness_vals))]
+
+            async def calculate_regression() -> None:
+                await coordinator.async_calculate_regression()
+
+            async def filter_samples() -> None:
+                coordinator._filter_samples()
+
+            async def weighted_regression() -> None:
+                coordinator._weighted_regression(brightness_vals, lux_vals, weights)
+
+            async def adaptive_learning() -> None:
+                # Every call changes the model version, so model_stats is recomputed each time
+                await coordinator.async_adaptive_learning()
+
+            results = []
+            for name, call in (
+                ("calculate_regression", calculate_regression),
+                ("filter_samples", filter_samples),
+                ("weighted_regression", weighted_regression),
+                ("adaptive_learning", adaptive_learning),
+            ):
+                results.append(await async_measure(name, samples, call, repeat))
+
+            await hass.async_cancel_tasks()
+            return results
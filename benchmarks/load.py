@@ -0,0 +1,322 @@
+"""Scale and event-storm load test: many rooms on one Home Assistant stand-in.
+
+Sets up N rooms (coordinator plus sensor and switch entities) on a real
+event loop, injects motion, lux and manual light events at the given
+rates and measures event-loop lag, setup time, memory per room and
+motion-to-light latency:
+
+    python -m benchmarks.load --rooms 1,10,100,500 --duration 20 --output load.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from simulation.clock import WallClock
+from simulation.devices import SimLight, register_light_services
+from simulation.entities import async_setup_entities, patch_platforms
+from simulation.hass import SimConfigEntry, SimEvent, SimHass, SimServiceCall, patch_homeassistant
+from simulation.runner import summarize
+
+from .__main__ import _component_version
+
+TICK_SECONDS = 0.02  # Event injection granularity
+LAG_PROBE_SECONDS = 0.05  # Event-loop lag probe interval
+LIGHTS_PER_ROOM = 3
+ROOM_CONFIG = {"keep_on_minutes": 1}  # Rooms go dark again within a run, so motion latency is sampled often
+
+
+class Room:
+    """Load-test room: simulated lights, ambient light and the motion in flight."""
+
+    __slots__ = ("index", "lights", "ambient", "motion", "motion_at", "commanded")
+
+    def __init__(self, index: int, rng: random.Random, light_latency: float) -> None:
+        """Initialize the room."""
+        self.index = index
+        self.lights = [
+            SimLight(f"light.load_{index}_{light}", rng.uniform(100, 250), latency=light_latency)
+            for light in range(LIGHTS_PER_ROOM)
+        ]
+        self.ambient = rng.uniform(0, 120)
+        self.motion = False
+        self.motion_at: Optional[float] = None  # Motion started in a dark room, light not on yet
+        self.commanded = False  # A turn_on was sent since motion_at
+
+    @property
+    def name(self) -> str:
+        """Get the room name."""
+        return f"load_{self.index}"
+
+    @property
+    def lit(self) -> bool:
+        """Check if any light is on."""
+        return any(light.brightness for light in self.lights)
+
+    def lux(self, now: float, rng: random.Random) -> float:
+        """Get a noisy lux reading for the room."""
+        seen = self.ambient + sum(light.lux_at(now) for light in self.lights)
+        return max(0.0, seen + rng.gauss(0, 2 + 0.02 * seen))
+
+
+class LoadReport(NamedTuple):
+    """Result of one load-test run."""
+
+    rooms: int
+    entities_per_room: float
+    setup_seconds: float
+    setup_ms_per_room: Dict[str, Optional[float]]
+    rss_bytes_per_room: Optional[float]
+    blocks_per_room: float  # Python memory blocks allocated per room during setup
+    duration: float
+    events: Dict[str, int]
+    events_per_second: float
+    loop_lag_ms: Dict[str, Optional[float]]
+    motion_to_command_ms: Dict[str, Optional[float]]
+    motion_to_light_ms: Dict[str, Optional[float]]
+    service_calls: int
+    lux_received: int
+    lux_handled: int
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the report as a JSON-friendly dict."""
+        return self._asdict()
+
+
+def _rss_bytes() -> Optional[int]:
+    """Get the current resident set size, None where /proc is not available."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+async def async_run_load(
+    rooms: int,
+    duration: float,
+    lux_rate: float,
+    motion_rate: float,
+    light_rate: float,
+    light_latency: float,
+    seed: int = 0,
+) -> LoadReport:
+    """Set up rooms, inject events for duration seconds and report.
+
+    Rates are per room: lux readings per second, motion changes and manual
+    light changes per minute.
+    """
+    from custom_components.smart_lux_control import SmartLuxCoordinator
+    from custom_components.smart_lux_control.const import DOMAIN
+
+    loop = asyncio.get_running_loop()
+    rng = random.Random(seed)
+    room_list = [Room(index, rng, light_latency) for index in range(rooms)]
+    room_of_light = {light.entity_id: room for room in room_list for light in room.lights}
+    motion_to_command: List[float] = []
+    motion_to_light: List[float] = []
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        clock = WallClock(loop, datetime.now(timezone.utc) - timedelta(seconds=loop.time()))
+        hass = SimHass(loop, clock, config_dir)
+        with patch_homeassistant(hass), patch_platforms(hass):
+            register_light_services(hass, [light for room in room_list for light in room.lights])
+            for room in room_list:
+                for light in room.lights:
+                    light.report(hass)
+                hass.states.async_set(f"binary_sensor.{room.name}_motion", "off")
+                hass.states.async_set(f"sensor.{room.name}_lux", f"{room.lux(loop.time(), rng):.1f}")
+
+            def _service_called(call: SimServiceCall) -> None:
+                if call.service != "turn_on":
+                    return
+                entity_ids = call.data.get("entity_id", [])
+                for entity_id in [entity_ids] if isinstance(entity_ids, str) else entity_ids:
+                    room = room_of_light.get(entity_id)
+                    if room is not None and room.motion_at is not None and not room.commanded:
+                        room.commanded = True
+                        motion_to_command.append(loop.time() - room.motion_at)
+
+            hass.services.async_listen(_service_called)
+
+            def _light_changed(event: SimEvent) -> None:
+                room = room_of_light[event.data["entity_id"]]
+                if event.data["new_state"].state == "on" and room.motion_at is not None:
+                    motion_to_light.append(loop.time() - room.motion_at)
+                    room.motion_at = None
+
+            hass.states.async_track(room_of_light, _light_changed)
+
+            # Setup - timed per room, memory over all rooms
+            coordinators = []
+            entity_count = 0
+            setup_times: List[float] = []
+            gc.collect()
+            rss_before, blocks_before = _rss_bytes(), sys.getallocatedblocks()
+            setup_started = time.perf_counter()
+            for room in room_list:
+                started = time.perf_counter()
+                entry = SimConfigEntry({
+                    "room_name": room.name,
+                    "light_entity": [light.entity_id for light in room.lights],
+                    "lux_sensor": f"sensor.{room.name}_lux",
+                    "motion_sensor": f"binary_sensor.{room.name}_motion",
+                    **ROOM_CONFIG,
+                }, entry_id=room.name)
+                coordinator = SmartLuxCoordinator(hass, entry)
+                hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+                await coordinator.async_setup()
+                entity_count += len(await async_setup_entities(hass, entry))
+                coordinators.append(coordinator)
+                setup_times.append(time.perf_counter() - started)
+            setup_seconds = time.perf_counter() - setup_started
+            gc.collect()
+            rss_after, blocks_after = _rss_bytes(), sys.getallocatedblocks()
+
+            # Event-loop lag probe
+            lags: List[float] = []
+            running = True
+
+            async def _probe() -> None:
+                while running:
+                    started = loop.time()
+                    await asyncio.sleep(LAG_PROBE_SECONDS)
+                    lags.append(loop.time() - started - LAG_PROBE_SECONDS)
+
+            probe = hass.async_create_task(_probe())
+
+            # Event injection
+            events = {"lux": 0, "motion": 0, "light": 0}
+            due = dict.fromkeys(events, 0.0)
+            rates = {"lux": lux_rate, "motion": motion_rate / 60, "light": light_rate / 60}
+            started = last = loop.time()
+            while loop.time() - started < duration:
+                await asyncio.sleep(TICK_SECONDS)
+                now = loop.time()
+                for kind, rate in rates.items():
+                    due[kind] += rate * rooms * (now - last)
+                    while due[kind] >= 1:
+                        due[kind] -= 1
+                        events[kind] += 1
+                        _inject(hass, kind, rng.choice(room_list), rng, now)
+                last = now
+            elapsed = loop.time() - started
+
+            running = False
+            await probe
+            lux_received = sum(coordinator.lux_events.received for coordinator in coordinators)
+            lux_handled = sum(coordinator.lux_events.handled for coordinator in coordinators)
+            for coordinator in coordinators:
+                await coordinator.async_unload()
+            await hass.async_cancel_tasks()
+
+    return LoadReport(
+        rooms=rooms,
+        entities_per_room=entity_count / rooms,
+        setup_seconds=round(setup_seconds, 3),
+        setup_ms_per_room=summarize([seconds * 1000 for seconds in setup_times]),
+        rss_bytes_per_room=(
+            round((rss_after - rss_before) / rooms) if rss_before is not None and rss_after is not None else None
+        ),
+        blocks_per_room=round((blocks_after - blocks_before) / rooms, 1),
+        duration=round(elapsed, 2),
+        events=events,
+        events_per_second=round(sum(events.values()) / elapsed, 1),
+        loop_lag_ms=summarize([lag * 1000 for lag in lags]),
+        motion_to_command_ms=summarize([seconds * 1000 for seconds in motion_to_command]),
+        motion_to_light_ms=summarize([seconds * 1000 for seconds in motion_to_light]),
+        service_calls=sum(hass.services.calls.values()),
+        lux_received=lux_received,
+        lux_handled=lux_handled,
+    )
+
+
+def _inject(hass: SimHass, kind: str, room: Room, rng: random.Random, now: float) -> None:
+    """Inject one event into a room."""
+    if kind == "lux":
+        hass.states.async_set(f"sensor.{room.name}_lux", f"{room.lux(now, rng):.1f}")
+    elif kind == "motion":
+        room.motion = not room.motion
+        if room.motion and not room.lit and room.motion_at is None:
+            room.motion_at = now
+            room.commanded = False
+        hass.states.async_set(f"binary_sensor.{room.name}_motion", "on" if room.motion else "off")
+    else:
+        # Someone dims a lamp by hand
+        light = rng.choice(room.lights)
+        if light.brightness:
+            brightness = max(1, min(255, light.brightness + rng.randint(-40, 40)))
+            hass.async_create_task(light.async_command(hass, brightness, 0))
+
+
+def main() -> None:
+    """Run the load test for every room count and print the scaling curve."""
+    parser = argparse.ArgumentParser(description="Load-test Smart Lux Control with many rooms.")
+    parser.add_argument("--rooms", default="1,10,50,100,500", help="comma separated room counts (1-500)")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of event injection per run")
+    parser.add_argument("--lux-rate", type=float, default=1.0, help="lux readings per room per second")
+    parser.add_argument("--motion-rate", type=float, default=2.0, help="motion changes per room per minute")
+    parser.add_argument("--light-rate", type=float, default=1.0, help="manual light changes per room per minute")
+    parser.add_argument("--light-latency", type=float, default=0.05, help="light command latency in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--max-lag-ms", type=float, help="exit 1 if a run's p99 event-loop lag is above this")
+    args = parser.parse_args()
+    room_counts = [int(count) for count in args.rooms.split(",") if count]
+    if any(not 1 <= count <= 500 for count in room_counts):
+        parser.error("room counts must be between 1 and 500")
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("custom_components.smart_lux_control").setLevel(logging.ERROR)
+
+    curve = []
+    for count in room_counts:
+        report = asyncio.run(async_run_load(
+            count, args.duration, args.lux_rate, args.motion_rate, args.light_rate, args.light_latency, args.seed
+        ))
+        curve.append(report.as_dict())
+        print(
+            f"{count:>4} rooms  setup {report.setup_seconds:7.2f} s  "
+            f"mem/room {(report.rss_bytes_per_room or 0) / 1024:8.1f} KiB  "
+            f"{report.events_per_second:8.1f} ev/s  "
+            f"lag p99 {report.loop_lag_ms['p99']} ms  "
+            f"motion->light p50/p99 {report.motion_to_light_ms['p50']}/{report.motion_to_light_ms['p99']} ms",
+            file=sys.stderr,
+        )
+
+    result = {
+        "component_version": _component_version(),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "settings": {
+            "duration": args.duration,
+            "lux_rate": args.lux_rate,
+            "motion_rate": args.motion_rate,
+            "light_rate": args.light_rate,
+            "light_latency": args.light_latency,
+        },
+        "curve": curve,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(result, output, indent=2)
+    else:
+        print(json.dumps(result, indent=2))
+
+    if args.max_lag_ms is not None and any(
+        run["loop_lag_ms"]["p99"] is not None and run["loop_lag_ms"]["p99"] > args.max_lag_ms for run in curve
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
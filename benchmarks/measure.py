@@ -0,0 +1,125 @@
+"""Timing and memory measurement for the Smart Lux Control benchmarks."""
+from __future__ import annotations
+
+import gc
+import statistics
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+MIN_RUN_SECONDS = 0.05  # Small cases loop until one run takes at least this long
+MAX_LOOPS = 10000
+
+
+class Measurement(NamedTuple):
+    """Result of one benchmark at one sample count."""
+
+    name: str
+    samples: int
+    runs: int
+    loops: int  # Calls per run - times are per call
+    min_seconds: float
+    median_seconds: float
+    mean_seconds: float
+    peak_bytes: int  # Highest traced memory above the baseline during one call
+    retained_bytes: int  # Memory still held after the call
+    retained_blocks: int  # Allocated blocks still alive after the call
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the measurement as a JSON-friendly dict."""
+        return self._asdict()
+
+
+async def async_measure(
+    name: str,
+    samples: int,
+    call: Callable[[], Awaitable[Any]],
+    repeat: int = 5,
+) -> Measurement:
+    """Time call() over repeat runs, then trace one call with tracemalloc.
+
+    One untimed call warms caches first. Small cases run the call several
+    times per run so the timer resolution does not dominate.
+    """
+    await call()
+
+    loops = 1
+    started = time.perf_counter()
+    await call()
+    elapsed = time.perf_counter() - started
+    if 0 < elapsed < MIN_RUN_SECONDS:
+        loops = min(MAX_LOOPS, int(MIN_RUN_SECONDS / elapsed) + 1)
+
+    times: List[float] = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        for _ in range(loops):
+            await call()
+        times.append((time.perf_counter() - started) / loops)
+
+    peak, retained, blocks = await _async_trace(call)
+    return Measurement(
+        name=name,
+        samples=samples,
+        runs=len(times),
+        loops=loops,
+        min_seconds=min(times),
+        median_seconds=statistics.median(times),
+        mean_seconds=statistics.fmean(times),
+        peak_bytes=peak,
+        retained_bytes=retained,
+        retained_blocks=blocks,
+    )
+
+
+async def _async_trace(call: Callable[[], Awaitable[Any]]) -> Tuple[int, int, int]:
+    """Trace one call - peak and retained bytes, retained blocks."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await call()
+        gc.collect()  # Count only what the call keeps alive, not garbage waiting for a collection
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    # The snapshots themselves are allocated by tracemalloc - leave them out
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    blocks = sum(
+        stat.count_diff
+        for stat in after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "filename")
+    )
+    return peak - baseline, current - baseline, blocks
+
+
+def max_rss_kb() -> Optional[int]:
+    """Get the process's peak resident set size in KiB, None where unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def compare(
+    baseline: List[Dict[str, Any]], current: List[Dict[str, Any]], threshold: float
+) -> List[Dict[str, Any]]:
+    """Pair results by name and sample count; ratio is current/baseline median time."""
+    previous = {(result["name"], result["samples"]): result for result in baseline}
+    rows = []
+    for result in current:
+        old = previous.get((result["name"], result["samples"]))
+        if not old or not old["median_seconds"]:
+            continue
+        ratio = result["median_seconds"] / old["median_seconds"]
+        rows.append({
+            "name": result["name"],
+            "samples": result["samples"],
+            "baseline_seconds": old["median_seconds"],
+            "median_seconds": result["median_seconds"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > threshold,
+        })
+    return rows
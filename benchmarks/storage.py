@@ -0,0 +1,72 @@
+"""Benchmarks for sample persistence through the real Home Assistant Store."""
+from __future__ import annotations
+
+import random
+import tempfile
+import time
+from typing import List, Tuple
+
+from homeassistant.core import HomeAssistant
+
+from .measure import Measurement, async_measure
+
+KEY = "smart_lux_control_bench_samples"
+
+
+def _records(samples: int, seed: int) -> List[Tuple[float, float, int]]:
+    """Build (brightness, lux, epoch) records like the sample window holds."""
+    rng = random.Random(seed)
+    now = int(time.time())
+    return [
+        (float(rng.randint(1, 255)), round(rng.uniform(0, 600), 1), now - samples + index)
+        for index in range(samples)
+    ]
+
+
+async def _async_make_hass(config_dir: str) -> HomeAssistant:
+    """Create a Home Assistant core for Store I/O - it is never started."""
+    try:
+        hass = HomeAssistant(config_dir)
+    except TypeError:
+        # Before 2024.2 the config directory was set after construction
+        hass = HomeAssistant()
+        hass.config.config_dir = config_dir
+    return hass
+
+
+async def async_run(samples: int, repeat: int, seed: int = 0) -> List[Measurement]:
+    """Benchmark saving and loading a sample window of samples samples."""
+    from custom_components.smart_lux_control.const import SAMPLES_STORAGE_VERSION
+    from custom_components.smart_lux_control.journal import SampleJournal
+
+    records = _records(samples, seed)
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await _async_make_hass(config_dir)
+        try:
+            journal = SampleJournal(hass, KEY, SAMPLES_STORAGE_VERSION, samples + 1, lambda: records)
+
+            async def store_save() -> None:
+                # Full snapshot through Store, as a compaction writes it
+                await journal.async_compact()
+
+            async def store_load() -> None:
+                await SampleJournal(hass, KEY, SAMPLES_STORAGE_VERSION, samples + 1, list).async_load()
+
+            results = [
+                await async_measure("store_save", samples, store_save, repeat),
+                await async_measure("store_load", samples, store_load, repeat),
+            ]
+
+            # Worst case on start: every sample still in the journal, none in the snapshot
+            await journal.async_reset()
+            for brightness, lux, epoch in records:
+                journal.async_append(brightness, lux, epoch)
+            await journal.async_close()
+
+            async def journal_replay() -> None:
+                await SampleJournal(hass, KEY, SAMPLES_STORAGE_VERSION, samples + 1, list).async_load()
+
+            results.append(await async_measure("journal_replay", samples, journal_replay, repeat))
+            return results
+        finally:
+            await hass.async_stop(force=True)
@@ -3,13 +3,19 @@ import asyncio
 import logging
 import math
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant, ServiceCall
-from homeassistant.helpers import entity_registry as er
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, State, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import (
+    async_track_point_in_time,
+    async_track_state_change_event,
+)
 from homeassistant.helpers.storage import Store
 
 from .const import (
@@ -33,10 +39,39 @@ from .const import (
     CONF_DEVIATION_MARGIN,
     CONF_CHECK_INTERVAL,
     CONF_AUTO_CONTROL_ENABLED,
+    CONF_BRIGHTNESS_COOLDOWN,
+    CONF_MAX_CONCURRENT_LIGHTS,
+    CONF_SAVE_DELAY,
+    CONF_MAX_SAMPLES,
+    CONF_LUX_MIN_INTERVAL,
+    CONF_LUX_JUMP,
+    CONF_LATENCY_HISTOGRAMS,
+    CONF_CONTROLLER,
+    CONF_PI_KP,
+    CONF_PI_KI,
+    CONF_PI_MAX_STEP,
+    CONF_PI_INTEGRAL_LIMIT,
+    CONTROLLER_PI,
+    DEFAULT_CONTROLLER,
+    DEFAULT_PI_KP,
+    DEFAULT_PI_KI,
+    DEFAULT_PI_MAX_STEP,
+    DEFAULT_PI_INTEGRAL_LIMIT,
     DEFAULT_MIN_REGRESSION_QUALITY,
     DEFAULT_MAX_BRIGHTNESS_CHANGE,
     DEFAULT_DEVIATION_MARGIN,
     DEFAULT_LEARNING_RATE,
+    DEFAULT_MAX_CONCURRENT_LIGHTS,
+    DEFAULT_LUX_MIN_INTERVAL,
+    DEFAULT_LUX_JUMP,
+    DEFAULT_LATENCY_HISTOGRAMS,
+    LIGHT_TRANSITION_SECONDS,
+    BRIGHTNESS_VERIFY_TOLERANCE,
+    FALLBACK_STEP,
+    FALLBACK_MIN_STEP,
+    BRIGHTNESS_VERIFY_GRACE_SECONDS,
+    LIGHT_GROUP_RESCAN_SECONDS,
+    SAMPLE_SETTLE_SECONDS,
     LUX_MODES,
     SERVICE_CALCULATE_REGRESSION,
     SERVICE_CLEAR_SAMPLES,
@@ -45,11 +80,41 @@ from .const import (
     SERVICE_TEST_LIGHT_CONTROL,
     SERVICE_SYNC_LIGHT_STATES,
     SERVICE_FORCE_LIGHT_REFRESH,
+    SERVICE_CALCULATE_TARGET_BRIGHTNESS,
+    SERVICE_MAX_CONCURRENT_ROOMS,
+    DATA_ROOMS,
+    ROOM_ALL,
     STORAGE_VERSION,
+    SIGNAL_ROOM_UPDATE,
+    SAMPLES_STORAGE_VERSION,
+    DEFAULT_SAVE_DELAY,
+    DEFAULT_MAX_SAMPLES,
     EVENT_REGRESSION_UPDATED,
     EVENT_SMART_MODE_CHANGED,
     EVENT_SAMPLE_ADDED,
 )
+from .coalescer import LatestValueCoalescer
+from .control import (
+    LAG_MAX_SECONDS,
+    ConvergenceTracker,
+    FeedforwardPIController,
+    LuxKalmanFilter,
+    SensorLagEstimator,
+)
+from .journal import SampleJournal
+from .latency import PipelineLatency
+from .regression import (
+    RECENT_RESIDUALS,
+    LightRegression,
+    ModelStats,
+    RunningRegression,
+    quality_bucket,
+    solve_brightness,
+    t_quantile,
+)
+from .samples import SampleBuffer
+from .snapshot import RoomSnapshot
+from .timeline import TargetLuxTimeline
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -63,6 +128,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     await coordinator.async_setup()
     
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    rooms = hass.data.setdefault(DATA_ROOMS, {}).setdefault(coordinator.room_name, {})
+    if rooms:
+        _LOGGER.warning(
+            "Room name %s is used by more than one entry - services address all of them", coordinator.room_name
+        )
+    rooms[entry.entry_id] = coordinator
     
     # Setup platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -79,131 +150,119 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     
     if unload_ok:
         coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        rooms = hass.data.get(DATA_ROOMS, {})
+        same_name = rooms.get(coordinator.room_name, {})
+        same_name.pop(entry.entry_id, None)
+        if not same_name:
+            rooms.pop(coordinator.room_name, None)
         await coordinator.async_unload()
     
     return unload_ok
 
 
 async def async_setup_services(hass: HomeAssistant) -> None:
-    """Setup services for Smart Lux Control."""
+    """Setup services for Smart Lux Control.
     
-    async def calculate_regression_service(call: ServiceCall) -> None:
-        """Service to calculate regression for a room."""
-        room_name = call.data.get("room_name")
-        if not room_name:
-            _LOGGER.error("Room name is required for calculate_regression service")
-            return
-            
-        coordinator = _get_coordinator_by_room(hass, room_name)
-        if coordinator:
+    Every service targets rooms by room_name (one name, a list or "all")
+    and/or area_id, runs on the matching rooms concurrently and returns a
+    per-room summary.
+    """
+    
+    async def calculate_regression_service(call: ServiceCall) -> ServiceResponse:
+        """Service to calculate regression for rooms."""
+        async def _run(coordinator: "SmartLuxCoordinator") -> Dict[str, Any]:
             await coordinator.async_calculate_regression()
+            return _model_summary(coordinator)
+        
+        return await _async_fan_out(hass, call, _run)
     
-    async def clear_samples_service(call: ServiceCall) -> None:
-        """Service to clear samples for a room."""
-        room_name = call.data.get("room_name")
-        if not room_name:
-            _LOGGER.error("Room name is required for clear_samples service")
-            return
-            
-        coordinator = _get_coordinator_by_room(hass, room_name)
-        if coordinator:
+    async def clear_samples_service(call: ServiceCall) -> ServiceResponse:
+        """Service to clear samples for rooms."""
+        async def _run(coordinator: "SmartLuxCoordinator") -> Dict[str, Any]:
             await coordinator.async_clear_samples()
+            return {"sample_count": coordinator.sample_count}
+        
+        return await _async_fan_out(hass, call, _run)
     
-    async def add_sample_service(call: ServiceCall) -> None:
+    async def add_sample_service(call: ServiceCall) -> ServiceResponse:
         """Service to manually add a sample."""
-        room_name = call.data.get("room_name")
         brightness = call.data.get("brightness")
         lux = call.data.get("lux")
         
-        if not all([room_name, brightness is not None, lux is not None]):
-            _LOGGER.error("Room name, brightness, and lux are required for add_sample service")
-            return
-            
-        coordinator = _get_coordinator_by_room(hass, room_name)
-        if coordinator:
+        if brightness is None or lux is None:
+            _LOGGER.error("Brightness and lux are required for add_sample service")
+            return {"rooms": {}}
+        
+        async def _run(coordinator: "SmartLuxCoordinator") -> Dict[str, Any]:
             await coordinator.async_add_sample(brightness, lux)
+            return {"sample_count": coordinator.sample_count}
+        
+        return await _async_fan_out(hass, call, _run)
     
-    async def adaptive_learning_service(call: ServiceCall) -> None:
+    async def adaptive_learning_service(call: ServiceCall) -> ServiceResponse:
         """Service to run adaptive learning."""
-        room_name = call.data.get("room_name")
-        if not room_name:
-            _LOGGER.error("Room name is required for adaptive_learning service")
-            return
-            
-        coordinator = _get_coordinator_by_room(hass, room_name)
-        if coordinator:
+        async def _run(coordinator: "SmartLuxCoordinator") -> Dict[str, Any]:
             await coordinator.async_adaptive_learning()
-    
-    async def calculate_target_brightness_service(call: ServiceCall) -> None:
-        """Service to calculate target brightness for desired lux level."""
-        room_name = call.data.get("room_name")
-        target_lux = call.data.get("target_lux")
-        current_brightness = call.data.get("current_brightness", 255)
+            return _model_summary(coordinator)
         
-        if not all([room_name, target_lux is not None]):
-            _LOGGER.error("Room name and target_lux are required for calculate_target_brightness service")
-            return
-            
-        coordinator = _get_coordinator_by_room(hass, room_name)
-        if coordinator:
-            brightness = coordinator.calculate_target_brightness(target_lux, current_brightness)
-            return {"brightness": brightness}
+        return await _async_fan_out(hass, call, _run)
+    
+    async def calculate_target_brightness_service(call: ServiceCall) -> ServiceResponse:
+        """Service to calculate target brightness for one or more lux levels."""
+        try:
+            target_luxes = [float(target_lux) for target_lux in cv.ensure_list(call.data.get("target_lux"))]
+            current_brightness = float(call.data.get("current_brightness", 255))
+            confidence = call.data.get("confidence")
+            confidence = float(confidence) if confidence is not None else None
+        except (TypeError, ValueError) as err:
+            raise ServiceValidationError(f"Invalid calculate_target_brightness data: {err}") from err
+        
+        if not target_luxes:
+            raise ServiceValidationError("target_lux is required for calculate_target_brightness service")
+        if confidence is not None and not 0 < confidence < 1:
+            raise ServiceValidationError("confidence must be between 0 and 1")
+        
+        async def _run(coordinator: "SmartLuxCoordinator") -> Dict[str, Any]:
+            return coordinator.predict_target_brightness(target_luxes, current_brightness, confidence)
+        
+        return await _async_fan_out(hass, call, _run)
     
-    async def test_light_control_service(call: ServiceCall) -> None:
+    async def test_light_control_service(call: ServiceCall) -> ServiceResponse:
         """Service to test light control with specific brightness."""
-        room_name = call.data.get("room_name")
         brightness = call.data.get("brightness")
         
-        if not all([room_name, brightness is not None]):
-            _LOGGER.error("Room name and brightness are required for test_light_control service")
-            return
-            
-        coordinator = _get_coordinator_by_room(hass, room_name)
-        if coordinator:
-            _LOGGER.info("🧪 Testing light control for %s with brightness %d", room_name, brightness)
+        if brightness is None:
+            _LOGGER.error("Brightness is required for test_light_control service")
+            return {"rooms": {}}
+        
+        async def _run(coordinator: "SmartLuxCoordinator") -> Dict[str, Any]:
+            _LOGGER.info("🧪 Testing light control for %s with brightness %d", coordinator.room_name, brightness)
             success = await coordinator._async_set_brightness(brightness)
             if success:
                 _LOGGER.info("✅ Test successful - lights responded to brightness %d", brightness)
             else:
                 _LOGGER.error("❌ Test failed - lights did not respond properly")
+            return {"success": success}
+        
+        return await _async_fan_out(hass, call, _run)
     
-    async def sync_light_states_service(call: ServiceCall) -> None:
+    async def sync_light_states_service(call: ServiceCall) -> ServiceResponse:
         """Service to force sync light states to fix desync issues."""
-        room_name = call.data.get("room_name")
-        
-        if not room_name:
-            _LOGGER.error("Room name is required for sync_light_states service")
-            return
-            
-        coordinator = _get_coordinator_by_room(hass, room_name)
-        if coordinator:
-            _LOGGER.info("🔄 Syncing light states for %s", room_name)
+        async def _run(coordinator: "SmartLuxCoordinator") -> Dict[str, Any]:
+            _LOGGER.info("🔄 Syncing light states for %s", coordinator.room_name)
             
             # Log current state of all lights
-            for light_entity in coordinator.light_entities:
-                light_state = hass.states.get(light_entity)
-                if light_state:
-                    brightness = light_state.attributes.get("brightness", "N/A")
-                    _LOGGER.info(
-                        "Light %s: state=%s, brightness=%s", 
-                        light_entity, light_state.state, brightness
-                    )
-                else:
-                    _LOGGER.warning("Light %s: state unavailable", light_entity)
+            lights = _light_states(hass, coordinator, "Light %s: state=%s, brightness=%s", "Light %s: state unavailable")
             
-            _LOGGER.info("✅ Light states sync completed for %s", room_name)
+            _LOGGER.info("✅ Light states sync completed for %s", coordinator.room_name)
+            return {"lights": lights}
+        
+        return await _async_fan_out(hass, call, _run)
     
-    async def force_light_refresh_service(call: ServiceCall) -> None:
+    async def force_light_refresh_service(call: ServiceCall) -> ServiceResponse:
         """Service to force refresh light entity states."""
-        room_name = call.data.get("room_name")
-        
-        if not room_name:
-            _LOGGER.error("Room name is required for force_light_refresh service")
-            return
-            
-        coordinator = _get_coordinator_by_room(hass, room_name)
-        if coordinator:
-            _LOGGER.info("🔄 Force refreshing light entity states for %s", room_name)
+        async def _run(coordinator: "SmartLuxCoordinator") -> Dict[str, Any]:
+            _LOGGER.info("🔄 Force refreshing light entity states for %s", coordinator.room_name)
             
             # Try to force state refresh by calling homeassistant.update_entity
             for light_entity in coordinator.light_entities:
@@ -221,36 +280,131 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             await asyncio.sleep(1)
             
             # Log updated states
-            for light_entity in coordinator.light_entities:
-                light_state = hass.states.get(light_entity)
-                if light_state:
-                    brightness = light_state.attributes.get("brightness", "N/A")
-                    _LOGGER.info(
-                        "💡 Refreshed state %s: state=%s, brightness=%s", 
-                        light_entity, light_state.state, brightness
-                    )
-                else:
-                    _LOGGER.warning("💡 Refreshed state %s: still unavailable", light_entity)
+            lights = _light_states(
+                hass, coordinator,
+                "💡 Refreshed state %s: state=%s, brightness=%s", "💡 Refreshed state %s: still unavailable"
+            )
             
-            _LOGGER.info("✅ Force refresh completed for %s", room_name)
+            _LOGGER.info("✅ Force refresh completed for %s", coordinator.room_name)
+            return {"lights": lights}
+        
+        return await _async_fan_out(hass, call, _run)
     
     # Register services
-    hass.services.async_register(DOMAIN, SERVICE_CALCULATE_REGRESSION, calculate_regression_service)
-    hass.services.async_register(DOMAIN, SERVICE_CLEAR_SAMPLES, clear_samples_service)
-    hass.services.async_register(DOMAIN, SERVICE_ADD_SAMPLE, add_sample_service)
-    hass.services.async_register(DOMAIN, SERVICE_ADAPTIVE_LEARNING, adaptive_learning_service)
-    hass.services.async_register(DOMAIN, "calculate_target_brightness", calculate_target_brightness_service)
-    hass.services.async_register(DOMAIN, SERVICE_TEST_LIGHT_CONTROL, test_light_control_service)
-    hass.services.async_register(DOMAIN, SERVICE_SYNC_LIGHT_STATES, sync_light_states_service)
-    hass.services.async_register(DOMAIN, SERVICE_FORCE_LIGHT_REFRESH, force_light_refresh_service)
+    for service, handler in (
+        (SERVICE_CALCULATE_REGRESSION, calculate_regression_service),
+        (SERVICE_CLEAR_SAMPLES, clear_samples_service),
+        (SERVICE_ADD_SAMPLE, add_sample_service),
+        (SERVICE_ADAPTIVE_LEARNING, adaptive_learning_service),
+        (SERVICE_TEST_LIGHT_CONTROL, test_light_control_service),
+        (SERVICE_SYNC_LIGHT_STATES, sync_light_states_service),
+        (SERVICE_FORCE_LIGHT_REFRESH, force_light_refresh_service),
+    ):
+        hass.services.async_register(
+            DOMAIN, service, handler, supports_response=SupportsResponse.OPTIONAL
+        )
+    
+    # Pure query - only useful with a response
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CALCULATE_TARGET_BRIGHTNESS,
+        calculate_target_brightness_service,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+def _resolve_rooms(hass: HomeAssistant, call: ServiceCall) -> Tuple[List["SmartLuxCoordinator"], List[str]]:
+    """Get the coordinators a service call targets and the room names that are not configured."""
+    rooms: Dict[str, Dict[str, SmartLuxCoordinator]] = hass.data.get(DATA_ROOMS, {})
+    
+    room_names = call.data.get("room_name") or []
+    if isinstance(room_names, str):
+        room_names = [room_names]
+    area_ids = call.data.get("area_id") or []
+    if isinstance(area_ids, str):
+        area_ids = [area_ids]
+    
+    if ROOM_ALL in room_names:
+        return [coordinator for same_name in rooms.values() for coordinator in same_name.values()], []
+    
+    targets: Dict[str, SmartLuxCoordinator] = {}  # By entry_id
+    unknown = []
+    for room_name in room_names:
+        same_name = rooms.get(room_name)
+        if same_name:
+            targets.update(same_name)
+        else:
+            unknown.append(room_name)
+    
+    if area_ids:
+        wanted = set(area_ids)
+        for same_name in rooms.values():
+            for entry_id, coordinator in same_name.items():
+                if entry_id not in targets and coordinator.area_ids & wanted:
+                    targets[entry_id] = coordinator
+    
+    return list(targets.values()), unknown
+
+
+async def _async_fan_out(
+    hass: HomeAssistant,
+    call: ServiceCall,
+    work: Callable[["SmartLuxCoordinator"], Awaitable[Dict[str, Any]]],
+) -> Dict[str, Any]:
+    """Run work on every targeted room, at most SERVICE_MAX_CONCURRENT_ROOMS at a time."""
+    coordinators, unknown = _resolve_rooms(hass, call)
+    results: Dict[str, Dict[str, Any]] = {}
+    
+    for room_name in unknown:
+        _LOGGER.error("Room %s not found for %s service", room_name, call.service)
+        results[room_name] = {"success": False, "error": "room_not_found"}
+    if not coordinators and not unknown:
+        _LOGGER.error("No rooms targeted by %s service - set room_name or area_id", call.service)
+    
+    semaphore = asyncio.Semaphore(SERVICE_MAX_CONCURRENT_ROOMS)
+    
+    async def _run(coordinator: SmartLuxCoordinator) -> None:
+        async with semaphore:
+            try:
+                summary = {"success": True, **(await work(coordinator))}
+            except Exception as err:
+                _LOGGER.error("Error in %s service for room %s: %s", call.service, coordinator.room_name, err)
+                summary = {"success": False, "error": str(err)}
+        # Rooms sharing a name keep their own result under the entry id
+        key = coordinator.room_name
+        if key in results:
+            key = f"{key} ({coordinator.entry.entry_id})"
+        results[key] = summary
+    
+    await asyncio.gather(*(_run(coordinator) for coordinator in coordinators))
+    return {"rooms": results}
+
+
+def _model_summary(coordinator: "SmartLuxCoordinator") -> Dict[str, Any]:
+    """Summarize a room's model for a service response."""
+    return {
+        "regression_a": coordinator.regression_a,
+        "regression_b": coordinator.regression_b,
+        "regression_quality": coordinator.regression_quality,
+        "sample_count": coordinator.sample_count,
+    }
 
 
-def _get_coordinator_by_room(hass: HomeAssistant, room_name: str) -> Optional["SmartLuxCoordinator"]:
-    """Get coordinator by room name."""
-    for coordinator in hass.data[DOMAIN].values():
-        if isinstance(coordinator, SmartLuxCoordinator) and coordinator.room_name == room_name:
-            return coordinator
-    return None
+def _light_states(
+    hass: HomeAssistant, coordinator: "SmartLuxCoordinator", found_message: str, missing_message: str
+) -> Dict[str, Dict[str, Any]]:
+    """Log the current state of a room's lights and return them for a service response."""
+    lights = {}
+    for light_entity in coordinator.light_entities:
+        light_state = hass.states.get(light_entity)
+        if light_state:
+            brightness = light_state.attributes.get("brightness")
+            _LOGGER.info(found_message, light_entity, light_state.state, brightness if brightness is not None else "N/A")
+            lights[light_entity] = {"state": light_state.state, "brightness": brightness}
+        else:
+            _LOGGER.warning(missing_message, light_entity)
+            lights[light_entity] = {"state": None, "brightness": None}
+    return lights
 
 
 class SmartLuxCoordinator:
@@ -296,11 +450,32 @@ class SmartLuxCoordinator:
         self.auto_control_enabled = entry.data.get(CONF_AUTO_CONTROL_ENABLED, True)
         
         # Regression data
-        self.samples: List[Tuple[float, float, datetime]] = []
+        self.max_samples = max(10, int(entry.data.get(CONF_MAX_SAMPLES, DEFAULT_MAX_SAMPLES)))
+        self.samples = SampleBuffer(self.max_samples)
         self.regression_a = 1.0
         self.regression_b = 0.0
         self.regression_quality = 0.0
-        self.max_samples = 100
+        self._regression_stats = RunningRegression()  # Sufficient statistics of the sample window
+        self._model_version = 0  # Bumped on every sample or model change
+        self._model_stats: Optional[ModelStats] = None
+        
+        # Per-light model - one coefficient per light, forgets at the pace of the sample window
+        self.light_model = LightRegression(len(self.light_entities), 1 - 1 / self.max_samples)
+        self.light_weights: Optional[List[float]] = None
+        self.light_intercept = 0.0
+        self.light_quality = 0.0
+        self.convergence = ConvergenceTracker()
+        self._fallback_step = FALLBACK_STEP
+        self._fallback_direction = 0  # Sign of the last fallback step, 0 at the start of an episode
+        
+        # Controller - "step" (model estimate limited per step) or "pi" (feedforward + PI)
+        self.controller_type = entry.data.get(CONF_CONTROLLER, DEFAULT_CONTROLLER)
+        self.pi_max_step = entry.data.get(CONF_PI_MAX_STEP, DEFAULT_PI_MAX_STEP)
+        self.controller = FeedforwardPIController(
+            entry.data.get(CONF_PI_KP, DEFAULT_PI_KP),
+            entry.data.get(CONF_PI_KI, DEFAULT_PI_KI),
+            entry.data.get(CONF_PI_INTEGRAL_LIMIT, DEFAULT_PI_INTEGRAL_LIMIT),
+        )
         
         # Settings
         self.min_regression_quality = DEFAULT_MIN_REGRESSION_QUALITY
@@ -318,18 +493,74 @@ class SmartLuxCoordinator:
         # Brightness change tracking (to handle lux sensor lag)
         self.last_brightness_change_time: Optional[datetime] = None
         self.last_brightness_change_value: Optional[int] = None
-        self.brightness_cooldown_seconds = entry.data.get("brightness_cooldown_seconds", 10)  # Minimum time between brightness changes
+        self.brightness_cooldown_seconds = entry.data.get(CONF_BRIGHTNESS_COOLDOWN, 10)  # Until the sensor lag is learned
+        self.last_brightness_change_direction: Optional[str] = None  # "up" or "down"
+        self.sensor_lag = SensorLagEstimator(self.brightness_cooldown_seconds)
+        self._lag_pending = False  # Waiting for the lux sensor to show the last change
+        self._lag_verified_time: Optional[datetime] = None  # When the lights reported the last change
+        self._control_lock = asyncio.Lock()  # Serialises control passes
+        
+        # Filtered lux - the control loop acts on the estimate, not on single readings
+        self.lux_filter = LuxKalmanFilter()
+        self.noise_suppressed = 0  # Adjustments a raw reading asked for but the estimate did not
+        
+        # Lux events are coalesced - one handler run per interval, big jumps go through at once
+        self.lux_jump_threshold = entry.data.get(CONF_LUX_JUMP, DEFAULT_LUX_JUMP)
+        self.lux_events = LatestValueCoalescer(
+            hass,
+            self._async_lux_changed,
+            entry.data.get(CONF_LUX_MIN_INTERVAL, DEFAULT_LUX_MIN_INTERVAL),
+            f"smart_lux_control lux events {self.room_name}",
+            merge=self._merge_lux_events,
+        )
+        self._handled_lux: Optional[float] = None  # Reading of the last handled lux event
+        
+        # Light actuation - commands go out to all lights at once, capped per room
+        self.max_concurrent_lights = max(1, int(entry.data.get(CONF_MAX_CONCURRENT_LIGHTS, DEFAULT_MAX_CONCURRENT_LIGHTS)))
+        self._actuation_semaphore = asyncio.Semaphore(self.max_concurrent_lights)
+        self._light_groups: Dict[frozenset, str] = {}
+        self._no_light_group: Dict[frozenset, float] = {}  # Member sets without a group -> loop time of the scan
+        self.service_calls_saved = 0  # Unicast calls avoided by room-wide/group commands
+        
+        # Motion-to-light stage histograms - None when disabled, so the hot path only checks for None
+        self.latency: Optional[PipelineLatency] = (
+            PipelineLatency(self.light_entities)
+            if entry.data.get(CONF_LATENCY_HISTOGRAMS, DEFAULT_LATENCY_HISTOGRAMS)
+            else None
+        )
         
         # Smart mode settings
         self._smart_mode_enabled = True
         self._adaptive_learning_enabled = True
         
-        # Storage
+        # Storage - writes are debounced, _dirty tracks unsaved changes
         self.store = Store(hass, STORAGE_VERSION, f"{DOMAIN}_{self.room_name}")
+        self.save_delay = entry.data.get(CONF_SAVE_DELAY, DEFAULT_SAVE_DELAY)
+        self._dirty = False
+        
+        # Samples live in their own append-only journal, compacted once it
+        # holds as many records as the sample window
+        self._journal = SampleJournal(
+            hass,
+            f"{DOMAIN}_{self.room_name}_samples",
+            SAMPLES_STORAGE_VERSION,
+            self.max_samples,
+            self._iter_samples,
+        )
+        
+        # Target lux timeline - rebuilt on sun.sun/home mode changes only
+        self._target_timeline: Optional[TargetLuxTimeline] = None
         
-        # State tracking
+        # State tracking - snapshot mirrors the room's entities, replaced on every state change
         self._unsub_listeners = []
-        self._automation_task: Optional[asyncio.Task] = None
+        self.snapshot = self._read_snapshot()
+        self.update_signal = SIGNAL_ROOM_UPDATE.format(entry.entry_id)
+        
+        # Deadline timers - armed only when something is due, so an idle room never wakes up
+        self._unsub_off_timer: Optional[Callable[[], None]] = None
+        self._unsub_control_timer: Optional[Callable[[], None]] = None
+        # One pending sample capture per room, pushed back by every light change
+        self._unsub_capture_timer: Optional[Callable[[], None]] = None
     
     async def async_setup(self) -> None:
         """Set up the coordinator."""
@@ -339,45 +570,67 @@ class SmartLuxCoordinator:
         # Set up state change listeners
         await self._async_setup_listeners()
         
-        # Start automation task if auto control is enabled
+        # Run an initial control pass if auto control is enabled - it arms the timers
         if self.auto_control_enabled:
-            await self._async_start_automation_task()
+            self.hass.async_create_task(self.async_control_lights())
         
         _LOGGER.info("Smart Lux Control coordinator set up for room: %s", self.room_name)
     
     async def async_unload(self) -> None:
         """Unload the coordinator."""
-        # Cancel automation task
-        if self._automation_task:
-            self._automation_task.cancel()
-            try:
-                await self._automation_task
-            except asyncio.CancelledError:
-                pass
-            
+        # Cancel pending timers
+        self._async_cancel_timers()
+        self._async_cancel_capture()
+        self.lux_events.async_cancel()
+        
         for unsub in self._unsub_listeners:
             unsub()
         self._unsub_listeners.clear()
+        
+        # Flush pending changes
+        await self._journal.async_close()
+        await self._async_save_data()
     
     async def _async_load_data(self) -> None:
         """Load data from storage."""
         data = await self.store.async_load() or {}
         
-        # Load samples
-        samples_data = data.get("samples", [])
-        self.samples = []
-        for sample in samples_data:
-            try:
-                brightness, lux, timestamp_str = sample
-                timestamp = datetime.fromisoformat(timestamp_str)
-                self.samples.append((brightness, lux, timestamp))
-            except (ValueError, TypeError):
+        # Load samples - snapshot plus journal replay
+        self.samples.clear()
+        self._regression_stats.reset()
+        samples_data = await self._journal.async_load()
+        migrate = samples_data is None and bool(data.get("samples"))
+        if migrate:
+            samples_data = self._legacy_samples(data["samples"])
+            _LOGGER.info(
+                "Migrating %d samples for %s to the sample journal", len(samples_data), self.room_name
+            )
+        
+        for brightness, lux, epoch in samples_data or []:
+            if not (0 <= brightness <= 255) or not (0 <= lux <= 10000):
                 continue
+            self._append_sample(brightness, lux, epoch)
+        
+        if "samples" in data:
+            # Write the snapshot first, then drop the samples from the main document
+            if migrate:
+                await self._journal.async_compact()
+            self._dirty = True
+            await self._async_save_data()
         
         # Load regression data
         self.regression_a = data.get("regression_a", 1.0)
         self.regression_b = data.get("regression_b", 0.0)
         self.regression_quality = data.get("regression_quality", 0.0)
+        self._model_version += 1
+        
+        # Per-light model statistics are only valid for the same set of lights
+        light_model = data.get("light_model")
+        if light_model and light_model.get("lights") == self.light_entities:
+            if self.light_model.load(light_model):
+                self._update_light_model()
+        
+        self.sensor_lag.load(data.get("sensor_lag", {}))
         
         # Load settings
         self.min_regression_quality = data.get("min_regression_quality", DEFAULT_MIN_REGRESSION_QUALITY)
@@ -385,28 +638,80 @@ class SmartLuxCoordinator:
         self.deviation_margin = data.get("deviation_margin", DEFAULT_DEVIATION_MARGIN)
         self.learning_rate = data.get("learning_rate", DEFAULT_LEARNING_RATE)
     
+    @staticmethod
+    def _legacy_samples(samples_data: List[Any]) -> List[Tuple[float, float, float]]:
+        """Convert samples from the old [brightness, lux, iso timestamp] format."""
+        samples = []
+        for sample in samples_data:
+            try:
+                brightness, lux, timestamp_str = sample
+                samples.append((float(brightness), float(lux), datetime.fromisoformat(timestamp_str).timestamp()))
+            except (ValueError, TypeError):
+                continue
+        return samples
+    
+    def _iter_samples(self) -> Iterator[Tuple[float, float, int]]:
+        """Iterate the sample window as (brightness, lux, epoch) for the journal snapshot."""
+        return zip(self.samples.brightness_view(), self.samples.lux_view(), self.samples.epoch_view())
+    
+    @callback
+    def async_schedule_save(self) -> None:
+        """Mark data as changed and schedule a debounced write."""
+        self._dirty = True
+        self.store.async_delay_save(self._data_to_save, self.save_delay)
+    
     async def _async_save_data(self) -> None:
-        """Save data to storage."""
-        # Prepare samples for storage
-        samples_data = []
-        for brightness, lux, timestamp in self.samples[-self.max_samples:]:
-            samples_data.append([brightness, lux, timestamp.isoformat()])
-        
-        data = {
-            "samples": samples_data,
+        """Write pending changes to storage now."""
+        if not self._dirty:
+            return
+        await self.store.async_save(self._data_to_save())
+    
+    @callback
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Build the storage document."""
+        self._dirty = False
+        
+        # Samples are stored by the journal
+        return {
             "regression_a": self.regression_a,
             "regression_b": self.regression_b,
             "regression_quality": self.regression_quality,
+            "light_model": {"lights": self.light_entities, **self.light_model.as_dict()},
+            "sensor_lag": self.sensor_lag.to_storage(),
             "min_regression_quality": self.min_regression_quality,
             "max_brightness_change": self.max_brightness_change,
             "deviation_margin": self.deviation_margin,
             "learning_rate": self.learning_rate,
         }
-        
-        await self.store.async_save(data)
+    
+    def _read_snapshot(self) -> RoomSnapshot:
+        """Build the room snapshot from the state machine."""
+        states = self.hass.states
+        return RoomSnapshot.from_states(
+            self.light_entities,
+            [states.get(light_entity) for light_entity in self.light_entities],
+            states.get(self.lux_sensor),
+            states.get(self.motion_sensor),
+            states.get(self.home_mode_select) if self.home_mode_select else None,
+        )
     
     async def _async_setup_listeners(self) -> None:
         """Set up state change listeners."""
+        # Keep the snapshot in step with the room's entities - registered first,
+        # and a callback, so the handlers below already see the new state
+        self.snapshot = self._read_snapshot()
+        mirrored = [*self.light_entities, self.lux_sensor, self.motion_sensor]
+        if self.home_mode_select:
+            mirrored.append(self.home_mode_select)
+        self._unsub_listeners.append(
+            async_track_state_change_event(self.hass, mirrored, self._async_mirror_state)
+        )
+        
+        # Flush pending writes when Home Assistant stops
+        self._unsub_listeners.append(
+            self.hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, self._async_ha_stop)
+        )
+        
         # Listen for light changes from all controlled lights
         self._unsub_listeners.append(
             async_track_state_change_event(
@@ -414,10 +719,10 @@ class SmartLuxCoordinator:
             )
         )
         
-        # Listen for lux sensor changes
+        # Listen for lux sensor changes - coalesced, chatty sensors cost one run per interval
         self._unsub_listeners.append(
             async_track_state_change_event(
-                self.hass, [self.lux_sensor], self._async_lux_changed
+                self.hass, [self.lux_sensor], self._async_lux_event
             )
         )
         
@@ -428,6 +733,13 @@ class SmartLuxCoordinator:
             )
         )
         
+        # Listen for sun changes - TARGET TIMELINE REBUILD
+        self._unsub_listeners.append(
+            async_track_state_change_event(
+                self.hass, ["sun.sun"], self._async_sun_changed
+            )
+        )
+        
         # Listen for home mode changes - TARGET LUX UPDATE
         if self.home_mode_select:
             self._unsub_listeners.append(
@@ -436,57 +748,176 @@ class SmartLuxCoordinator:
                 )
             )
     
-    async def _async_light_changed(self, event) -> None:
-        """Handle light state changes."""
+    @callback
+    def _async_mirror_state(self, event) -> None:
+        """Apply a state change to the room snapshot."""
+        entity_id = event.data["entity_id"]
+        new_state = event.data.get("new_state")
+        snapshot = self.snapshot
+        if entity_id in snapshot.light_index:
+            snapshot = snapshot.with_light(entity_id, new_state)
+        if entity_id == self.lux_sensor:
+            snapshot = snapshot.with_lux(new_state)
+        if entity_id == self.motion_sensor:
+            snapshot = snapshot.with_motion(new_state)
+        if entity_id == self.home_mode_select:
+            snapshot = snapshot.with_mode(new_state)
+        self.snapshot = snapshot
+        # Lux entities are refreshed by the coalesced lux handler instead
+        if entity_id != self.lux_sensor:
+            self.async_notify_listeners()
+    
+    async def _async_ha_stop(self, event) -> None:
+        """Flush pending changes on shutdown.
+        
+        Awaited here rather than left to the background flush, which Home
+        Assistant cancels while stopping.
+        """
+        await self._journal.async_close()
+        await self._async_save_data()
+    
+    @callback
+    def _async_light_changed(self, event) -> None:
+        """Handle light state changes - (re)arm the room's sample capture."""
         new_state = event.data.get("new_state")
         if not new_state or new_state.state != "on":
             return
         
-        brightness = new_state.attributes.get("brightness")
-        if brightness is None:
+        if new_state.attributes.get("brightness") is None:
             return
         
-        # Wait a bit for lux to stabilize, then add sample
-        await asyncio.sleep(3)
+        # A transition across several lamps fires many events - wait until the
+        # lights and lux settle, then take one sample for the whole room
+        self._async_cancel_capture()
+        from homeassistant.util import dt as dt_util
+        self._unsub_capture_timer = async_track_point_in_time(
+            self.hass, self._async_capture_sample, dt_util.now() + timedelta(seconds=SAMPLE_SETTLE_SECONDS)
+        )
+    
+    @callback
+    def _async_cancel_capture(self) -> None:
+        """Cancel the pending sample capture."""
+        if self._unsub_capture_timer:
+            self._unsub_capture_timer()
+            self._unsub_capture_timer = None
+    
+    async def _async_capture_sample(self, now: datetime) -> None:
+        """Record one room-level sample once the lights settled."""
+        self._unsub_capture_timer = None
+        snapshot = self.snapshot
+        brightness = snapshot.average_brightness
+        if brightness is None or snapshot.lux is None:
+            return
         
-        lux_state = self.hass.states.get(self.lux_sensor)
-        if lux_state and lux_state.state not in ("unknown", "unavailable"):
-            try:
-                lux_value = float(lux_state.state)
-                await self.async_add_sample(brightness, lux_value)
-            except ValueError:
-                pass
+        await self.async_add_sample(
+            round(brightness), snapshot.lux, [light.effective_brightness for light in snapshot.lights]
+        )
     
-    async def _async_lux_changed(self, event) -> None:
-        """Handle lux sensor changes - detect when sensor updates after brightness change."""
-        new_state = event.data.get("new_state")
+    @callback
+    def _async_lux_event(self, event) -> None:
+        """Queue a lux change for the coalesced handler."""
+        lux = self.snapshot.lux
+        handled = self._handled_lux
+        urgent = (lux is None) != (handled is None) or (
+            lux is not None and abs(lux - handled) >= self.lux_jump_threshold
+        )
         old_state = event.data.get("old_state")
+        new_state = event.data.get("new_state")
+        self.lux_events.async_push(
+            {
+                "old_state": old_state,
+                "new_state": new_state,
+                "caught_up": self._lux_caught_up(old_state, new_state),
+            },
+            urgent,
+        )
+    
+    def _lux_caught_up(self, old_state: Optional[State], new_state: Optional[State]) -> Optional[datetime]:
+        """Get the time of a reading that shows the pending brightness change, None for other readings.
         
+        Checked per event - merged events would time the sensor lag by a later reading.
+        """
+        if not self._lag_pending or not self.last_brightness_change_time or not old_state or not new_state:
+            return None
+        # Readings from before the lights reported the command cannot show it
+        if not self._lag_verified_time or new_state.last_updated < self._lag_verified_time:
+            return None
+        try:
+            old_lux = float(old_state.state)
+            new_lux = float(new_state.state)
+        except (ValueError, TypeError):
+            return None
+        # A change of more than 10 lux in the direction of the brightness change
+        if abs(new_lux - old_lux) > 10 and (new_lux > old_lux) == (self.last_brightness_change_direction == "up"):
+            return new_state.last_updated
+        return None
+    
+    @staticmethod
+    def _merge_lux_events(pending: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge lux changes - from the oldest unhandled state to the newest, keeping the first catch-up."""
+        return {
+            "old_state": pending["old_state"],
+            "new_state": new["new_state"],
+            "caught_up": pending["caught_up"] or new["caught_up"],
+        }
+    
+    async def _async_lux_changed(self, data: Dict[str, Any]) -> None:
+        """Handle lux sensor changes - detect when sensor updates after brightness change."""
+        new_state = data.get("new_state")
+        old_state = data.get("old_state")
+        self._handled_lux = self.snapshot.lux
+        
+        try:
+            await self._async_handle_lux_change(old_state, new_state, data.get("caught_up"))
+        finally:
+            self.async_notify_listeners()
+    
+    async def _async_handle_lux_change(
+        self, old_state: Optional[State], new_state: Optional[State], caught_up: Optional[datetime] = None
+    ) -> None:
+        """Run the lux handling for one (coalesced) change.
+        
+        caught_up is the time of the first merged reading that showed the
+        pending brightness change.
+        """
         if not new_state or not old_state:
             return
+        
+        filtered = False
             
         # Check if this was a significant lux change after recent brightness adjustment
-        if self.last_brightness_change_time:
-            from homeassistant.util import dt as dt_util
-            now = dt_util.now()
-            seconds_since_brightness_change = (now - self.last_brightness_change_time).total_seconds()
+        if self.last_brightness_change_time and self._lag_pending:
+            # Timed by the first reading that showed the change - coalescing may
+            # have delayed the handler and merged later readings into this one
+            seconds_since_brightness_change = (
+                (caught_up or new_state.last_updated) - self.last_brightness_change_time
+            ).total_seconds()
+            direction = self.last_brightness_change_direction
             
-            if seconds_since_brightness_change <= self.brightness_cooldown_seconds:
+            if seconds_since_brightness_change > LAG_MAX_SECONDS:
+                self._lag_pending = False
+            else:
                 try:
                     old_lux = float(old_state.state)
                     new_lux = float(new_state.state)
-                    lux_change = abs(new_lux - old_lux)
                     
-                    # If significant lux change (>10 lux) after brightness change, sensor caught up
-                    if lux_change > 10:
+                    # If significant lux change (>10 lux) in the direction of the brightness
+                    # change, the sensor caught up - that delay is the sensor's lag
+                    if caught_up is not None or self._lux_caught_up(old_state, new_state) is not None:
+                        self._lag_pending = False
+                        self.sensor_lag.record(direction, seconds_since_brightness_change)
+                        self.async_schedule_save()
                         _LOGGER.info(
-                            "📈 Lux sensor updated after brightness change: %.1f→%.1f lux (%.1fs delay)",
-                            old_lux, new_lux, seconds_since_brightness_change
+                            "📈 Lux sensor updated after brightness change: %.1f→%.1f lux (%.1fs delay, cooldown now %.1fs)",
+                            old_lux, new_lux, seconds_since_brightness_change, self.cooldown_seconds
                         )
-                        
+                        self._filter_lux_reading()
+                        filtered = True
+                    
+                    if not self._lag_pending and seconds_since_brightness_change <= self.cooldown_seconds:
                         # Consider triggering immediate re-evaluation if deviation still large
                         current_target = self.current_target_lux or self.get_target_lux()
-                        new_deviation = abs(current_target - new_lux)
+                        new_deviation = abs(current_target - (self.lux_estimate or new_lux))
                         
                         if new_deviation > self.deviation_margin * 2:  # Only if large deviation remains
                             _LOGGER.info(
@@ -499,9 +930,70 @@ class SmartLuxCoordinator:
                             # Trigger control if motion still active
                             if self.should_lights_be_on():
                                 await self.async_control_lights()
+                            return
                                 
                 except (ValueError, TypeError):
                     pass  # Invalid lux values, ignore
+        
+        # A reading from before the sensor showed the last brightness change is stale -
+        # the estimate keeps the model's prediction until the sensor catches up
+        if not filtered and not self._lux_reading_stale():
+            self._filter_lux_reading()
+        
+        # Ambient light drifted while the room is occupied - re-evaluate now
+        # instead of waiting for a periodic check
+        if self.should_lights_be_on():
+            estimate = self.lux_estimate
+            if estimate is None:
+                return
+            target_lux = self.get_target_lux()
+            if abs(target_lux - estimate) > self.deviation_margin:
+                await self.async_control_lights()
+            elif abs(target_lux - self.snapshot.lux) > self.deviation_margin:
+                self.noise_suppressed += 1
+                _LOGGER.debug(
+                    "Lux reading %.1f outside tolerance but estimate %.1f is not - no adjustment [%s]",
+                    self.snapshot.lux, estimate, self.room_name
+                )
+    
+    @callback
+    def _filter_lux_reading(self) -> None:
+        """Feed the current lux reading to the estimate."""
+        lux = self.snapshot.lux
+        if lux is None:
+            self.lux_filter.reset()
+        else:
+            self.lux_filter.update(lux, self.hass.loop.time())
+    
+    def _lux_reading_stale(self) -> bool:
+        """Check if the sensor has not shown the last brightness change yet."""
+        if not self._lag_pending or not self.last_brightness_change_time:
+            return False
+        from homeassistant.util import dt as dt_util
+        seconds = (dt_util.now() - self.last_brightness_change_time).total_seconds()
+        return seconds <= self.cooldown_seconds
+    
+    @property
+    def lux_estimate(self) -> Optional[float]:
+        """Filtered lux - the raw reading until the filter has one, None while the sensor is unavailable."""
+        if self.snapshot.lux is None:
+            return None
+        value = self.lux_filter.value
+        return value if value is not None else self.snapshot.lux
+    
+    def _command_lux_change(self, before: RoomSnapshot, brightness: Union[int, Dict[str, int]]) -> Optional[float]:
+        """Lux change the model expects from a brightness command, None without a usable model."""
+        if isinstance(brightness, int):
+            new = [brightness] * len(before.lights)
+        else:
+            new = [brightness.get(light.entity_id, light.effective_brightness) for light in before.lights]
+        
+        if self.is_light_model_active:
+            old = [light.effective_brightness for light in before.lights]
+            return self.predict_light_lux(new) - self.predict_light_lux(old)
+        if self.regression_quality >= self.min_regression_quality and new:
+            return self.regression_a * (sum(new) / len(new) - (before.average_brightness or 0))
+        return None
     
     async def _async_motion_changed(self, event) -> None:
         """Handle motion sensor changes - IMMEDIATE RESPONSE."""
@@ -515,7 +1007,7 @@ class SmartLuxCoordinator:
             return
             
         # Motion detected - turn on lights IMMEDIATELY
-        if new_state.state == "on" and (not old_state or old_state.state == "off"):
+        if new_state.state == "on" and (not old_state or old_state.state != "on"):
             from homeassistant.util import dt as dt_util
             self.last_motion_time = dt_util.now()
             
@@ -525,17 +1017,49 @@ class SmartLuxCoordinator:
             )
             
             # Run light control immediately instead of waiting for next check
-            await self.async_control_lights()
+            if self.latency is None:
+                await self.async_control_lights()
+            else:
+                self.latency.motion(self.hass.loop.time())
+                try:
+                    await self.async_control_lights()
+                finally:
+                    self.latency.motion_handled()
         
-        # Motion stopped - start countdown but don't turn off yet
-        elif new_state.state == "off" and old_state and old_state.state == "on":
+        # Motion stopped - start countdown but don't turn off yet. A sensor going
+        # unavailable or unknown while on counts as stopped, or nothing would
+        # ever schedule the turn-off
+        elif new_state.state != "on" and old_state and old_state.state == "on":
+            from homeassistant.util import dt as dt_util
+            self.last_motion_time = dt_util.now()
+            
             _LOGGER.info(
-                "🚶 Motion stopped in %s - countdown started (%d min)", 
-                self.room_name, self.keep_on_minutes
+                "🚶 Motion stopped in %s (%s) - countdown started (%d min)", 
+                self.room_name, new_state.state, self.keep_on_minutes
             )
+            self._async_reschedule()
+            self.async_notify_listeners()
+    
+    @callback
+    def _async_sun_changed(self, event) -> None:
+        """Handle sun changes - rebuild the target timeline when the sun times move."""
+        new_state = event.data.get("new_state")
+        old_state = event.data.get("old_state")
+        
+        # sun.sun also updates elevation/azimuth every few minutes - ignore those
+        if new_state and old_state and all(
+            new_state.attributes.get(attr) == old_state.attributes.get(attr)
+            for attr in ("next_rising", "next_setting")
+        ):
+            return
+        
+        self._target_timeline = None
+        self._async_reschedule()
     
     async def _async_home_mode_changed(self, event) -> None:
         """Handle home mode changes - UPDATE TARGET LUX."""
+        self._target_timeline = None
+        
         if not self.auto_control_enabled:
             return
             
@@ -562,29 +1086,42 @@ class SmartLuxCoordinator:
                 _LOGGER.info("Triggering immediate light adjustment for new target")
                 await self.async_control_lights()
     
-    async def async_add_sample(self, brightness: float, lux: float) -> None:
-        """Add a sample to the dataset."""
+    async def async_add_sample(
+        self, brightness: float, lux: float, light_brightness: Optional[Sequence[float]] = None
+    ) -> None:
+        """Add a sample to the dataset.
+        
+        light_brightness holds the brightness of every light (0 when off) and
+        also feeds the per-light model. Manual samples only have the average.
+        """
         # Validate data
         if not (0 <= brightness <= 255) or not (0 <= lux <= 10000):
             _LOGGER.warning("Invalid sample data: brightness=%s, lux=%s", brightness, lux)
             return
         
         # Check for duplicates (last 5 samples)
-        recent_samples = self.samples[-5:] if len(self.samples) >= 5 else self.samples
-        for sample_brightness, sample_lux, _ in recent_samples:
-            if abs(sample_brightness - brightness) < 5 and abs(sample_lux - lux) < 10:
+        for sample in self.samples[-5:]:
+            if abs(sample.brightness - brightness) < 5 and abs(sample.lux - lux) < 10:
                 return  # Skip duplicate
         
-        # Add sample
-        timestamp = datetime.now()
-        self.samples.append((brightness, lux, timestamp))
+        # Add sample - the ring buffer evicts the oldest one once full
+        from homeassistant.util import dt as dt_util
+        epoch = int(dt_util.utcnow().timestamp())
+        self._append_sample(brightness, lux, epoch)
+        stored = self.samples[-1]
+        self._journal.async_append(stored.brightness, stored.lux, epoch)
+        
+        # Keep the model exact for the current window - O(1) per sample
+        if len(self.samples) >= 10:
+            self._update_regression()
         
-        # Keep only recent samples
-        if len(self.samples) > self.max_samples:
-            self.samples = self.samples[-self.max_samples:]
+        if light_brightness is not None and len(light_brightness) == len(self.light_entities):
+            self.light_model.add(light_brightness, stored.lux)
+            self._update_light_model()
         
         # Save data
-        await self._async_save_data()
+        self.async_schedule_save()
+        self.async_notify_listeners()
         
         # Fire event
         self.hass.bus.async_fire(EVENT_SAMPLE_ADDED, {
@@ -601,42 +1138,19 @@ class SmartLuxCoordinator:
             await self.async_calculate_regression()
     
     async def async_calculate_regression(self) -> None:
-        """Calculate linear regression from samples."""
+        """Calculate linear regression from samples (O(1) from the running statistics)."""
         if len(self.samples) < 5:
             _LOGGER.warning("Not enough samples for regression: %d", len(self.samples))
             return
         
-        # Filter outliers and prepare data
-        brightness_vals, lux_vals = self._filter_samples()
-        
-        if len(brightness_vals) < 3:
-            _LOGGER.warning("Not enough valid samples after filtering: %d", len(brightness_vals))
-            return
-        
-        # Calculate regression
-        n = len(brightness_vals)
-        x_avg = sum(brightness_vals) / n
-        y_avg = sum(lux_vals) / n
-        
-        numerator = sum((x - x_avg) * (y - y_avg) for x, y in zip(brightness_vals, lux_vals))
-        denominator = sum((x - x_avg) ** 2 for x in brightness_vals)
-        
-        if denominator == 0:
+        if not self._update_regression():
             _LOGGER.warning("Cannot calculate regression: all brightness values are identical")
             return
-        
-        self.regression_a = numerator / denominator
-        self.regression_b = y_avg - self.regression_a * x_avg
-        
-        # Calculate R²
-        y_pred = [self.regression_a * x + self.regression_b for x in brightness_vals]
-        ss_res = sum((y_actual - y_pred) ** 2 for y_actual, y_pred in zip(lux_vals, y_pred))
-        ss_tot = sum((y - y_avg) ** 2 for y in lux_vals)
-        
-        self.regression_quality = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
+        n = self._regression_stats.count
         
         # Save data
-        await self._async_save_data()
+        self.async_schedule_save()
+        self.async_notify_listeners()
         
         # Fire event
         self.hass.bus.async_fire(EVENT_REGRESSION_UPDATED, {
@@ -652,6 +1166,36 @@ class SmartLuxCoordinator:
             self.room_name, self.regression_a, self.regression_b, self.regression_quality, n
         )
     
+    def _append_sample(self, brightness: float, lux: float, epoch: float) -> None:
+        """Store a sample and keep the running statistics in step with the window."""
+        evicted = self.samples.append(brightness, lux, int(epoch))
+        if evicted is not None:
+            self._regression_stats.remove(evicted.brightness, evicted.lux)
+        
+        # Use the stored (float32) values so eviction subtracts exactly what was added
+        stored = self.samples[-1]
+        self._regression_stats.add(stored.brightness, stored.lux)
+        self._model_version += 1
+    
+    def _update_regression(self) -> bool:
+        """Refresh the model from the running statistics. Returns False if it cannot be fitted."""
+        fit = self._regression_stats.fit()
+        if fit is None:
+            return False
+        self.regression_a, self.regression_b, self.regression_quality = fit
+        self._model_version += 1
+        return True
+    
+    def _update_light_model(self) -> None:
+        """Refresh the per-light coefficients from the normal equations."""
+        fit = self.light_model.fit()
+        if fit is None:
+            self.light_weights = None
+            self.light_quality = 0.0
+        else:
+            self.light_weights, self.light_intercept, self.light_quality = fit
+        self._model_version += 1
+    
     def _filter_samples(self) -> Tuple[List[float], List[float]]:
         """Filter samples and remove outliers."""
         if not self.samples:
@@ -661,7 +1205,7 @@ class SmartLuxCoordinator:
         lux_vals = []
         
         # Extract valid samples
-        for brightness, lux, timestamp in self.samples:
+        for brightness, lux in zip(self.samples.brightness_view(), self.samples.lux_view()):
             if 0 <= brightness <= 255 and 0 <= lux <= 10000:
                 brightness_vals.append(brightness)
                 lux_vals.append(lux)
@@ -669,11 +1213,10 @@ class SmartLuxCoordinator:
         if len(brightness_vals) < 8:
             return brightness_vals, lux_vals
         
-        # Remove outliers (more than 2 standard deviations)
-        x_mean = sum(brightness_vals) / len(brightness_vals)
-        y_mean = sum(lux_vals) / len(lux_vals)
-        x_std = math.sqrt(sum((x - x_mean) ** 2 for x in brightness_vals) / len(brightness_vals))
-        y_std = math.sqrt(sum((y - y_mean) ** 2 for y in lux_vals) / len(lux_vals))
+        # Remove outliers (more than 2 standard deviations) - moments come from the running statistics
+        stats = self._regression_stats
+        x_mean, y_mean = stats.mean_x, stats.mean_y
+        x_std, y_std = stats.std_x, stats.std_y
         
         filtered_brightness = []
         filtered_lux = []
@@ -685,13 +1228,45 @@ class SmartLuxCoordinator:
         
         return filtered_brightness, filtered_lux
     
+    @property
+    def model_stats(self) -> ModelStats:
+        """Get the derived model statistics, recomputed once per sample or model change."""
+        stats = self._model_stats
+        if stats is None or stats.version != self._model_version:
+            stats = self._model_stats = self._compute_model_stats()
+        return stats
+    
+    def _compute_model_stats(self) -> ModelStats:
+        """Compute the model statistics for the current samples and model."""
+        brightness_vals, lux_vals = self._filter_samples()
+        a, b = self.regression_a, self.regression_b
+        residuals = [abs(lux - (a * brightness + b)) for brightness, lux in zip(brightness_vals, lux_vals)]
+        recent = residuals[-RECENT_RESIDUALS:]
+        
+        return ModelStats(
+            version=self._model_version,
+            sample_count=len(self.samples),
+            filtered_count=len(residuals),
+            outlier_count=len(self.samples) - len(residuals),
+            residual_mean=sum(residuals) / len(residuals) if residuals else None,
+            residual_max=max(residuals) if residuals else None,
+            recent_residual_mean=sum(recent) / len(recent) if recent else None,
+            quality_bucket=quality_bucket(self.regression_quality),
+            last_sample_time=self.samples[-1].timestamp if self.samples else None,
+        )
+    
     async def async_clear_samples(self) -> None:
         """Clear all samples."""
         self.samples.clear()
+        await self._journal.async_reset()
+        self._regression_stats.reset()
         self.regression_a = 1.0
         self.regression_b = 0.0
         self.regression_quality = 0.0
-        await self._async_save_data()
+        self.light_model.reset()
+        self._update_light_model()
+        self.async_schedule_save()
+        self.async_notify_listeners()
         
         _LOGGER.info("Cleared all samples for room: %s", self.room_name)
     
@@ -702,18 +1277,12 @@ class SmartLuxCoordinator:
             return
         
         # Analyze prediction errors
-        brightness_vals, lux_vals = self._filter_samples()
-        if len(brightness_vals) < 10:
+        stats = self.model_stats
+        if stats.filtered_count < 10:
             return
         
-        errors = []
-        for brightness, lux in zip(brightness_vals, lux_vals):
-            predicted_lux = self.regression_a * brightness + self.regression_b
-            error = abs(lux - predicted_lux)
-            errors.append(error)
-        
-        average_error = sum(errors) / len(errors)
-        max_error = max(errors)
+        average_error = stats.residual_mean
+        max_error = stats.residual_max
         
         # Decide if update is needed
         should_update = False
@@ -729,10 +1298,13 @@ class SmartLuxCoordinator:
             return
         
         # Perform weighted regression (newer samples have more weight)
-        now = datetime.now()
+        brightness_vals, lux_vals = self._filter_samples()
+        from homeassistant.util import dt as dt_util
+        now_ts = dt_util.utcnow().timestamp()
+        epochs = self.samples.epoch_view()
         weights = []
-        for _, _, timestamp in [(brightness_vals[i], lux_vals[i], self.samples[i][2]) for i in range(len(brightness_vals))]:
-            age_hours = (now - timestamp).total_seconds() / 3600
+        for i in range(len(brightness_vals)):
+            age_hours = (now_ts - epochs[i]) / 3600
             weight = math.exp(-age_hours / 24.0)  # Half-life of 24 hours
             weights.append(weight)
         
@@ -750,9 +1322,11 @@ class SmartLuxCoordinator:
         self.regression_a = old_a * (1 - self.learning_rate) + new_a * self.learning_rate
         self.regression_b = old_b * (1 - self.learning_rate) + new_b * self.learning_rate
         self.regression_quality = new_quality
+        self._model_version += 1
         
         # Save data
-        await self._async_save_data()
+        self.async_schedule_save()
+        self.async_notify_listeners()
         
         improvement = new_quality - old_quality
         _LOGGER.info(
@@ -797,16 +1371,11 @@ class SmartLuxCoordinator:
         """Calculate target brightness for desired lux level."""
         if self.regression_quality < self.min_regression_quality or self.regression_a == 0:
             # Fallback: proportional calculation
-            current_lux_state = self.hass.states.get(self.lux_sensor)
-            if current_lux_state and current_lux_state.state not in ("unknown", "unavailable"):
-                try:
-                    current_lux = float(current_lux_state.state)
-                    if current_lux > 0:
-                        ratio = target_lux / current_lux
-                        calculated = current_brightness * ratio
-                        return max(1, min(int(calculated), 255))
-                except ValueError:
-                    pass
+            current_lux = self.lux_estimate
+            if current_lux is not None and current_lux > 0:
+                ratio = target_lux / current_lux
+                calculated = current_brightness * ratio
+                return max(1, min(int(calculated), 255))
             return current_brightness
         
         # Use regression: lux = a * brightness + b, so brightness = (lux - b) / a
@@ -823,19 +1392,150 @@ class SmartLuxCoordinator:
         
         return max(1, min(target, 255))
     
+    def calculate_light_brightness(self, target_lux: float, measured_lux: Optional[float] = None) -> Dict[str, int]:
+        """Calculate a brightness per light for the desired lux level (per-light model).
+        
+        Takes the smallest change from the current brightness that reaches the
+        target, each light limited to max_brightness_change per step. With
+        measured_lux the intercept is moved so the model matches the measurement
+        at the current brightness - only the light weights are trusted.
+        """
+        current = [light.effective_brightness for light in self.snapshot.lights]
+        low = [max(1, value - self.max_brightness_change) for value in current]
+        high = [min(255, value + self.max_brightness_change) for value in current]
+        intercept = self.light_intercept
+        if measured_lux is not None:
+            intercept += measured_lux - self.predict_light_lux(current)
+        targets = solve_brightness(self.light_weights, intercept, target_lux, current, low, high)
+        return {
+            entity_id: max(1, min(round(value), 255))
+            for entity_id, value in zip(self.light_entities, targets)
+        }
+    
+    def _pi_brightness(self, target_lux: float, current_lux: float) -> Tuple[Union[int, Dict[str, int]], int]:
+        """Get the feedforward + PI output and its saturation - one brightness per light with the per-light model.
+        
+        The caller reports the saturation to the controller once the output was sent.
+        """
+        step = self.pi_max_step
+        if self.is_light_model_active:
+            current = [light.effective_brightness for light in self.snapshot.lights]
+            aim = self.controller.aim(target_lux, current_lux, self.predict_light_lux(current))
+            low = [max(1, value - step) for value in current]
+            high = [min(255, value + step) for value in current]
+            targets = solve_brightness(self.light_weights, self.light_intercept, aim, current, low, high)
+            brightness: Union[int, Dict[str, int]] = {
+                entity_id: max(1, min(round(value), 255))
+                for entity_id, value in zip(self.light_entities, targets)
+            }
+            reached = self.predict_light_lux(list(brightness.values()))
+        else:
+            a, b = self.regression_a, self.regression_b
+            current_brightness = self.snapshot.average_brightness or 0
+            if a <= 0:
+                # A flat or falling model cannot be inverted - keep the brightness, the caller steps instead
+                return int(round(current_brightness)), 0
+            aim = self.controller.aim(target_lux, current_lux, a * current_brightness + b)
+            low = max(1, current_brightness - step)
+            high = min(255, current_brightness + step)
+            brightness = int(round(max(low, min((aim - b) / a, high))))
+            reached = a * brightness + b
+        
+        # Output held back by the range or rate limit - freezes the integral (anti-windup)
+        if aim - reached > self.deviation_margin:
+            saturation = 1
+        elif reached - aim > self.deviation_margin:
+            saturation = -1
+        else:
+            saturation = 0
+        
+        _LOGGER.debug(
+            "PI control [%s]: target=%.1f, measured=%.1f, aim=%.1f, integral=%.1f, saturation=%d",
+            self.room_name, target_lux, current_lux, aim, self.controller.integral, saturation
+        )
+        return brightness, saturation
+    
+    def predict_target_brightness(
+        self,
+        target_luxes: List[float],
+        current_brightness: float = 255,
+        confidence: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Calculate target brightness for several lux levels in one pass.
+        
+        Same rules as calculate_target_brightness. With a confidence level and
+        a regression model, each prediction also gets the range around
+        model_brightness that reaches the target lux at that confidence
+        (inverse prediction interval).
+        """
+        predictions: List[Dict[str, Any]] = []
+        
+        if self.regression_quality < self.min_regression_quality or self.regression_a == 0:
+            # Fallback: proportional to the current lux reading
+            current_lux = self.lux_estimate
+            for target_lux in target_luxes:
+                if current_lux is not None and current_lux > 0:
+                    brightness = max(1, min(int(current_brightness * target_lux / current_lux), 255))
+                else:
+                    brightness = int(current_brightness)
+                predictions.append({"target_lux": target_lux, "brightness": brightness})
+            return {"model": "fallback", "predictions": predictions}
+        
+        a, b = self.regression_a, self.regression_b
+        low_limit = current_brightness - self.max_brightness_change
+        high_limit = current_brightness + self.max_brightness_change
+        
+        stats = self._regression_stats
+        residual_std = None
+        t = None
+        if confidence is not None and stats.m2_x > 0:
+            residual_std = stats.residual_std(a, b)
+            t = t_quantile(confidence, stats.count - 2)
+        
+        for target_lux in target_luxes:
+            calculated = (target_lux - b) / a
+            target = max(1, min(int(calculated), 255))
+            # Limit change size - model_brightness is where the model would go in one step
+            brightness = int(max(1, min(max(low_limit, min(target, high_limit)), 255)))
+            prediction = {"target_lux": target_lux, "brightness": brightness, "model_brightness": target}
+            
+            if residual_std is not None:
+                halfwidth = stats.inverse_prediction_halfwidth(a, calculated, residual_std, t)
+                prediction["brightness_low"] = max(0, min(int(calculated - halfwidth), 255))
+                prediction["brightness_high"] = max(0, min(math.ceil(calculated + halfwidth), 255))
+            predictions.append(prediction)
+        
+        result = {"model": "regression", "predictions": predictions}
+        if residual_std is not None:
+            result["confidence"] = confidence
+            result["residual_std"] = residual_std
+        return result
+    
     def get_target_lux(self) -> float:
         """Get target lux based on current home mode and time."""
-        if self.home_mode_select:
-            mode_state = self.hass.states.get(self.home_mode_select)
-            if mode_state and mode_state.state in self.lux_settings:
-                return float(self.lux_settings[mode_state.state])
+        from homeassistant.util import dt as dt_util
+        
+        now = dt_util.now()
+        return self._get_target_timeline(now).value_at(now.timestamp())
+    
+    def _get_target_timeline(self, now: datetime) -> TargetLuxTimeline:
+        """Get the cached target timeline, building it if needed."""
+        timeline = self._target_timeline
+        if timeline is None or not timeline.covers(now.timestamp()):
+            timeline = self._target_timeline = self._build_target_timeline(now)
+        return timeline
+    
+    def _build_target_timeline(self, now: datetime) -> TargetLuxTimeline:
+        """Build the target timeline from the home mode and sun.sun."""
+        mode = self.snapshot.mode
+        if mode in self.lux_settings:
+            return TargetLuxTimeline.constant(self.lux_settings[mode])
         
         # Default: time-based normal mode with sunrise/sunset logic
-        from homeassistant.helpers import sun
         from homeassistant.util import dt as dt_util
         
-        now = dt_util.now()
-        now_ts = now.timestamp()
+        lux_day = float(self.lux_settings["normal_day"])
+        lux_night = float(self.lux_settings["normal_night"])
         
         # Get sunrise/sunset times
         sun_state = self.hass.states.get("sun.sun")
@@ -847,51 +1547,54 @@ class SmartLuxCoordinator:
                 try:
                     sunrise_dt = dt_util.parse_datetime(sunrise)
                     sunset_dt = dt_util.parse_datetime(sunset)
-                    if sunrise_dt and sunset_dt:
-                        sunrise_ts = sunrise_dt.timestamp() - 86400  # Previous sunrise
-                        sunset_ts = sunset_dt.timestamp()
-                    else:
-                        raise ValueError("Could not parse datetime")
                 except (ValueError, AttributeError):
-                    # Fallback to simple hour-based logic
-                    if 6 <= now.hour <= 22:
-                        return float(self.lux_settings["normal_day"])
-                    else:
-                        return float(self.lux_settings["normal_night"])
+                    sunrise_dt = sunset_dt = None
                 
-                # Calculate with buffer
-                buffer_seconds = self.buffer_minutes * 60
-                
-                # Day/night transition logic
-                if sunrise_ts <= now_ts < (sunrise_ts + buffer_seconds):
-                    # Sunrise transition
-                    ratio = (now_ts - sunrise_ts) / buffer_seconds
-                    lux_day = float(self.lux_settings["normal_day"])
-                    lux_night = float(self.lux_settings["normal_night"])
-                    return lux_night + (lux_day - lux_night) * ratio
-                elif (sunset_ts - buffer_seconds) < now_ts <= sunset_ts:
-                    # Sunset transition
-                    ratio = 1 - ((now_ts - (sunset_ts - buffer_seconds)) / buffer_seconds)
-                    lux_day = float(self.lux_settings["normal_day"])
-                    lux_night = float(self.lux_settings["normal_night"])
-                    return lux_night + (lux_day - lux_night) * ratio
-                elif sunrise_ts + buffer_seconds <= now_ts < (sunset_ts - buffer_seconds):
-                    # Full day
-                    return float(self.lux_settings["normal_day"])
-                else:
-                    # Full night
-                    return float(self.lux_settings["normal_night"])
+                if sunrise_dt and sunset_dt:
+                    return TargetLuxTimeline.from_sun(
+                        sunrise_dt.timestamp(),
+                        sunset_dt.timestamp(),
+                        self.buffer_minutes * 60,
+                        lux_day,
+                        lux_night,
+                    )
         
         # Fallback: simple hour-based logic
-        if 6 <= now.hour <= 22:
-            return float(self.lux_settings["normal_day"])
-        else:
-            return float(self.lux_settings["normal_night"])
+        return TargetLuxTimeline.from_hours(now, lux_day, lux_night)
+    
+    def _get_next_target_change(self, now: datetime) -> Optional[datetime]:
+        """Get the next moment get_target_lux() will return a different value.
+        
+        Inside a sunrise/sunset ramp the target changes continuously, so the
+        ramp is followed in check_interval steps.
+        """
+        from homeassistant.util import dt as dt_util
+        
+        timeline = self._get_target_timeline(now)
+        next_ts = timeline.next_change(now.timestamp(), self.check_interval)
+        if next_ts is None or next_ts >= timeline.valid_until:
+            # Hour-based timeline expires at midnight - re-evaluate then
+            next_ts = timeline.valid_until if timeline.valid_until != float("inf") else None
+        
+        return dt_util.utc_from_timestamp(next_ts) if next_ts is not None else None
     
     @property
     def is_smart_mode_active(self) -> bool:
         """Check if smart mode is active."""
-        return self.regression_quality >= self.min_regression_quality
+        return self.regression_quality >= self.min_regression_quality or self.is_light_model_active
+    
+    @property
+    def is_light_model_active(self) -> bool:
+        """Check if the per-light model is good enough to control a multi-light room."""
+        return (
+            len(self.light_entities) > 1
+            and self.light_weights is not None
+            and self.light_quality >= self.min_regression_quality
+        )
+    
+    def predict_light_lux(self, brightness: Sequence[float]) -> float:
+        """Lux the per-light model expects for one brightness per light."""
+        return sum(w * b for w, b in zip(self.light_weights, brightness)) + self.light_intercept
     
     @property
     def sample_count(self) -> int:
@@ -901,27 +1604,27 @@ class SmartLuxCoordinator:
     @property
     def predicted_lux(self) -> Optional[float]:
         """Get predicted lux for current brightness."""
+        # The filtered estimate already combines the model with the sensor
+        if self.lux_filter.value is not None and self.snapshot.lux is not None:
+            return self.lux_filter.value
+        
+        if self.is_light_model_active:
+            snapshot = self.snapshot
+            if not snapshot.lights_on:
+                return None
+            return self.predict_light_lux([light.effective_brightness for light in snapshot.lights])
+        
         # If no regression model yet, return None
         if self.regression_quality < 0.1 or self.regression_a == 0:
             return None
             
-        # Get average brightness from all controlled lights
-        total_brightness = 0
-        light_count = 0
-        
-        for light_entity in self.light_entities:
-            light_state = self.hass.states.get(light_entity)
-            if light_state and light_state.state == "on":
-                brightness = light_state.attributes.get("brightness")
-                if brightness is not None:
-                    total_brightness += brightness
-                    light_count += 1
+        # Average brightness of the lights that report one
+        avg_brightness = self.snapshot.average_reported_brightness
         
         # If no lights are on, can't predict lux from lights
-        if light_count == 0:
+        if avg_brightness is None:
             return None
         
-        avg_brightness = total_brightness / light_count
         return self.regression_a * avg_brightness + self.regression_b
     
     def should_lights_be_on(self) -> bool:
@@ -930,39 +1633,30 @@ class SmartLuxCoordinator:
             return False
         
         # Check motion sensor
-        motion_state = self.hass.states.get(self.motion_sensor)
-        if not motion_state:
+        snapshot = self.snapshot
+        if snapshot.motion is None:
             return False
         
         from homeassistant.util import dt as dt_util
         now = dt_util.now()
         
         # If motion is currently detected
-        if motion_state.state == "on":
+        if snapshot.motion_detected:
             self.last_motion_time = now
             return True
         
         # Check if motion was recent enough
         if self.last_motion_time:
             time_since_motion = (now - self.last_motion_time).total_seconds() / 60
-            return time_since_motion <= self.keep_on_minutes
+            return time_since_motion < self.keep_on_minutes
         
         return False
     
     def get_current_brightness(self) -> int:
         """Get average current brightness of controlled lights."""
-        total_brightness = 0
-        light_count = 0
-        
-        for light_entity in self.light_entities:
-            light_state = self.hass.states.get(light_entity)
-            if light_state and light_state.state == "on":
-                brightness = light_state.attributes.get("brightness", 255)
-                total_brightness += brightness
-                light_count += 1
-        
-        if light_count > 0:
-            return int(total_brightness / light_count)
+        avg_brightness = self.snapshot.average_brightness
+        if avg_brightness is not None:
+            return int(avg_brightness)
         else:
             # No lights are on - return 1 so system knows to turn them on!
             # (not 255 which would make system think lights are already bright)
@@ -970,12 +1664,26 @@ class SmartLuxCoordinator:
     
     async def async_control_lights(self) -> None:
         """Main automation logic - control lights based on conditions."""
+        try:
+            # One pass at a time - a lux change arriving while a command is being
+            # verified waits for it and then sees the cooldown it started
+            async with self._control_lock:
+                await self._async_control_lights()
+        finally:
+            self._async_reschedule()
+            self.async_notify_listeners()
+    
+    async def _async_control_lights(self) -> None:
+        """Run one control pass."""
         if not self.auto_control_enabled:
             return
         
         should_be_on = self.should_lights_be_on()
         
         if not should_be_on:
+            self.convergence.abandon()
+            self._reset_fallback_step()
+            self.controller.reset()
             # Turn off lights if they were controlled by automation
             if self.lights_controlled_by_automation:
                 await self._async_turn_off_lights()
@@ -987,14 +1695,9 @@ class SmartLuxCoordinator:
         target_lux = self.get_target_lux()
         self.current_target_lux = target_lux
         
-        # Get current lux reading
-        lux_state = self.hass.states.get(self.lux_sensor)
-        if not lux_state or lux_state.state in ("unknown", "unavailable"):
-            return
-        
-        try:
-            current_lux = float(lux_state.state)
-        except ValueError:
+        # Get the filtered lux estimate
+        current_lux = self.lux_estimate
+        if current_lux is None:
             return
         
         deviation = target_lux - current_lux
@@ -1005,11 +1708,12 @@ class SmartLuxCoordinator:
         
         if self.last_brightness_change_time:
             seconds_since_change = (now - self.last_brightness_change_time).total_seconds()
-            if seconds_since_change < self.brightness_cooldown_seconds:
+            cooldown = self.cooldown_seconds
+            if seconds_since_change < cooldown:
                 self.last_automation_action = f"cooldown_wait_{seconds_since_change:.1f}s"
                 _LOGGER.info(
-                    "⏳ Brightness changed %.1fs ago, waiting for lux sensor to update (cooldown: %ds)",
-                    seconds_since_change, self.brightness_cooldown_seconds
+                    "⏳ Brightness changed %.1fs ago, waiting for lux sensor to update (cooldown: %.1fs)",
+                    seconds_since_change, cooldown
                 )
                 return
         
@@ -1022,46 +1726,114 @@ class SmartLuxCoordinator:
         # Check if adjustment is needed
         if abs(deviation) <= self.deviation_margin:
             self.last_automation_action = "within_tolerance"
+            self.convergence.settled(self.hass.loop.time())
+            self._reset_fallback_step()
+            if abs(target_lux - self.snapshot.lux) > self.deviation_margin:
+                self.noise_suppressed += 1
             _LOGGER.debug("Within tolerance - no adjustment needed")
             return
         
         # Calculate target brightness
         current_brightness = self.get_current_brightness()
         
-        if self._smart_mode_enabled and self.is_smart_mode_active:
+        light_targets: Optional[Dict[str, int]] = None
+        if self._smart_mode_enabled and self.is_smart_mode_active and self.controller_type == CONTROLLER_PI:
+            # Feedforward from the model plus a PI correction on the lux error
+            brightness, saturation = self._pi_brightness(target_lux, current_lux)
+            if isinstance(brightness, dict):
+                light_targets = brightness
+                target_brightness = round(sum(light_targets.values()) / len(light_targets))
+                mode = "per_light_pi"
+            else:
+                target_brightness = brightness
+                mode = "smart_pi"
+        elif self._smart_mode_enabled and self.is_light_model_active:
+            # Smart mode with the per-light model: one brightness per light
+            light_targets = self.calculate_light_brightness(target_lux)
+            target_brightness = round(sum(light_targets.values()) / len(light_targets))
+            mode = "per_light"
+        elif self._smart_mode_enabled and self.is_smart_mode_active:
             # Smart mode: use regression
             target_brightness = self.calculate_target_brightness(target_lux, current_brightness)
             mode = "smart"
         else:
             # Fallback mode: step adjustment
-            if deviation > 0:
-                target_brightness = min(current_brightness + 30, 255)
-            else:
-                target_brightness = max(current_brightness - 30, 1)
+            target_brightness = self._step_brightness(current_brightness, deviation)
             mode = "fallback"
         
+        command: Union[int, Dict[str, int]] = light_targets if light_targets is not None else target_brightness
+        if not self._command_changes(command) and mode == "per_light":
+            # The model says the lights already give the target lux but the sensor disagrees -
+            # its intercept is stale (daylight moved), so solve for the measured error instead
+            light_targets = self.calculate_light_brightness(target_lux, current_lux)
+            target_brightness = round(sum(light_targets.values()) / len(light_targets))
+            command = light_targets
+            mode = "per_light_correction"
+        if not self._command_changes(command) and mode != "fallback":
+            # Still no change - step towards the target instead of resending the same brightness
+            light_targets = None
+            target_brightness = self._step_brightness(current_brightness, deviation)
+            command = target_brightness
+            mode = "fallback"
+        if not self._command_changes(command):
+            # At the brightness limit - nothing to send, no adjustment cycle and no new cooldown
+            self.last_automation_action = f"brightness_limit_{current_brightness}_for_{target_lux:.1f}lx"
+            _LOGGER.debug("Lights already at the limit for %.1f lx - no command sent", target_lux)
+            return
+        
+        # Record the brightness change for cooldown tracking before sending it - lux
+        # readings handled while the command is verified must see it pending
+        from homeassistant.util import dt as dt_util
+        previous_change = (
+            self.last_brightness_change_time,
+            self.last_brightness_change_value,
+            self.last_brightness_change_direction,
+            self._lag_pending,
+        )
+        self.last_brightness_change_time = dt_util.now()
+        self.last_brightness_change_value = target_brightness
+        self.last_brightness_change_direction = "up" if deviation > 0 else "down"
+        self._lag_pending = True
+        self._lag_verified_time = None
+        
+        # The estimate moves by the expected change once, now - readings handled
+        # while the command is verified are stale and must not add it again
+        self.lux_filter.command(self._command_lux_change(self.snapshot, command), self.hass.loop.time())
+        
         # Apply brightness change with verification
-        brightness_change_successful = await self._async_set_brightness(target_brightness)
+        brightness_change_successful = await self._async_set_brightness(command)
         
         if brightness_change_successful:
+            self._lag_verified_time = dt_util.now()
             self.lights_controlled_by_automation = True
-            
-            # Record brightness change for cooldown tracking
-            from homeassistant.util import dt as dt_util
-            self.last_brightness_change_time = dt_util.now()
-            self.last_brightness_change_value = target_brightness
+            self.convergence.adjusted(mode, self.hass.loop.time())
+            if mode in ("smart_pi", "per_light_pi"):
+                # Only a sent PI output closes the loop - a step or per-light correction sent instead does not
+                self.controller.applied(saturation)
             
             _LOGGER.info(
-                "✅ Brightness change successful - cooldown active for %ds (lux sensor lag protection)",
-                self.brightness_cooldown_seconds
+                "✅ Brightness change successful - cooldown active for %.1fs (lux sensor lag protection)",
+                self.cooldown_seconds
             )
         else:
             _LOGGER.error("❌ Brightness change failed - lights may not be responding")
-            # Don't set automation flag if lights didn't respond
+            # Don't set automation flag or start a cooldown if lights didn't respond
+            (
+                self.last_brightness_change_time,
+                self.last_brightness_change_value,
+                self.last_brightness_change_direction,
+                self._lag_pending,
+            ) = previous_change
+            # Nothing changed - start the estimate over from the current reading
+            self.lux_filter.reset()
+            self._filter_lux_reading()
             return
         
         # Update predicted lux for sensors
-        self.current_predicted_lux = self.regression_a * target_brightness + self.regression_b
+        if light_targets is not None:
+            self.current_predicted_lux = self.predict_light_lux(list(light_targets.values()))
+        else:
+            self.current_predicted_lux = self.regression_a * target_brightness + self.regression_b
         
         # Log action
         self.last_automation_action = f"{mode}_{current_brightness}→{target_brightness}_for_{target_lux:.1f}lx"
@@ -1076,167 +1848,404 @@ class SmartLuxCoordinator:
             current_brightness, target_brightness, self.regression_quality
         )
     
+    def _step_brightness(self, current_brightness: int, deviation: float) -> int:
+        """Get the fallback step towards the target.
+        
+        The step is halved each time the deviation changes sign, so the room
+        settles within the margin instead of jumping around the target.
+        """
+        direction = 1 if deviation > 0 else -1
+        if self._fallback_direction and direction != self._fallback_direction:
+            self._fallback_step = max(FALLBACK_MIN_STEP, self._fallback_step // 2)
+        self._fallback_direction = direction
+        return max(1, min(current_brightness + direction * self._fallback_step, 255))
+    
+    def _reset_fallback_step(self) -> None:
+        """Start the next episode with the full fallback step."""
+        self._fallback_step = FALLBACK_STEP
+        self._fallback_direction = 0
+    
+    def _command_changes(self, brightness: Union[int, Dict[str, int]]) -> bool:
+        """Check if a brightness command would change any existing light."""
+        for light in self.snapshot.lights:
+            if light.state is None:
+                continue
+            value = brightness if isinstance(brightness, int) else brightness.get(light.entity_id)
+            if value is not None and value != light.effective_brightness:
+                return True
+        return False
+    
     async def _async_turn_off_lights(self) -> None:
         """Turn off controlled lights."""
-        for light_entity in self.light_entities:
-            await self.hass.services.async_call(
-                "light", "turn_off",
-                {"entity_id": light_entity},
-                blocking=True
-            )
-    
-    async def _async_set_brightness(self, brightness: int) -> bool:
-        """Set brightness for controlled lights. Returns True if successful."""
-        success_count = 0
+        entity_ids = list(self.snapshot.existing_lights)
+        if not entity_ids:
+            return
         
-        for light_entity in self.light_entities:
+        try:
+            turned_off = await self._async_call_and_verify(
+                "turn_off", entity_ids, {}, lambda state: state is not None and state.state == "off"
+            )
+        except Exception as err:
+            # Every light gets its own call below
+            _LOGGER.error("Error turning off lights for %s: %s", self.room_name, err)
+            turned_off = set()
+        
+        # Only lights that did not follow the room-wide command get a unicast retry
+        for light_entity in entity_ids:
+            if light_entity in turned_off:
+                continue
+            _LOGGER.debug("Light %s did not turn off with the room, retrying individually", light_entity)
             try:
-                # Get current state before change
-                current_state = self.hass.states.get(light_entity)
-                if not current_state:
-                    _LOGGER.warning("Light entity %s not found", light_entity)
-                    continue
-                
-                _LOGGER.debug(
-                    "Setting brightness %d for %s (current: %s)", 
-                    brightness, light_entity, current_state.state
-                )
-                
-                # Call light service
-                await self.hass.services.async_call(
-                    "light", "turn_on",
-                    {
-                        "entity_id": light_entity,
-                        "brightness": brightness,
-                        "transition": 2
-                    },
-                    blocking=True
-                )
-                
-                # Wait and retry state verification (some integrations are slow)
-                state_verified = False
-                for attempt in range(5):  # Try 5 times over 3 seconds
-                    wait_time = 0.6 + (attempt * 0.4)  # 0.6, 1.0, 1.4, 1.8, 2.2 seconds
-                    await asyncio.sleep(wait_time)
-                    
-                    # Get fresh state
-                    new_state = self.hass.states.get(light_entity)
-                    
-                    _LOGGER.debug(
-                        "Attempt %d/%d: Light %s state=%s, brightness=%s",
-                        attempt + 1, 5, light_entity,
-                        new_state.state if new_state else "None",
-                        new_state.attributes.get("brightness", "N/A") if new_state else "N/A"
-                    )
-                    
-                    if new_state and new_state.state == "on":
-                        new_brightness = new_state.attributes.get("brightness", 255)
-                        brightness_diff = abs(new_brightness - brightness)
-                        
-                        if brightness_diff <= 15:  # Allow more tolerance for slow updates
-                            success_count += 1
-                            state_verified = True
-                            _LOGGER.info(
-                                "✅ Light %s brightness verified after %.1fs: %d → %d (diff: %d)", 
-                                light_entity, wait_time, brightness, new_brightness, brightness_diff
-                            )
-                            break
-                        elif attempt == 4:  # Last attempt
-                            _LOGGER.warning(
-                                "⚠️ Light %s brightness mismatch after retries: requested %d, got %d", 
-                                light_entity, brightness, new_brightness
-                            )
-                            # Still count as partial success if light is on
-                            success_count += 0.5
-                            state_verified = True
-                    elif attempt == 4:  # Last attempt and still not on
-                        _LOGGER.error(
-                            "❌ Light %s failed to turn on after %.1fs (state: %s)", 
-                            light_entity, wait_time, new_state.state if new_state else "unknown"
-                        )
-                
-                if not state_verified:
-                    _LOGGER.error(
-                        "🔴 Light %s state verification failed - check integration responsiveness",
-                        light_entity
+                self.service_calls_saved -= 1
+                async with self._actuation_semaphore:
+                    await self.hass.services.async_call(
+                        "light", "turn_off",
+                        {"entity_id": light_entity},
+                        blocking=True
                     )
-                    
             except Exception as err:
-                _LOGGER.error(
-                    "Error setting brightness for %s: %s", 
-                    light_entity, err
-                )
+                _LOGGER.error("Error turning off %s: %s", light_entity, err)
+    
+    async def _async_set_brightness(self, brightness: Union[int, Dict[str, int]]) -> bool:
+        """Set brightness for controlled lights - one value for all or one per light.
+        
+        Returns True if successful.
+        """
+        targets: Dict[str, int] = {}
+        for light in self.snapshot.lights:
+            if light.state is None:
+                _LOGGER.warning("Light entity %s not found", light.entity_id)
+                continue
+            value = brightness if isinstance(brightness, int) else brightness.get(light.entity_id)
+            if value is None:
+                continue
+            _LOGGER.debug(
+                "Setting brightness %d for %s (current: %s)", 
+                value, light.entity_id, light.state
+            )
+            targets[light.entity_id] = value
+        
+        # One command per distinct brightness (the whole room when all match), verified per light
+        groups: Dict[int, List[str]] = {}
+        for entity_id, value in targets.items():
+            groups.setdefault(value, []).append(entity_id)
+        verified: set = set()
+        for group_verified in await asyncio.gather(
+            *(self._async_set_group_brightness(entity_ids, value) for value, entity_ids in groups.items())
+        ):
+            verified |= group_verified
+        
+        # Lights that drifted fall back to individual, concurrent commands - room
+        # latency stays bounded by the slowest lamp instead of the sum of all lamps
+        drifted = [e for e in targets if e not in verified]
+        if drifted:
+            _LOGGER.debug("Retrying %d drifted lights individually: %s", len(drifted), drifted)
+            self.service_calls_saved -= len(drifted)
+        results = await asyncio.gather(
+            *(self._async_set_light_brightness_limited(light_entity, targets[light_entity])
+              for light_entity in drifted)
+        )
+        success_count = len(verified) + sum(results)
         
         success_rate = success_count / len(self.light_entities) if self.light_entities else 0
         
         # Log final summary with entity states for user visibility
         _LOGGER.info(
-            "🔧 Brightness change summary for %s: %.1f/%d lights successful (%.0f%%)", 
-            self.room_name, success_count, len(self.light_entities), success_rate * 100
+            "🔧 Brightness change summary for %s: %.1f/%d lights successful (%.0f%%, %d service calls saved)", 
+            self.room_name, success_count, len(self.light_entities), success_rate * 100,
+            self.service_calls_saved
         )
         
         # Log current entity states for troubleshooting
-        for light_entity in self.light_entities:
-            current_state = self.hass.states.get(light_entity)
-            if current_state:
-                brightness = current_state.attributes.get("brightness", "N/A")
+        for light in self.snapshot.lights:
+            if light.state is not None:
                 _LOGGER.info(
                     "💡 Final state %s: state=%s, brightness=%s", 
-                    light_entity, current_state.state, brightness
+                    light.entity_id, light.state, light.brightness if light.brightness is not None else "N/A"
                 )
             else:
-                _LOGGER.warning("💡 Final state %s: entity not found", light_entity)
+                _LOGGER.warning("💡 Final state %s: entity not found", light.entity_id)
         
         return success_count > 0  # At least one light responded
     
-    async def _async_start_automation_task(self) -> None:
-        """Start the automation background task."""
-        if self._automation_task and not self._automation_task.done():
-            return
-        
-        _LOGGER.info("Starting automation task for room: %s", self.room_name)
-        self._automation_task = asyncio.create_task(self._async_automation_loop())
+    async def _async_set_group_brightness(self, entity_ids: List[str], brightness: int) -> set:
+        """Send one brightness command to a set of lights. Returns the lights that settled."""
+        try:
+            async with self._actuation_semaphore:
+                return await self._async_call_and_verify(
+                    "turn_on",
+                    entity_ids,
+                    {"brightness": brightness, "transition": LIGHT_TRANSITION_SECONDS},
+                    lambda state: self._brightness_matches(state, brightness),
+                )
+        except Exception as err:
+            _LOGGER.error("Error setting brightness for %s: %s", self.room_name, err)
+            return set()
     
-    async def _async_automation_loop(self) -> None:
-        """Background task that runs light control automation."""
-        while True:
-            try:
-                if self.auto_control_enabled:
-                    # Background check - mainly for turning off lights after timer
-                    # Immediate response is now handled by motion sensor trigger
-                    await self.async_control_lights()
-                
-                # Check more frequently when lights are on or motion was recent
-                if self.lights_controlled_by_automation or self.should_lights_be_on():
-                    # Active state - check more often
-                    sleep_time = min(self.check_interval, 20)
-                else:
-                    # Idle state - check less often to save resources
-                    sleep_time = max(self.check_interval * 2, 60)
-                    
-                await asyncio.sleep(sleep_time)
+    async def _async_set_light_brightness_limited(self, light_entity: str, brightness: int) -> float:
+        """Set brightness for a single light, respecting the room concurrency cap."""
+        async with self._actuation_semaphore:
+            return await self._async_set_light_brightness(light_entity, brightness)
+    
+    async def _async_set_light_brightness(self, light_entity: str, brightness: int) -> float:
+        """Set and verify brightness for a single light.
+        
+        Returns 1.0 if verified, 0.5 if the light is on with a brightness mismatch
+        and 0.0 if it did not respond.
+        """
+        try:
+            started = self.hass.loop.time()
+            verified = await self._async_call_and_verify(
+                "turn_on",
+                [light_entity],
+                {"brightness": brightness, "transition": LIGHT_TRANSITION_SECONDS},
+                lambda state: self._brightness_matches(state, brightness),
+            )
+            elapsed = self.hass.loop.time() - started
+            
+            new_state = self.hass.states.get(light_entity)
+            if light_entity in verified:
+                new_brightness = new_state.attributes.get("brightness", 255) if new_state else brightness
+                _LOGGER.info(
+                    "✅ Light %s brightness verified after %.2fs: %d → %d (diff: %d)", 
+                    light_entity, elapsed, brightness, new_brightness, abs(new_brightness - brightness)
+                )
+                return 1.0
+            
+            if new_state and new_state.state == "on":
+                _LOGGER.warning(
+                    "⚠️ Light %s brightness mismatch after %.1fs: requested %d, got %s", 
+                    light_entity, elapsed, brightness, new_state.attributes.get("brightness", 255)
+                )
+                # Still count as partial success if light is on
+                return 0.5
+            
+            _LOGGER.error(
+                "❌ Light %s failed to turn on after %.1fs (state: %s) - check integration responsiveness", 
+                light_entity, elapsed, new_state.state if new_state else "unknown"
+            )
+            return 0.0
                 
-            except asyncio.CancelledError:
-                _LOGGER.info("Automation task cancelled for room: %s", self.room_name)
-                break
-            except Exception as err:
-                _LOGGER.error(
-                    "Error in automation loop for room %s: %s", 
-                    self.room_name, err
+        except Exception as err:
+            _LOGGER.error(
+                "Error setting brightness for %s: %s", 
+                light_entity, err
+            )
+            return 0.0
+    
+    async def _async_call_and_verify(
+        self,
+        service: str,
+        entity_ids: List[str],
+        service_data: Dict[str, Any],
+        is_settled: Callable[[Optional[State]], bool],
+    ) -> set:
+        """Send one light service call for entity_ids and wait until they report the new state.
+        
+        Returns the set of lights that settled before the deadline.
+        """
+        pending = set(entity_ids)
+        settled: set = set()
+        all_settled: asyncio.Future = self.hass.loop.create_future()
+        latency = self.latency
+        settled_at: Dict[str, float] = {}
+        
+        def _check(entity_id: str, state: Optional[State]) -> None:
+            if entity_id in pending and is_settled(state):
+                pending.discard(entity_id)
+                settled.add(entity_id)
+                if latency is not None:
+                    settled_at[entity_id] = self.hass.loop.time()
+                if not pending and not all_settled.done():
+                    all_settled.set_result(None)
+        
+        @callback
+        def _async_state_changed(event) -> None:
+            _check(event.data["entity_id"], event.data.get("new_state"))
+        
+        # Subscribe before calling the service so a state that lands while
+        # the blocking call is still in flight is not missed
+        unsub = async_track_state_change_event(self.hass, entity_ids, _async_state_changed)
+        try:
+            self.service_calls_saved += len(entity_ids) - 1
+            sent = self.hass.loop.time()
+            await self.hass.services.async_call(
+                "light", service,
+                {"entity_id": self._plan_light_target(entity_ids), **service_data},
+                blocking=True
+            )
+            returned = self.hass.loop.time()
+            
+            # States may already be there when the blocking call returns
+            for entity_id in list(pending):
+                _check(entity_id, self.hass.states.get(entity_id))
+            
+            # Otherwise wait for the lights to report it, up to the transition length plus grace
+            if pending:
+                await asyncio.wait(
+                    (all_settled,),
+                    timeout=service_data.get("transition", 0) + BRIGHTNESS_VERIFY_GRACE_SECONDS
+                )
+            if latency is not None:
+                latency.call_finished(entity_ids, sent, returned, settled_at)
+        finally:
+            unsub()
+        
+        return settled
+    
+    def _plan_light_target(self, entity_ids: List[str]) -> Any:
+        """Pick the service call target for a set of lights.
+        
+        An existing light group with exactly the same members is preferred so the
+        integration can use a native group/multicast command, otherwise one call
+        with the entity list is sent.
+        """
+        if len(entity_ids) == 1:
+            return entity_ids[0]
+        
+        group_entity = self._find_light_group(entity_ids)
+        if group_entity:
+            _LOGGER.debug("Using light group %s for %s", group_entity, self.room_name)
+            return group_entity
+        return list(entity_ids)
+    
+    def _find_light_group(self, entity_ids: List[str]) -> Optional[str]:
+        """Find a light group whose members are exactly entity_ids."""
+        members = frozenset(entity_ids)
+        cached = self._light_groups.get(members)
+        if cached and self.hass.states.get(cached):
+            return cached
+        
+        # Rooms without a group skip the scan over all lights until the rescan interval passes
+        now = self.hass.loop.time()
+        scanned = self._no_light_group.get(members)
+        if scanned is not None and now - scanned < LIGHT_GROUP_RESCAN_SECONDS:
+            return None
+        
+        for state in self.hass.states.async_all("light"):
+            group_members = state.attributes.get("entity_id")
+            if (
+                isinstance(group_members, (list, tuple))
+                and state.entity_id not in members
+                and frozenset(group_members) == members
+            ):
+                self._light_groups[members] = state.entity_id
+                self._no_light_group.pop(members, None)
+                return state.entity_id
+        
+        self._no_light_group[members] = now
+        return None
+    
+    @staticmethod
+    def _brightness_matches(state: Optional[State], brightness: int) -> bool:
+        """Check if a light state is on and within tolerance of the requested brightness."""
+        if not state or state.state != "on":
+            return False
+        return abs(state.attributes.get("brightness", 255) - brightness) <= BRIGHTNESS_VERIFY_TOLERANCE
+    
+    @callback
+    def _async_reschedule(self) -> None:
+        """Arm the occupancy and control timers for the current room state."""
+        self._async_cancel_timers()
+        if not self.auto_control_enabled:
+            return
+        
+        from homeassistant.util import dt as dt_util
+        now = dt_util.now()
+        
+        # Occupancy timer - exactly keep_on_minutes after motion was last seen
+        deadline = self.motion_deadline
+        if deadline:
+            if deadline <= now and self.lights_controlled_by_automation:
+                # Past the deadline but the lights are still ours - last turn off failed, retry later
+                deadline = now + timedelta(seconds=self.check_interval)
+            if deadline > now:
+                self._unsub_off_timer = async_track_point_in_time(
+                    self.hass, self._async_timer_fired, deadline
                 )
-                # Wait a bit before retrying
-                await asyncio.sleep(30)
+        
+        # Control timer - only while the lights are ours: next target change or end of cooldown
+        if not self.lights_controlled_by_automation:
+            return
+        
+        next_check = self._get_next_target_change(now)
+        if self.last_brightness_change_time:
+            cooldown_end = self.last_brightness_change_time + timedelta(seconds=self.cooldown_seconds)
+            if cooldown_end > now:
+                next_check = min(next_check, cooldown_end) if next_check else cooldown_end
+        
+        if next_check:
+            self._unsub_control_timer = async_track_point_in_time(
+                self.hass, self._async_timer_fired, next_check
+            )
+    
+    @property
+    def area_ids(self) -> Set[str]:
+        """Get the areas of the room's lights (entity area, else device area)."""
+        entity_registry = er.async_get(self.hass)
+        device_registry = dr.async_get(self.hass)
+        areas = set()
+        for light_entity in self.light_entities:
+            entry = entity_registry.async_get(light_entity)
+            if entry is None:
+                continue
+            area_id = entry.area_id
+            if area_id is None and entry.device_id:
+                device = device_registry.async_get(entry.device_id)
+                area_id = device.area_id if device else None
+            if area_id:
+                areas.add(area_id)
+        return areas
+    
+    @property
+    def cooldown_seconds(self) -> float:
+        """Time to wait after the last brightness change - learned from the sensor lag."""
+        return self.sensor_lag.cooldown(self.last_brightness_change_direction)
+    
+    @property
+    def motion_deadline(self) -> Optional[datetime]:
+        """Get when the room times out after the last motion, None while motion is detected."""
+        if not self.last_motion_time:
+            return None
+        if self.snapshot.motion_detected:
+            return None
+        return self.last_motion_time + timedelta(minutes=self.keep_on_minutes)
+    
+    @callback
+    def async_notify_listeners(self) -> None:
+        """Tell the room's entities that coordinator data changed."""
+        async_dispatcher_send(self.hass, self.update_signal)
+    
+    @callback
+    def _async_cancel_timers(self) -> None:
+        """Cancel pending occupancy and control timers."""
+        if self._unsub_off_timer:
+            self._unsub_off_timer()
+            self._unsub_off_timer = None
+        if self._unsub_control_timer:
+            self._unsub_control_timer()
+            self._unsub_control_timer = None
+    
+    async def _async_timer_fired(self, now: datetime) -> None:
+        """Handle a due occupancy or control timer."""
+        try:
+            await self.async_control_lights()
+        except Exception as err:
+            _LOGGER.error(
+                "Error in scheduled light control for room %s: %s", 
+                self.room_name, err
+            )
     
     def enable_auto_control(self, enabled: bool) -> None:
         """Enable or disable auto control."""
         self.auto_control_enabled = enabled
         
-        if enabled and (not self._automation_task or self._automation_task.done()):
-            # Start task if it's not running
-            asyncio.create_task(self._async_start_automation_task())
-        elif not enabled and self._automation_task and not self._automation_task.done():
-            # Cancel task if it's running
-            self._automation_task.cancel()
+        if enabled:
+            # Evaluate right away - this also arms the timers
+            self.hass.async_create_task(self.async_control_lights())
+        else:
+            self._async_cancel_timers()
+        self.async_notify_listeners()
     
     @property
     def smart_mode_enabled(self) -> bool:
@@ -1246,6 +2255,7 @@ class SmartLuxCoordinator:
     def set_smart_mode(self, enabled: bool) -> None:
         """Enable or disable smart mode."""
         self._smart_mode_enabled = enabled
+        self.async_notify_listeners()
     
     @property 
     def adaptive_learning_enabled(self) -> bool:
@@ -1254,4 +2264,5 @@ class SmartLuxCoordinator:
     
     def set_adaptive_learning(self, enabled: bool) -> None:
         """Enable or disable adaptive learning."""
-        self._adaptive_learning_enabled = enabled 
\ No newline at end of file
+        self._adaptive_learning_enabled = enabled
+        self.async_notify_listeners() 
\ No newline at end of file
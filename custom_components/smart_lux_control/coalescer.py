@@ -0,0 +1,89 @@
+"""Event coalescing for Smart Lux Control."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+_EMPTY = object()
+
+
+class LatestValueCoalescer:
+    """Latest-value slot drained by a single consumer at a bounded rate.
+
+    Values pushed while the consumer is busy or resting are merged into the
+    slot, so a chatty source costs at most one handler run per min_interval
+    no matter how often it publishes. The first value after a quiet period
+    is handled right away, and an urgent value cuts the rest short.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        handler: Callable[[Any], Awaitable[None]],
+        min_interval: float,
+        name: str,
+        merge: Optional[Callable[[Any, Any], Any]] = None,
+    ) -> None:
+        """Initialize the coalescer.
+
+        merge(pending, new) combines a value with the one still waiting in
+        the slot; without it the newer value replaces the older one.
+        """
+        self.hass = hass
+        self.min_interval = min_interval
+        self._handler = handler
+        self._name = name
+        self._merge = merge
+        self._pending: Any = _EMPTY
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.received = 0
+        self.handled = 0
+
+    @callback
+    def async_push(self, value: Any, urgent: bool = False) -> None:
+        """Put a value in the slot and make sure the consumer runs."""
+        self.received += 1
+        if self._pending is not _EMPTY and self._merge is not None:
+            value = self._merge(self._pending, value)
+        self._pending = value
+        if urgent:
+            self._wake.set()
+        if self._task is None or self._task.done():
+            self._task = self.hass.async_create_background_task(self._async_drain(), self._name)
+
+    @callback
+    def async_cancel(self) -> None:
+        """Stop the consumer and drop the waiting value."""
+        self._pending = _EMPTY
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    @property
+    def coalesced(self) -> int:
+        """Values merged away instead of being handled."""
+        return self.received - self.handled - (self._pending is not _EMPTY)
+
+    async def _async_drain(self) -> None:
+        """Handle the slot, rest, repeat until nothing arrived during the rest."""
+        while self._pending is not _EMPTY:
+            value, self._pending = self._pending, _EMPTY
+            self._wake.clear()
+            try:
+                await self._handler(value)
+            except Exception:
+                _LOGGER.exception("Error handling %s", self._name)
+            self.handled += 1
+
+            # Rest before the next value - unless an urgent one wakes us
+            if not self._wake.is_set():
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.min_interval)
+                except asyncio.TimeoutError:
+                    pass
@@ -9,6 +9,7 @@ from homeassistant.const import CONF_NAME
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import selector
+import homeassistant.helpers.config_validation as cv
 
 from .const import (
     DOMAIN,
@@ -30,6 +31,33 @@ from .const import (
     CONF_DEVIATION_MARGIN,
     CONF_CHECK_INTERVAL,
     CONF_AUTO_CONTROL_ENABLED,
+    CONF_MAX_CONCURRENT_LIGHTS,
+    DEFAULT_MAX_CONCURRENT_LIGHTS,
+    CONF_MAX_SAMPLES,
+    DEFAULT_MAX_SAMPLES,
+    CONF_LUX_MIN_INTERVAL,
+    DEFAULT_LUX_MIN_INTERVAL,
+    CONF_LUX_JUMP,
+    DEFAULT_LUX_JUMP,
+    CONF_SAVE_DELAY,
+    DEFAULT_SAVE_DELAY,
+    CONF_DISABLED_SENSORS,
+    CONF_DIAGNOSTIC_ENTITY,
+    CONF_LATENCY_HISTOGRAMS,
+    CONF_CONTROLLER,
+    CONF_PI_KP,
+    CONF_PI_KI,
+    CONF_PI_MAX_STEP,
+    CONF_PI_INTEGRAL_LIMIT,
+    CONTROLLER_STEP,
+    CONTROLLER_PI,
+    DEFAULT_CONTROLLER,
+    DEFAULT_LATENCY_HISTOGRAMS,
+    DEFAULT_PI_KP,
+    DEFAULT_PI_KI,
+    DEFAULT_PI_MAX_STEP,
+    DEFAULT_PI_INTEGRAL_LIMIT,
+    SENSOR_TYPES,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -214,13 +242,19 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 return await self.async_step_timing_settings()
             elif selection == "advanced_settings":
                 return await self.async_step_advanced_settings()
+            elif selection == "entity_settings":
+                return await self.async_step_entity_settings()
+            elif selection == "controller_settings":
+                return await self.async_step_controller_settings()
         
         # Show menu as dropdown selection
         menu_schema = vol.Schema({
             vol.Required("menu_selection"): vol.In({
                 "lux_settings": "🌟 Poziomy docelowego oświetlenia", 
                 "timing_settings": "⏰ Ustawienia czasowe i automatyki",
-                "advanced_settings": "🔧 Zaawansowane opcje regresji"
+                "advanced_settings": "🔧 Zaawansowane opcje regresji",
+                "entity_settings": "📊 Encje i historia",
+                "controller_settings": "🎚️ Regulator jasności"
             })
         })
         
@@ -330,6 +364,26 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 CONF_AUTO_CONTROL_ENABLED,
                 default=self.config_entry.data.get(CONF_AUTO_CONTROL_ENABLED, True),
             ): bool,
+            vol.Optional(
+                CONF_MAX_CONCURRENT_LIGHTS,
+                default=self.config_entry.data.get(CONF_MAX_CONCURRENT_LIGHTS, DEFAULT_MAX_CONCURRENT_LIGHTS),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=50)),
+            vol.Optional(
+                CONF_MAX_SAMPLES,
+                default=self.config_entry.data.get(CONF_MAX_SAMPLES, DEFAULT_MAX_SAMPLES),
+            ): vol.All(vol.Coerce(int), vol.Range(min=20, max=50000)),
+            vol.Optional(
+                CONF_LUX_MIN_INTERVAL,
+                default=self.config_entry.data.get(CONF_LUX_MIN_INTERVAL, DEFAULT_LUX_MIN_INTERVAL),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+            vol.Optional(
+                CONF_LUX_JUMP,
+                default=self.config_entry.data.get(CONF_LUX_JUMP, DEFAULT_LUX_JUMP),
+            ): vol.All(vol.Coerce(int), vol.Range(min=5, max=1000)),
+            vol.Optional(
+                CONF_SAVE_DELAY,
+                default=self.config_entry.data.get(CONF_SAVE_DELAY, DEFAULT_SAVE_DELAY),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=600)),
         })
 
         return self.async_show_form(
@@ -338,6 +392,99 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             description_placeholders={"room_name": self.config_entry.data[CONF_ROOM_NAME]}
         )
 
+    async def async_step_entity_settings(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """Choose which sensors the room creates."""
+        if user_input is not None:
+            # Update config entry data
+            new_data = {**self.config_entry.data}
+            new_data.update(user_input)
+            
+            self.hass.config_entries.async_update_entry(
+                self.config_entry, data=new_data
+            )
+            # Reload the integration to add/remove entities
+            await self.hass.config_entries.async_reload(self.config_entry.entry_id)
+            return self.async_create_entry(
+                title="Ustawienia zapisane",
+                data={"reload_required": True}
+            )
+
+        entity_schema = vol.Schema({
+            vol.Optional(
+                CONF_DISABLED_SENSORS,
+                default=self.config_entry.data.get(CONF_DISABLED_SENSORS, []),
+            ): cv.multi_select({
+                sensor_type: config["name"] for sensor_type, config in SENSOR_TYPES.items()
+            }),
+            vol.Optional(
+                CONF_DIAGNOSTIC_ENTITY,
+                default=self.config_entry.data.get(CONF_DIAGNOSTIC_ENTITY, False),
+            ): bool,
+            vol.Optional(
+                CONF_LATENCY_HISTOGRAMS,
+                default=self.config_entry.data.get(CONF_LATENCY_HISTOGRAMS, DEFAULT_LATENCY_HISTOGRAMS),
+            ): bool,
+        })
+
+        return self.async_show_form(
+            step_id="entity_settings",
+            data_schema=entity_schema,
+            description_placeholders={"room_name": self.config_entry.data[CONF_ROOM_NAME]}
+        )
+
+    async def async_step_controller_settings(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """Choose and tune the brightness controller."""
+        if user_input is not None:
+            # Update config entry data
+            new_data = {**self.config_entry.data}
+            new_data.update(user_input)
+            
+            self.hass.config_entries.async_update_entry(
+                self.config_entry, data=new_data
+            )
+            # Reload the integration to apply the new controller
+            await self.hass.config_entries.async_reload(self.config_entry.entry_id)
+            return self.async_create_entry(
+                title="Ustawienia zapisane",
+                data={"reload_required": True}
+            )
+
+        controller_schema = vol.Schema({
+            vol.Optional(
+                CONF_CONTROLLER,
+                default=self.config_entry.data.get(CONF_CONTROLLER, DEFAULT_CONTROLLER),
+            ): vol.In({
+                CONTROLLER_STEP: "Krokowy (model z limitem zmiany)",
+                CONTROLLER_PI: "Model + korekta PI",
+            }),
+            vol.Optional(
+                CONF_PI_KP,
+                default=self.config_entry.data.get(CONF_PI_KP, DEFAULT_PI_KP),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0.0, max=2.0)),
+            vol.Optional(
+                CONF_PI_KI,
+                default=self.config_entry.data.get(CONF_PI_KI, DEFAULT_PI_KI),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0.0, max=1.0)),
+            vol.Optional(
+                CONF_PI_MAX_STEP,
+                default=self.config_entry.data.get(CONF_PI_MAX_STEP, DEFAULT_PI_MAX_STEP),
+            ): vol.All(vol.Coerce(int), vol.Range(min=10, max=255)),
+            vol.Optional(
+                CONF_PI_INTEGRAL_LIMIT,
+                default=self.config_entry.data.get(CONF_PI_INTEGRAL_LIMIT, DEFAULT_PI_INTEGRAL_LIMIT),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=2000)),
+        })
+
+        return self.async_show_form(
+            step_id="controller_settings",
+            data_schema=controller_schema,
+            description_placeholders={"room_name": self.config_entry.data[CONF_ROOM_NAME]}
+        )
+
     async def async_step_advanced_settings(
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
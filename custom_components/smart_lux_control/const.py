@@ -27,15 +27,58 @@ CONF_DEVIATION_MARGIN = "deviation_margin"
 CONF_CHECK_INTERVAL = "check_interval"
 CONF_AUTO_CONTROL_ENABLED = "auto_control_enabled"
 CONF_BRIGHTNESS_COOLDOWN = "brightness_cooldown_seconds"
+CONF_MAX_CONCURRENT_LIGHTS = "max_concurrent_lights"
+CONF_SAVE_DELAY = "save_delay_seconds"
+CONF_MAX_SAMPLES = "max_samples"
+CONF_LUX_MIN_INTERVAL = "lux_min_interval_seconds"
+CONF_LUX_JUMP = "lux_jump_threshold"
+
+# Controller settings
+CONF_CONTROLLER = "controller"
+CONF_PI_KP = "pi_kp"
+CONF_PI_KI = "pi_ki"
+CONF_PI_MAX_STEP = "pi_max_step"
+CONF_PI_INTEGRAL_LIMIT = "pi_integral_limit"
+
+# Entity settings
+CONF_DISABLED_SENSORS = "disabled_sensors"
+CONF_DIAGNOSTIC_ENTITY = "diagnostic_entity"
+CONF_LATENCY_HISTOGRAMS = "latency_histograms"
 
 # Default values
 DEFAULT_MIN_REGRESSION_QUALITY = 0.5
 DEFAULT_MAX_BRIGHTNESS_CHANGE = 50  
 DEFAULT_DEVIATION_MARGIN = 15
 DEFAULT_LEARNING_RATE = 0.1
+DEFAULT_MAX_CONCURRENT_LIGHTS = 6
+DEFAULT_LUX_MIN_INTERVAL = 2  # Seconds between two lux handler runs per room
+DEFAULT_LUX_JUMP = 50  # Lux change handled right away, without waiting for the interval
+
+# Controllers - "step" jumps to the model estimate limited by max_brightness_change
+# (or steps by ±30 without a model), "pi" adds a PI correction to the model feedforward
+CONTROLLER_STEP = "step"
+CONTROLLER_PI = "pi"
+DEFAULT_CONTROLLER = CONTROLLER_STEP
+DEFAULT_PI_KP = 1.0
+DEFAULT_PI_KI = 0.05
+DEFAULT_PI_MAX_STEP = 200  # Brightness change per light per actuation
+DEFAULT_PI_INTEGRAL_LIMIT = 200  # Lux
+
+# Light actuation
+LIGHT_TRANSITION_SECONDS = 2
+BRIGHTNESS_VERIFY_TOLERANCE = 15
+FALLBACK_STEP = 30  # Brightness step without a usable model ...
+FALLBACK_MIN_STEP = 4  # ... halved down to this each time it overshoots the target
+BRIGHTNESS_VERIFY_GRACE_SECONDS = 3
+LIGHT_GROUP_RESCAN_SECONDS = 300  # A room without a matching light group looks for one again after this
+SAMPLE_SETTLE_SECONDS = 3  # Quiet time after the last light change before a sample is taken
 
 # Storage
 STORAGE_VERSION = 1
+DEFAULT_SAVE_DELAY = 30  # Seconds - coalesces sample/model writes into one store write
+SAMPLES_STORAGE_VERSION = 1
+DEFAULT_LATENCY_HISTOGRAMS = False  # Control pipeline timing is off unless asked for
+DEFAULT_MAX_SAMPLES = 100  # Samples kept per room - also the per-light model's memory (forgetting 1 - 1/max_samples)
 
 # Lux levels for different modes
 LUX_MODES = {
@@ -58,77 +101,120 @@ SERVICE_CALCULATE_TARGET_BRIGHTNESS = "calculate_target_brightness"
 SERVICE_TEST_LIGHT_CONTROL = "test_light_control"
 SERVICE_SYNC_LIGHT_STATES = "sync_light_states"
 SERVICE_FORCE_LIGHT_REFRESH = "force_light_refresh"
+SERVICE_MAX_CONCURRENT_ROOMS = 4  # Rooms a bulk service call works on at the same time
+ROOM_ALL = "all"  # room_name value that targets every room
+
+# hass.data key of the room_name -> {entry_id: coordinator} index - names are not unique keys
+DATA_ROOMS = f"{DOMAIN}_rooms"
 
-# Sensor types
+# Sensor types - threshold is the smallest change of a numeric value that is
+# written to the state machine, None writes every change. The thresholds are
+# fixed per type, not options. Diagnostic types are also collected by the
+# optional aggregate diagnostics entity.
 SENSOR_TYPES = {
     "regression_quality": {
         "name": "Regression Quality",
         "unit": "R²",
         "icon": "mdi:chart-line",
         "device_class": None,
+        "threshold": 0.01,
+        "diagnostic": True,
     },
     "sample_count": {
         "name": "Sample Count",
         "unit": "samples",
         "icon": "mdi:database",
         "device_class": None,
+        "threshold": 1,
+        "diagnostic": True,
     },
     "smart_mode_status": {
         "name": "Smart Mode Status",
         "unit": None,
         "icon": "mdi:brain",
         "device_class": None,
+        "threshold": None,
+        "diagnostic": True,
     },
     "predicted_lux": {
         "name": "Current Lux",
         "unit": "lx", 
         "icon": "mdi:brightness-6",
         "device_class": "illuminance",
+        "threshold": 5,
+        "diagnostic": False,
     },
     "average_error": {
         "name": "Average Prediction Error",
         "unit": "lx",
         "icon": "mdi:target",
         "device_class": None,
+        "threshold": 0.5,
+        "diagnostic": True,
     },
     "target_lux": {
         "name": "Target Lux",
         "unit": "lx",
         "icon": "mdi:crosshairs",
         "device_class": "illuminance",
+        "threshold": 1,
+        "diagnostic": False,
     },
     "automation_status": {
         "name": "Automation Status",
         "unit": None,
         "icon": "mdi:play-circle",
         "device_class": None,
+        "threshold": None,
+        "diagnostic": False,
     },
     "last_automation_action": {
         "name": "Last Automation Action",
         "unit": None,
         "icon": "mdi:history",
         "device_class": None,
+        "threshold": None,
+        "diagnostic": True,
     },
     "motion_timer": {
         "name": "Motion Timer",
-        "unit": "min",
+        "unit": None,
         "icon": "mdi:timer",
-        "device_class": None,
+        "device_class": "timestamp",
+        "threshold": None,
+        "diagnostic": False,
     },
     "motion_status": {
         "name": "Motion Detection Status",
         "unit": None,
         "icon": "mdi:motion-sensor",
         "device_class": None,
+        "threshold": None,
+        "diagnostic": True,
     },
     "lights_status": {
         "name": "Controlled Lights Status",
         "unit": None,
         "icon": "mdi:lightbulb-group",
         "device_class": None,
+        "threshold": None,
+        "diagnostic": True,
     },
 }
 
+DIAGNOSTIC_SENSOR_TYPE = "diagnostics"
+DIAGNOSTIC_SENSOR = {
+    "name": "Diagnostics",
+    "unit": None,
+    "icon": "mdi:stethoscope",
+    "device_class": None,
+    "threshold": None,
+    "diagnostic": True,
+}
+
+# Dispatcher signal sent by a room coordinator when its entities may need a refresh
+SIGNAL_ROOM_UPDATE = f"{DOMAIN}_{{}}_update"
+
 # Events
 EVENT_REGRESSION_UPDATED = f"{DOMAIN}_regression_updated"
 EVENT_SMART_MODE_CHANGED = f"{DOMAIN}_smart_mode_changed"
@@ -0,0 +1,269 @@
+"""Control loop helpers for Smart Lux Control."""
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+CONVERGENCE_HISTORY = 50
+
+# Lux estimate - scalar Kalman filter
+KALMAN_DRIFT_VARIANCE = 0.5  # lx² per second - daylight and people moving between readings
+KALMAN_NOISE_LUX = 2.0  # Sensor noise, lx ...
+KALMAN_NOISE_RELATIVE = 0.03  # ... plus this fraction of the reading
+KALMAN_COMMAND_ERROR = 0.2  # Relative error of a lux change predicted by the model
+KALMAN_GATE_SIGMAS = 4.0  # Readings further out restart the estimate
+
+# Lux sensor lag - delays between a brightness change and the sensor catching up
+LAG_DIRECTIONS = ("up", "down")
+LAG_HISTORY = 50  # Delays kept per direction
+LAG_MIN_SAMPLES = 5  # Below this the configured cooldown is used
+LAG_PERCENTILE = 0.9
+LAG_GRACE_SECONDS = 1.0  # Added to the percentile for the sensor's report jitter
+LAG_MIN_COOLDOWN = 1.0
+LAG_MAX_SECONDS = 120.0  # Longest delay still attributed to a brightness change
+
+
+class ConvergenceTracker:
+    """Counts the adjustment cycles the control loop needs to reach the target.
+
+    An episode starts with the first brightness change after the room was
+    within tolerance and ends once the lux is back within tolerance. Cycle
+    counts and durations of the last CONVERGENCE_HISTORY episodes are kept
+    per control mode (the mode of the episode's first adjustment), so models
+    and controllers can be compared on the same room.
+    """
+
+    __slots__ = ("_cycles", "_mode", "_started", "_history")
+
+    def __init__(self) -> None:
+        """Initialize the tracker."""
+        self._cycles = 0
+        self._mode: Optional[str] = None
+        self._started = 0.0
+        self._history: Dict[str, Deque[Tuple[int, float]]] = {}
+
+    def adjusted(self, mode: str, now: float) -> None:
+        """Record one brightness change at monotonic time now."""
+        if self._mode is None:
+            self._mode = mode
+            self._started = now
+        self._cycles += 1
+
+    def settled(self, now: float) -> None:
+        """The lux is within tolerance - close the running episode."""
+        if self._mode is not None:
+            self._history.setdefault(self._mode, deque(maxlen=CONVERGENCE_HISTORY)).append(
+                (self._cycles, now - self._started)
+            )
+        self.abandon()
+
+    def abandon(self) -> None:
+        """Drop the running episode without recording it (lights off, control disabled)."""
+        self._cycles = 0
+        self._mode = None
+
+    @property
+    def current_cycles(self) -> int:
+        """Adjustments in the running episode."""
+        return self._cycles
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get episode count, mean/max cycles and mean time to converge per control mode."""
+        return {
+            mode: {
+                "episodes": len(episodes),
+                "mean_cycles": round(sum(cycles for cycles, _ in episodes) / len(episodes), 2),
+                "max_cycles": max(cycles for cycles, _ in episodes),
+                "mean_seconds": round(sum(seconds for _, seconds in episodes) / len(episodes), 1),
+            }
+            for mode, episodes in self._history.items()
+            if episodes
+        }
+
+
+class FeedforwardPIController:
+    """Feedforward + PI brightness controller for one room.
+
+    The model inversion (feedforward) picks the brightness for the lux the
+    controller aims at. The aim is the target, corrected by:
+
+    - P: kp times the lux the model does not explain at the current
+      brightness (measured minus predicted - daylight, a lamp that aged, a
+      slope that is slightly off). With kp = 1 a constant offset is
+      cancelled in one actuation.
+    - I: ki times the sum of the remaining lux error (target minus
+      measured), collected only after the controller's own actuations, so
+      the first step from dark does not wind it up.
+
+    Anti-windup: the integral is clamped to ±integral_limit lux and frozen
+    while the last output was saturated (range or rate limit) in the
+    direction the error pushes.
+    """
+
+    __slots__ = ("kp", "ki", "integral_limit", "integral", "_closed", "_saturation")
+
+    def __init__(self, kp: float, ki: float, integral_limit: float) -> None:
+        """Initialize the controller."""
+        self.kp = kp
+        self.ki = ki
+        self.integral_limit = integral_limit
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the loop state - the lights were turned off or taken over."""
+        self.integral = 0.0
+        self._closed = False  # True once the lights show our own last output
+        self._saturation = 0  # +1 output capped while more light was wanted, -1 for less
+
+    def aim(self, target_lux: float, measured_lux: float, predicted_lux: float) -> float:
+        """Get the lux the feedforward should aim at.
+
+        predicted_lux is what the model expects for the current brightness.
+        """
+        error = target_lux - measured_lux
+        if self._closed and self._saturation * error <= 0:
+            self.integral = max(-self.integral_limit, min(self.integral + error, self.integral_limit))
+        return target_lux - self.kp * (measured_lux - predicted_lux) + self.ki * self.integral
+
+    def applied(self, saturation: int) -> None:
+        """Record that an output was sent; saturation as in _saturation."""
+        self._closed = True
+        self._saturation = saturation
+
+
+class SensorLagEstimator:
+    """Learns how long the room's lux sensor takes to report a brightness change.
+
+    Delays are kept per direction (brighter/darker), since many sensors
+    report rises and falls at different speeds. The cooldown after a change
+    is a high percentile of the recent delays plus a small grace, so fast
+    sensors are not waited for needlessly and slow ones do not get a second
+    correction before the first one shows.
+    """
+
+    __slots__ = ("default_cooldown", "_delays")
+
+    def __init__(self, default_cooldown: float) -> None:
+        """Initialize the estimator - default_cooldown applies until enough delays are seen."""
+        self.default_cooldown = default_cooldown
+        self._delays: Dict[str, Deque[float]] = {
+            direction: deque(maxlen=LAG_HISTORY) for direction in LAG_DIRECTIONS
+        }
+
+    def record(self, direction: str, seconds: float) -> None:
+        """Record how long the sensor took to catch up with a change."""
+        if direction in self._delays and 0 <= seconds <= LAG_MAX_SECONDS:
+            self._delays[direction].append(seconds)
+
+    def cooldown(self, direction: Optional[str]) -> float:
+        """Get the time to wait after a change in direction before judging the lux."""
+        delays = self._delays.get(direction) if direction else None
+        if not delays or len(delays) < LAG_MIN_SAMPLES:
+            return self.default_cooldown
+        return min(
+            max(_percentile(sorted(delays), LAG_PERCENTILE) + LAG_GRACE_SECONDS, LAG_MIN_COOLDOWN),
+            LAG_MAX_SECONDS,
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the learned lag and its spread (interquartile range) per direction."""
+        stats = {}
+        for direction, delays in self._delays.items():
+            ordered = sorted(delays)
+            stats[direction] = {
+                "samples": len(ordered),
+                "median": round(_percentile(ordered, 0.5), 2) if ordered else None,
+                "p90": round(_percentile(ordered, LAG_PERCENTILE), 2) if ordered else None,
+                "spread": round(_percentile(ordered, 0.75) - _percentile(ordered, 0.25), 2) if ordered else None,
+                "cooldown": round(self.cooldown(direction), 2),
+            }
+        return stats
+
+    def to_storage(self) -> Dict[str, List[float]]:
+        """Get the delays for storage."""
+        return {direction: [round(seconds, 2) for seconds in delays] for direction, delays in self._delays.items()}
+
+    def load(self, data: Dict[str, Iterable[Any]]) -> None:
+        """Restore delays saved by to_storage()."""
+        for direction, delays in self._delays.items():
+            delays.clear()
+            for seconds in data.get(direction, ()):
+                try:
+                    self.record(direction, float(seconds))
+                except (TypeError, ValueError):
+                    continue
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """Linear-interpolated percentile of a sorted, non-empty list."""
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class LuxKalmanFilter:
+    """Scalar Kalman filter estimating the lux at the room's sensor.
+
+    Between readings the lux drifts (daylight, people), so the variance grows
+    with time. A brightness command moves the estimate by the change the
+    model predicts, with the model's uncertainty added to the variance.
+    Readings are blended in by the Kalman gain; a reading far outside the
+    expected spread (blinds opened, a lamp switched by hand) restarts the
+    estimate at the reading instead of being averaged away.
+    """
+
+    __slots__ = ("value", "variance", "_time")
+
+    def __init__(self) -> None:
+        """Initialize the filter without an estimate."""
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop the estimate - the next reading starts a new one."""
+        self.value: Optional[float] = None
+        self.variance = 0.0
+        self._time = 0.0
+
+    def command(self, delta_lux: Optional[float], now: float) -> None:
+        """Apply a brightness command; delta_lux is the model's lux change, None without a model."""
+        if self.value is None:
+            return
+        self._predict(now)
+        if delta_lux is None:
+            # Nothing to predict with - let the next reading replace the estimate
+            self.variance = float("inf")
+            return
+        self.value += delta_lux
+        self.variance += (KALMAN_COMMAND_ERROR * delta_lux) ** 2
+
+    def update(self, reading: float, now: float) -> float:
+        """Blend in a sensor reading and get the new estimate."""
+        noise = (KALMAN_NOISE_LUX + KALMAN_NOISE_RELATIVE * abs(reading)) ** 2
+        if self.value is None:
+            self.value, self.variance, self._time = reading, noise, now
+            return reading
+
+        self._predict(now)
+        innovation = reading - self.value
+        spread = self.variance + noise
+        if math.isinf(spread) or innovation * innovation > KALMAN_GATE_SIGMAS ** 2 * spread:
+            self.value, self.variance = reading, noise
+        else:
+            gain = self.variance / spread
+            self.value += gain * innovation
+            self.variance *= 1 - gain
+        return self.value
+
+    @property
+    def std(self) -> Optional[float]:
+        """Standard deviation of the estimate, None without one or right after an unmodeled command."""
+        if self.value is None or math.isinf(self.variance):
+            return None
+        return math.sqrt(self.variance)
+
+    def _predict(self, now: float) -> None:
+        """Grow the variance by the drift since the last step."""
+        self.variance += KALMAN_DRIFT_VARIANCE * max(0.0, now - self._time)
+        self._time = now
@@ -0,0 +1,60 @@
+"""Diagnostics support for Smart Lux Control."""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Return diagnostics for a room."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    stats = coordinator.model_stats
+
+    return {
+        "config": dict(entry.data),
+        "model": {
+            "version": stats.version,
+            "regression_a": coordinator.regression_a,
+            "regression_b": coordinator.regression_b,
+            "regression_quality": coordinator.regression_quality,
+            "sample_count": stats.sample_count,
+            "outlier_count": stats.outlier_count,
+            "residual_mean": stats.residual_mean,
+            "residual_max": stats.residual_max,
+            "light_weights": dict(zip(coordinator.light_entities, coordinator.light_weights or [])),
+            "light_intercept": coordinator.light_intercept,
+            "light_quality": coordinator.light_quality,
+        },
+        "control": {
+            "controller": coordinator.controller_type,
+            "pi_integral": coordinator.controller.integral,
+            "adjustment_cycles": coordinator.convergence.as_dict(),
+            "last_action": coordinator.last_automation_action,
+            "service_calls_saved": coordinator.service_calls_saved,
+        },
+        "lux_estimate": {
+            "raw_lux": coordinator.snapshot.lux,
+            "estimate": coordinator.lux_filter.value,
+            "std": coordinator.lux_filter.std,
+            "noise_suppressed": coordinator.noise_suppressed,
+        },
+        "lux_events": {
+            "min_interval": coordinator.lux_events.min_interval,
+            "jump_threshold": coordinator.lux_jump_threshold,
+            "received": coordinator.lux_events.received,
+            "handled": coordinator.lux_events.handled,
+            "coalesced": coordinator.lux_events.coalesced,
+        },
+        "sensor_lag": {
+            "configured_cooldown": coordinator.brightness_cooldown_seconds,
+            "current_cooldown": coordinator.cooldown_seconds,
+            "directions": coordinator.sensor_lag.as_dict(),
+        },
+        "latency": coordinator.latency.as_dict() if coordinator.latency is not None else None,
+    }
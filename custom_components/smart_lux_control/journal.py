@@ -0,0 +1,206 @@
+"""Append-only sample journal for Smart Lux Control."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import struct
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+
+_LOGGER = logging.getLogger(__name__)
+
+# seq (uint64), brightness (float32), lux (float32), epoch seconds (int64).
+# Brightness and lux are float32 like in SampleBuffer, so a replay restores
+# exactly the values the running regression statistics were built from.
+RECORD = struct.Struct("<Qffq")
+
+SampleRecord = Tuple[float, float, int]
+
+
+class SampleJournal:
+    """Per-room sample persistence: a snapshot Store plus an append-only journal.
+
+    Every new sample is appended to a binary journal file as one fixed-size
+    record, so a write costs the same no matter how many samples are kept.
+    Once the journal holds compact_after records it is folded into the
+    snapshot in the background and truncated. Records carry a sequence
+    number and the snapshot remembers the last one it includes, so a crash
+    between writing the snapshot and truncating the journal never replays a
+    sample twice. A torn record at the end of the journal is dropped on load.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        key: str,
+        version: int,
+        compact_after: int,
+        snapshot_source: Callable[[], Iterable[SampleRecord]],
+    ) -> None:
+        """Initialize the journal."""
+        self.hass = hass
+        self.compact_after = max(1, compact_after)
+        self._snapshot_source = snapshot_source
+        self._store = Store(hass, version, key)
+        self._path = hass.config.path(STORAGE_DIR, f"{key}.journal")
+        self._seq = 0  # Last sequence number handed out
+        self._journal_records = 0  # Records in the journal file
+        self._pending = bytearray()  # Records waiting for the executor
+        self._lock = asyncio.Lock()  # Serializes file writes, compaction and reset
+        self._flush_task: Optional[asyncio.Task] = None
+        self._compact_task: Optional[asyncio.Task] = None
+
+    async def async_load(self) -> Optional[List[SampleRecord]]:
+        """Load the snapshot and replay the journal. Returns None if nothing is stored yet."""
+        snapshot = await self._store.async_load()
+        snapshot_seq = 0
+        samples: List[SampleRecord] = []
+        if snapshot:
+            snapshot_seq = int(snapshot.get("seq", 0))
+            for sample in snapshot.get("samples", []):
+                try:
+                    brightness, lux, epoch = sample
+                    samples.append((float(brightness), float(lux), int(epoch)))
+                except (ValueError, TypeError):
+                    continue
+
+        records, last_seq, journal_records = await self.hass.async_add_executor_job(
+            self._read_journal, snapshot_seq
+        )
+        samples.extend(records)
+        self._seq = max(snapshot_seq, last_seq)
+        self._journal_records = journal_records
+
+        if snapshot is None and not journal_records:
+            return None
+        return samples
+
+    @callback
+    def async_append(self, brightness: float, lux: float, epoch: int) -> None:
+        """Queue a sample for the journal."""
+        self._seq += 1
+        self._pending += RECORD.pack(self._seq, brightness, lux, int(epoch))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = self.hass.async_create_background_task(
+                self._async_flush(), f"smart_lux_control journal flush {self._path}"
+            )
+
+    async def async_compact(self) -> None:
+        """Fold the journal into the snapshot now."""
+        async with self._lock:
+            await self._async_write_pending()
+            # Everything handed out so far is in the source - records still
+            # pending after this point are skipped on replay by their seq
+            seq = self._seq
+            samples = [
+                [brightness, lux, int(epoch)] for brightness, lux, epoch in self._snapshot_source()
+            ]
+            await self._async_write_snapshot(seq, samples)
+            await self.hass.async_add_executor_job(self._truncate_journal, 0)
+            self._journal_records = 0
+        _LOGGER.debug("Compacted sample journal %s into %d samples", self._path, len(samples))
+
+    async def async_reset(self) -> None:
+        """Drop all stored samples."""
+        async with self._lock:
+            self._pending.clear()
+            await self._async_write_snapshot(self._seq, [])
+            await self.hass.async_add_executor_job(self._truncate_journal, 0)
+            self._journal_records = 0
+
+    async def async_close(self) -> None:
+        """Write queued records, wait for a running compaction and sync the journal to disk."""
+        if self._compact_task is not None:
+            await self._compact_task
+        async with self._lock:
+            await self._async_write_pending()
+            await self.hass.async_add_executor_job(self._sync_journal)
+
+    async def _async_flush(self) -> None:
+        """Write queued records and start a compaction when the journal is long enough."""
+        async with self._lock:
+            await self._async_write_pending()
+        if self._journal_records >= self.compact_after and (
+            self._compact_task is None or self._compact_task.done()
+        ):
+            self._compact_task = self.hass.async_create_background_task(
+                self.async_compact(), f"smart_lux_control journal compaction {self._path}"
+            )
+
+    async def _async_write_pending(self) -> None:
+        """Append queued records to the journal file. Caller holds the lock."""
+        while self._pending:
+            data = bytes(self._pending)
+            self._pending.clear()
+            await self.hass.async_add_executor_job(self._append_journal, data)
+            self._journal_records += len(data) // RECORD.size
+
+    async def _async_write_snapshot(self, seq: int, samples: List[List[Any]]) -> None:
+        """Replace the snapshot."""
+        data: Dict[str, Any] = {"seq": seq, "samples": samples}
+        await self._store.async_save(data)
+
+    def _append_journal(self, data: bytes) -> None:
+        """Append raw records to the journal file (executor)."""
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        with open(self._path, "ab") as journal:
+            journal.write(data)
+
+    def _sync_journal(self) -> None:
+        """Flush the journal file to disk (executor)."""
+        try:
+            descriptor = os.open(self._path, os.O_WRONLY)
+        except FileNotFoundError:
+            return
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    def _truncate_journal(self, size: int) -> None:
+        """Truncate the journal file (executor)."""
+        if size == 0:
+            try:
+                os.remove(self._path)
+            except FileNotFoundError:
+                pass
+            return
+        with open(self._path, "r+b") as journal:
+            journal.truncate(size)
+
+    def _read_journal(self, after_seq: int) -> Tuple[List[SampleRecord], int, int]:
+        """Read records newer than after_seq (executor).
+
+        Returns (samples, last seq, number of valid records in the file).
+        """
+        try:
+            with open(self._path, "rb") as journal:
+                data = journal.read()
+        except FileNotFoundError:
+            return [], 0, 0
+
+        samples: List[SampleRecord] = []
+        last_seq = 0
+        valid = 0
+        for valid, (seq, brightness, lux, epoch) in enumerate(RECORD.iter_unpack(
+            data[: len(data) - len(data) % RECORD.size]
+        )):
+            if seq <= last_seq:
+                # Sequence went backwards - the rest of the file is not trustworthy
+                break
+            last_seq = seq
+            if seq > after_seq:
+                samples.append((brightness, lux, epoch))
+        else:
+            valid = len(data) // RECORD.size
+
+        good_size = valid * RECORD.size
+        if good_size != len(data):
+            _LOGGER.warning(
+                "Dropping %d bytes of damaged sample journal %s", len(data) - good_size, self._path
+            )
+            self._truncate_journal(good_size)
+        return samples, last_seq, valid
@@ -0,0 +1,145 @@
+"""Control pipeline latency histograms for Smart Lux Control."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Optional
+
+# Bucket upper bounds in milliseconds - one more open-ended bucket follows the last
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+LATENCY_PERCENTILES = (50, 95, 99)
+
+# Stages of the motion → lit lamps pipeline
+STAGE_DECISION = "decision"  # Motion handled → first light command sent
+STAGE_COMMAND = "command"  # Light service call sent → call returned
+STAGE_VERIFY = "verify"  # Service call returned → light reported the requested state
+STAGE_TOTAL = "motion_to_light"  # Motion handled → lights verified (the last one for the room)
+ROOM_STAGES = (STAGE_DECISION, STAGE_COMMAND, STAGE_VERIFY, STAGE_TOTAL)
+LIGHT_STAGES = (STAGE_COMMAND, STAGE_VERIFY, STAGE_TOTAL)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of durations.
+
+    Recording is a bisect and an increment, memory does not grow with the
+    number of samples. Percentiles are the upper bound of the bucket they
+    fall in, capped at the largest duration seen.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0  # Milliseconds
+        self.max = 0.0  # Milliseconds
+
+    def record(self, seconds: float) -> None:
+        """Add one duration."""
+        ms = max(0.0, seconds * 1000)
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Get the percentile in milliseconds, None when empty."""
+        if not self.count:
+            return None
+        rank = percent / 100 * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if count and cumulative >= rank:
+                break
+        if index < len(LATENCY_BUCKETS_MS):
+            return min(float(LATENCY_BUCKETS_MS[index]), self.max)
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get count, mean, max and percentiles for diagnostics."""
+        result: Dict[str, Any] = {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 1) if self.count else None,
+            "max_ms": round(self.max, 1) if self.count else None,
+        }
+        for percent in LATENCY_PERCENTILES:
+            value = self.percentile(percent)
+            result[f"p{percent}_ms"] = round(value, 1) if value is not None else None
+        return result
+
+
+class PipelineLatency:
+    """Stage durations of a room's control pipeline, per room and per light.
+
+    Timestamps come from the event loop's monotonic clock. Motion that
+    triggers a control pass opens an episode: the first command after it
+    closes the decision stage, every verified light adds its motion-to-light
+    time and the room gets the time to its last verified light.
+    """
+
+    __slots__ = ("room", "lights", "_motion_at", "_commanded", "_last_verified")
+
+    def __init__(self, light_entities: Iterable[str]) -> None:
+        """Initialize the histograms."""
+        self.room = {stage: LatencyHistogram() for stage in ROOM_STAGES}
+        self.lights = {
+            entity_id: {stage: LatencyHistogram() for stage in LIGHT_STAGES}
+            for entity_id in light_entities
+        }
+        self._motion_at: Optional[float] = None
+        self._commanded = False
+        self._last_verified: Optional[float] = None
+
+    def motion(self, now: float) -> None:
+        """Open an episode - motion was detected."""
+        self._motion_at = now
+        self._commanded = False
+        self._last_verified = None
+
+    def motion_handled(self) -> None:
+        """Close the episode - the control pass started by the motion is done."""
+        if self._motion_at is not None and self._last_verified is not None:
+            self.room[STAGE_TOTAL].record(self._last_verified - self._motion_at)
+        self._motion_at = None
+
+    def call_finished(
+        self, entity_ids: Iterable[str], sent: float, returned: float, settled: Dict[str, float]
+    ) -> None:
+        """Record one light service call for entity_ids.
+
+        settled maps the lights that reached the requested state to the time
+        they reported it.
+        """
+        motion_at = self._motion_at
+        if motion_at is not None and not self._commanded:
+            self._commanded = True
+            self.room[STAGE_DECISION].record(sent - motion_at)
+        self.room[STAGE_COMMAND].record(returned - sent)
+        for entity_id in entity_ids:
+            light = self.lights.get(entity_id)
+            if light is not None:
+                light[STAGE_COMMAND].record(returned - sent)
+        for entity_id, verified_at in settled.items():
+            verify = max(0.0, verified_at - returned)
+            self.room[STAGE_VERIFY].record(verify)
+            light = self.lights.get(entity_id)
+            if light is not None:
+                light[STAGE_VERIFY].record(verify)
+            if motion_at is not None:
+                if light is not None:
+                    light[STAGE_TOTAL].record(verified_at - motion_at)
+                if self._last_verified is None or verified_at > self._last_verified:
+                    self._last_verified = verified_at
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the histogram summaries by room and light."""
+        return {
+            "buckets_ms": list(LATENCY_BUCKETS_MS),
+            "room": {stage: histogram.as_dict() for stage, histogram in self.room.items()},
+            "lights": {
+                entity_id: {stage: histogram.as_dict() for stage, histogram in stages.items()}
+                for entity_id, stages in self.lights.items()
+            },
+        }
@@ -0,0 +1,327 @@
+"""Incremental least-squares regression for Smart Lux Control."""
+from __future__ import annotations
+
+import math
+from datetime import datetime
+from statistics import NormalDist
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class RunningRegression:
+    """Exact simple linear regression over a sliding window of samples.
+
+    Keeps the sufficient statistics (count, means, centered second moments and
+    co-moment) with Welford-style updates, which stay numerically stable where
+    raw sums of squares would cancel. Samples can be added and removed in
+    O(1), so the fit is exact for the current window after every change.
+    """
+
+    __slots__ = ("count", "mean_x", "mean_y", "m2_x", "m2_y", "c_xy")
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop all samples."""
+        self.count = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+        self.c_xy = 0.0
+
+    def add(self, x: float, y: float) -> None:
+        """Add a sample."""
+        self.count += 1
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.mean_x += dx / self.count
+        self.mean_y += dy / self.count
+        self.m2_x += dx * (x - self.mean_x)
+        self.m2_y += dy * (y - self.mean_y)
+        self.c_xy += dx * (y - self.mean_y)
+
+    def remove(self, x: float, y: float) -> None:
+        """Remove a sample that was previously added."""
+        if self.count <= 1:
+            self.reset()
+            return
+
+        # Inverse of add(): (sample - mean without it) * (sample - mean with it)
+        self.count -= 1
+        old_mean_x = self.mean_x
+        old_mean_y = self.mean_y
+        self.mean_x -= (x - old_mean_x) / self.count
+        self.mean_y -= (y - old_mean_y) / self.count
+        dx = x - self.mean_x
+        self.m2_x = max(0.0, self.m2_x - dx * (x - old_mean_x))
+        self.m2_y = max(0.0, self.m2_y - (y - self.mean_y) * (y - old_mean_y))
+        self.c_xy -= dx * (y - old_mean_y)
+
+    @property
+    def std_x(self) -> float:
+        """Population standard deviation of x."""
+        return math.sqrt(self.m2_x / self.count) if self.count else 0.0
+
+    @property
+    def std_y(self) -> float:
+        """Population standard deviation of y."""
+        return math.sqrt(self.m2_y / self.count) if self.count else 0.0
+
+    def fit(self) -> Optional[Tuple[float, float, float]]:
+        """Get (slope, intercept, R²), or None if x has no spread."""
+        if self.count < 2 or self.m2_x <= 0:
+            return None
+
+        slope = self.c_xy / self.m2_x
+        intercept = self.mean_y - slope * self.mean_x
+        if self.m2_y <= 0:
+            r_squared = 0.0
+        else:
+            r_squared = min(1.0, (self.c_xy * self.c_xy) / (self.m2_x * self.m2_y))
+        return slope, intercept, r_squared
+
+    def residual_std(self, slope: float, intercept: float) -> Optional[float]:
+        """Residual standard error of the line y = slope * x + intercept over the window.
+
+        Works for any line, not only the least-squares fit, so it also covers
+        a model blended by adaptive learning.
+        """
+        if self.count < 3:
+            return None
+        offset = self.mean_y - slope * self.mean_x - intercept
+        sse = self.m2_y - 2 * slope * self.c_xy + slope * slope * self.m2_x + self.count * offset * offset
+        return math.sqrt(max(0.0, sse) / (self.count - 2))
+
+    def inverse_prediction_halfwidth(self, slope: float, x: float, residual_std: float, t: float) -> float:
+        """Half-width (in x) of the prediction interval for reaching y at x.
+
+        A new observation at x scatters by t * residual_std * sqrt(1 + 1/n +
+        (x - mean_x)² / Sxx) in y; dividing by the slope maps it to x.
+        """
+        spread = 1 + 1 / self.count + (x - self.mean_x) ** 2 / self.m2_x
+        return t * residual_std / abs(slope) * math.sqrt(spread)
+
+
+class LightRegression:
+    """Per-light linear model lux = Σ wᵢ·brightnessᵢ + c, fitted incrementally.
+
+    Keeps the normal equations - XᵀX and Xᵀy with an intercept column, plus
+    Σy² for the fit quality - under exponential forgetting, so a sample costs
+    O(k²) for k lights and old samples fade out at the pace of the sample
+    window. A fit is an O(k³) solve, and k is the number of lights in a room.
+
+    Lights that are always dimmed together make XᵀX singular. A ridge term far
+    below the data scale keeps the solve defined and, in that case, converges
+    to the minimum-norm solution - the lights share the effect evenly.
+    """
+
+    __slots__ = ("size", "forgetting", "weight", "xtx", "xty", "yty")
+
+    def __init__(self, lights: int, forgetting: float = 1.0) -> None:
+        """Initialize an empty model for a number of lights."""
+        self.size = lights + 1  # Light coefficients plus the intercept
+        self.forgetting = forgetting
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop all samples."""
+        self.weight = 0.0  # Effective number of samples after forgetting
+        self.xtx = [[0.0] * self.size for _ in range(self.size)]
+        self.xty = [0.0] * self.size
+        self.yty = 0.0
+
+    def add(self, brightness: Sequence[float], lux: float) -> None:
+        """Add a sample - brightness holds one value per light, 0 for lights that are off."""
+        x = [*brightness, 1.0]
+        keep = self.forgetting
+        self.weight = self.weight * keep + 1
+        self.yty = self.yty * keep + lux * lux
+        for i, x_i in enumerate(x):
+            row = self.xtx[i]
+            for j, x_j in enumerate(x):
+                row[j] = row[j] * keep + x_i * x_j
+            self.xty[i] = self.xty[i] * keep + x_i * lux
+
+    def fit(self) -> Optional[Tuple[List[float], float, float]]:
+        """Get (light weights, intercept, R²), or None while the model is underdetermined."""
+        if self.weight < self.size + 1:
+            return None
+
+        lights = self.size - 1
+        ridge = RIDGE * max(max(self.xtx[i][i] for i in range(lights)), 1.0)
+        augmented = [row[:] + [self.xty[i]] for i, row in enumerate(self.xtx)]
+        for i in range(lights):
+            augmented[i][i] += ridge
+        solution = _solve(augmented)
+        if solution is None:
+            return None
+
+        # SSE from the normal equations: yᵀy - 2βᵀXᵀy + βᵀXᵀXβ
+        fitted = sum(
+            beta_i * sum(x_ij * beta_j for x_ij, beta_j in zip(self.xtx[i], solution))
+            for i, beta_i in enumerate(solution)
+        )
+        sse = self.yty - 2 * sum(b * v for b, v in zip(solution, self.xty)) + fitted
+        sst = self.yty - self.xty[-1] ** 2 / self.weight
+        r_squared = min(1.0, max(0.0, 1 - sse / sst)) if sst > 0 else 0.0
+        return solution[:-1], solution[-1], r_squared
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the statistics for storage."""
+        return {"weight": self.weight, "xtx": self.xtx, "xty": self.xty, "yty": self.yty}
+
+    def load(self, data: Dict[str, Any]) -> bool:
+        """Restore statistics saved by as_dict(). Returns False if they do not fit this model."""
+        try:
+            xtx = [[float(value) for value in row] for row in data["xtx"]]
+            xty = [float(value) for value in data["xty"]]
+            weight = float(data["weight"])
+            yty = float(data["yty"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        if len(xty) != self.size or len(xtx) != self.size or any(len(row) != self.size for row in xtx):
+            return False
+        self.xtx, self.xty, self.weight, self.yty = xtx, xty, weight, yty
+        return True
+
+
+def _solve(augmented: List[List[float]]) -> Optional[List[float]]:
+    """Solve a linear system given as an augmented matrix (Gaussian elimination, partial pivoting)."""
+    size = len(augmented)
+    scale = max((abs(value) for row in augmented for value in row[:size]), default=0.0)
+    if scale == 0:
+        return None
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda row: abs(augmented[row][col]))
+        if abs(augmented[pivot][col]) <= scale * 1e-12:
+            return None
+        augmented[col], augmented[pivot] = augmented[pivot], augmented[col]
+        pivot_row = augmented[col]
+        for row in range(col + 1, size):
+            factor = augmented[row][col] / pivot_row[col]
+            if factor:
+                target = augmented[row]
+                for k in range(col, size + 1):
+                    target[k] -= factor * pivot_row[k]
+
+    solution = [0.0] * size
+    for row in range(size - 1, -1, -1):
+        total = augmented[row][size] - sum(
+            augmented[row][k] * solution[k] for k in range(row + 1, size)
+        )
+        solution[row] = total / augmented[row][row]
+    return solution
+
+
+def solve_brightness(
+    weights: Sequence[float],
+    intercept: float,
+    target_lux: float,
+    current: Sequence[float],
+    low: Sequence[float],
+    high: Sequence[float],
+) -> List[float]:
+    """Brightness vector closest to current that reaches target_lux under the per-light model.
+
+    The minimum-norm change spreads the missing lux over the lights in
+    proportion to their weight. Lights that would leave their [low, high]
+    range are pinned to the bound and the rest is spread over the others.
+    Lights that do not add light (weight <= 0) stay where they are.
+    """
+    result = [min(max(value, lo), hi) for value, lo, hi in zip(current, low, high)]
+    free = {i for i, weight in enumerate(weights) if weight > 0}
+    while free:
+        missing = target_lux - intercept - sum(w * b for w, b in zip(weights, result))
+        step = missing / sum(weights[i] ** 2 for i in free)
+        proposal = {i: result[i] + weights[i] * step for i in free}
+        violated = [i for i, value in proposal.items() if not low[i] <= value <= high[i]]
+        if not violated:
+            for i, value in proposal.items():
+                result[i] = value
+            break
+        for i in violated:
+            result[i] = min(max(proposal[i], low[i]), high[i])
+            free.discard(i)
+    return result
+
+
+RECENT_RESIDUALS = 20
+RIDGE = 1e-6  # Relative to the largest brightness second moment
+T_EXACT_DOF = 30  # Student t quantiles are exact below this many degrees of freedom
+T_BISECTIONS = 60
+
+
+def t_quantile(confidence: float, dof: int) -> float:
+    """Two-sided Student t quantile for a confidence level.
+
+    Below T_EXACT_DOF degrees of freedom the closed-form t distribution is
+    inverted by bisection; above it the Cornish-Fisher expansion around the
+    normal quantile is well within 0.1%, no scipy needed.
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    if dof <= 0:
+        return z
+    if dof < T_EXACT_DOF:
+        low, high = 0.0, math.pi / 2
+        for _ in range(T_BISECTIONS):
+            theta = (low + high) / 2
+            if _t_central_probability(theta, dof) < confidence:
+                low = theta
+            else:
+                high = theta
+        return math.sqrt(dof) * math.tan((low + high) / 2)
+    z3 = z ** 3
+    z5 = z ** 5
+    return z + (z3 + z) / (4 * dof) + (5 * z5 + 16 * z3 + 3 * z) / (96 * dof * dof)
+
+
+def _t_central_probability(theta: float, dof: int) -> float:
+    """P(|T| < t) for integer dof, with t = sqrt(dof) * tan(theta)."""
+    sin, cos = math.sin(theta), math.cos(theta)
+    cos2 = cos * cos
+    if dof % 2:
+        # Odd: 2/pi * (theta + sin * (cos + 2/3 cos³ + 2·4/(3·5) cos⁵ + ...))
+        term = cos
+        total = 0.0
+        for k in range(1, dof - 1, 2):
+            total += term
+            term *= cos2 * (k + 1) / (k + 2)
+        return 2 / math.pi * (theta + sin * total) if dof > 1 else 2 * theta / math.pi
+    # Even: sin * (1 + 1/2 cos² + 1·3/(2·4) cos⁴ + ...)
+    term = 1.0
+    total = 0.0
+    for k in range(0, dof - 1, 2):
+        total += term
+        term *= cos2 * (k + 1) / (k + 2)
+    return sin * total
+
+
+def quality_bucket(r_squared: float) -> str:
+    """Describe a regression quality (R²)."""
+    if r_squared >= 0.8:
+        return "Excellent"
+    if r_squared >= 0.6:
+        return "Good"
+    if r_squared >= 0.4:
+        return "Fair"
+    return "Poor"
+
+
+class ModelStats(NamedTuple):
+    """Derived statistics of one model version.
+
+    Residuals are |lux - predicted lux| over the samples left after outlier
+    filtering; recent_residual_mean covers the newest RECENT_RESIDUALS of them.
+    """
+
+    version: int
+    sample_count: int
+    filtered_count: int
+    outlier_count: int
+    residual_mean: Optional[float]
+    residual_max: Optional[float]
+    recent_residual_mean: Optional[float]
+    quality_bucket: str
+    last_sample_time: Optional[datetime]
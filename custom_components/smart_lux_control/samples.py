@@ -0,0 +1,127 @@
+"""Compact sample storage for Smart Lux Control."""
+from __future__ import annotations
+
+from array import array
+from datetime import datetime
+from typing import Iterator, List, Optional, Union, overload
+
+
+class Sample:
+    """Read-only view of one brightness/lux sample.
+
+    Unpacks like the old (brightness, lux, timestamp) tuples, so existing
+    call sites keep working.
+    """
+
+    __slots__ = ("brightness", "lux", "epoch")
+
+    def __init__(self, brightness: float, lux: float, epoch: int) -> None:
+        """Initialize the sample."""
+        self.brightness = brightness
+        self.lux = lux
+        self.epoch = epoch
+
+    @property
+    def timestamp(self) -> datetime:
+        """Sample time as a naive local datetime."""
+        return datetime.fromtimestamp(self.epoch)
+
+    def __iter__(self) -> Iterator:
+        """Iterate as (brightness, lux, timestamp)."""
+        yield self.brightness
+        yield self.lux
+        yield self.timestamp
+
+    def __getitem__(self, index: int):
+        """Index as (brightness, lux, timestamp)."""
+        return (self.brightness, self.lux, self.timestamp)[index]
+
+    def __repr__(self) -> str:
+        """Return the representation."""
+        return f"Sample(brightness={self.brightness}, lux={self.lux}, epoch={self.epoch})"
+
+
+class SampleBuffer:
+    """Fixed-capacity ring buffer of samples backed by typed arrays.
+
+    Brightness and lux are stored as float32 and timestamps as int64 epoch
+    seconds. Every value is written twice, at i and i + capacity, so the
+    current window is always one contiguous slice and the *_view() methods
+    can hand out memoryviews without copying. Append and eviction are O(1).
+    """
+
+    __slots__ = ("capacity", "_brightness", "_lux", "_epoch", "_start", "_count")
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize an empty buffer."""
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+        self.capacity = capacity
+        self._brightness = array("f", bytes(4 * 2 * capacity))
+        self._lux = array("f", bytes(4 * 2 * capacity))
+        self._epoch = array("q", bytes(8 * 2 * capacity))
+        self._start = 0
+        self._count = 0
+
+    def append(self, brightness: float, lux: float, epoch: int) -> Optional[Sample]:
+        """Append a sample. Returns the evicted sample when the buffer was full."""
+        evicted = None
+        if self._count < self.capacity:
+            pos = (self._start + self._count) % self.capacity
+            self._count += 1
+        else:
+            pos = self._start
+            evicted = self[0]
+            self._start = (self._start + 1) % self.capacity
+
+        for column, value in ((self._brightness, brightness), (self._lux, lux), (self._epoch, int(epoch))):
+            column[pos] = value
+            column[pos + self.capacity] = value
+        return evicted
+
+    def clear(self) -> None:
+        """Remove all samples."""
+        self._start = 0
+        self._count = 0
+
+    def brightness_view(self) -> memoryview:
+        """Zero-copy view of brightness values, oldest first."""
+        return memoryview(self._brightness)[self._start:self._start + self._count]
+
+    def lux_view(self) -> memoryview:
+        """Zero-copy view of lux values, oldest first."""
+        return memoryview(self._lux)[self._start:self._start + self._count]
+
+    def epoch_view(self) -> memoryview:
+        """Zero-copy view of epoch timestamps, oldest first."""
+        return memoryview(self._epoch)[self._start:self._start + self._count]
+
+    def __len__(self) -> int:
+        """Return the number of samples."""
+        return self._count
+
+    def __bool__(self) -> bool:
+        """Return True if there are samples."""
+        return self._count > 0
+
+    def __iter__(self) -> Iterator[Sample]:
+        """Iterate samples, oldest first."""
+        for i in range(self._start, self._start + self._count):
+            yield Sample(self._brightness[i], self._lux[i], self._epoch[i])
+
+    @overload
+    def __getitem__(self, index: int) -> Sample: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Sample]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Sample, List[Sample]]:
+        """Get a sample (or a list of samples for a slice), oldest first."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("sample index out of range")
+        i = self._start + index
+        return Sample(self._brightness[i], self._lux[i], self._epoch[i])
@@ -6,11 +6,21 @@ from typing import Any, Dict, Optional
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, SENSOR_TYPES
+from .const import (
+    DOMAIN,
+    SENSOR_TYPES,
+    CONF_DISABLED_SENSORS,
+    CONF_DIAGNOSTIC_ENTITY,
+    DIAGNOSTIC_SENSOR,
+    DIAGNOSTIC_SENSOR_TYPE,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,10 +33,26 @@ async def async_setup_entry(
     """Set up Smart Lux Control sensors."""
     try:
         coordinator = hass.data[DOMAIN][entry.entry_id]
+        disabled = set(entry.data.get(CONF_DISABLED_SENSORS, []))
         
         entities = []
         for sensor_type in SENSOR_TYPES:
-            entities.append(SmartLuxSensor(coordinator, sensor_type))
+            if sensor_type not in disabled:
+                entities.append(SmartLuxSensor(coordinator, sensor_type))
+        
+        if entry.data.get(CONF_DIAGNOSTIC_ENTITY, False):
+            entities.append(SmartLuxDiagnosticSensor(coordinator))
+        else:
+            disabled.add(DIAGNOSTIC_SENSOR_TYPE)
+        
+        # Drop registry entries of sensor types the room no longer creates
+        registry = er.async_get(hass)
+        for sensor_type in disabled:
+            entity_id = registry.async_get_entity_id(
+                "sensor", DOMAIN, f"{DOMAIN}_{coordinator.room_name}_{sensor_type}"
+            )
+            if entity_id:
+                registry.async_remove(entity_id)
         
         async_add_entities(entities)
         _LOGGER.info("Successfully set up %d sensors for %s", len(entities), entry.title)
@@ -37,19 +63,110 @@ async def async_setup_entry(
 
 
 class SmartLuxSensor(SensorEntity):
-    """Smart Lux Control sensor."""
+    """Smart Lux Control sensor.
+
+    Updated by the coordinator's dispatcher signal instead of polling. A new
+    state is written when the value moved by at least the sensor type's
+    threshold since the last written state, or when a stable attribute
+    changed. Volatile attributes are written along but never trigger a write.
+    """
 
-    def __init__(self, coordinator, sensor_type: str) -> None:
+    _attr_should_poll = False
+    # Large or fast-changing attributes stay visible but are not written to the recorder
+    _unrecorded_attributes = frozenset({
+        "lights_detail",
+        "light_entities",
+        "lux_settings",
+        "last_brightness_change",
+        "last_brightness_value",
+        "service_calls_saved",
+        "time_since_motion",
+        "model_version",
+        "light_weights",
+        "adjustment_cycles",
+        "pi_integral",
+        "sensor_lag",
+        "raw_lux",
+        "estimate_std",
+        "latency",
+    })
+    # Attributes that drift with every reading or sample - comparing them would write on every update
+    _volatile_attributes = frozenset({
+        "regression_a",
+        "regression_b",
+        "light_model_quality",
+        "light_weights",
+        "mean_error_all_samples",
+        "max_error",
+        "model_version",
+        "raw_lux",
+        "estimate_std",
+        "noise_suppressed",
+        "pi_integral",
+        "last_regression_update",
+        "time_since_motion",
+        "brightness_cooldown_seconds",
+        "sensor_lag",
+        "service_calls_saved",
+        "latency",
+    })
+
+    def __init__(self, coordinator, sensor_type: str, config: Optional[Dict[str, Any]] = None) -> None:
         """Initialize the sensor."""
         self._coordinator = coordinator
         self._sensor_type = sensor_type
-        self._config = SENSOR_TYPES[sensor_type]
+        self._config = config or SENSOR_TYPES[sensor_type]
         
         self._attr_name = f"{coordinator.room_name} {self._config['name']}"
         self._attr_unique_id = f"{DOMAIN}_{coordinator.room_name}_{sensor_type}"
         self._attr_unit_of_measurement = self._config["unit"]
         self._attr_icon = self._config["icon"]
         self._attr_device_class = self._config["device_class"]
+        if self._config["diagnostic"]:
+            self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._threshold = self._config["threshold"]
+        self._written_value: Any = None
+        self._written_attributes: Optional[Dict[str, Any]] = None
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to coordinator updates."""
+        self._written_value = self.native_value
+        self._written_attributes = self._stable_attributes(self.extra_state_attributes)
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, self._coordinator.update_signal, self._async_handle_update
+            )
+        )
+
+    @callback
+    def _async_handle_update(self) -> None:
+        """Write the state if the value changed significantly or a stable attribute changed."""
+        value = self.native_value
+        attributes = self._stable_attributes(self.extra_state_attributes)
+        if not self._moved(value, self._written_value, self._threshold) and not self._attributes_changed(attributes):
+            return
+        self._written_value = value
+        self._written_attributes = attributes
+        self.async_write_ha_state()
+
+    def _stable_attributes(self, attributes: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the attributes that are compared to decide on a write."""
+        return {key: value for key, value in attributes.items() if key not in self._volatile_attributes}
+
+    def _attributes_changed(self, attributes: Dict[str, Any]) -> bool:
+        """Check if the stable attributes differ from the last written ones."""
+        return attributes != self._written_attributes
+
+    @staticmethod
+    def _moved(value: Any, written: Any, threshold: Optional[float]) -> bool:
+        """Check if value differs from written by at least threshold - by anything without one."""
+        if (
+            threshold is None
+            or not isinstance(value, (int, float))
+            or not isinstance(written, (int, float))
+        ):
+            return value != written
+        return abs(value - written) >= threshold
 
     @property
     def device_info(self) -> Dict[str, Any]:
@@ -65,13 +182,17 @@ class SmartLuxSensor(SensorEntity):
     @property
     def native_value(self) -> Any:
         """Return the state of the sensor."""
-        if self._sensor_type == "regression_quality":
+        return self._value_for(self._sensor_type)
+
+    def _value_for(self, sensor_type: str) -> Any:
+        """Get the value of a sensor type."""
+        if sensor_type == "regression_quality":
             return round(self._coordinator.regression_quality, 3)
         
-        elif self._sensor_type == "sample_count":
+        elif sensor_type == "sample_count":
             return self._coordinator.sample_count
         
-        elif self._sensor_type == "smart_mode_status":
+        elif sensor_type == "smart_mode_status":
             if self._coordinator.is_smart_mode_active:
                 return "Smart Active"
             elif self._coordinator.sample_count >= 5:
@@ -79,27 +200,22 @@ class SmartLuxSensor(SensorEntity):
             else:
                 return "Learning Mode"
         
-        elif self._sensor_type == "predicted_lux":
+        elif sensor_type == "predicted_lux":
             predicted = self._coordinator.predicted_lux
             if predicted is not None:
                 return round(predicted, 1)
             # If can't predict, show current sensor reading instead
-            lux_state = self._coordinator.hass.states.get(self._coordinator.lux_sensor)
-            if lux_state and lux_state.state not in ("unknown", "unavailable"):
-                try:
-                    return round(float(lux_state.state), 1)
-                except ValueError:
-                    pass
-            return None
+            lux = self._coordinator.snapshot.lux
+            return round(lux, 1) if lux is not None else None
         
-        elif self._sensor_type == "average_error":
+        elif sensor_type == "average_error":
             return self._calculate_average_error()
         
-        elif self._sensor_type == "target_lux":
+        elif sensor_type == "target_lux":
             target = self._coordinator.current_target_lux
             return round(target, 1) if target is not None else self._coordinator.get_target_lux()
         
-        elif self._sensor_type == "automation_status":
+        elif sensor_type == "automation_status":
             if not self._coordinator.auto_control_enabled:
                 return "Disabled"
             elif self._coordinator.should_lights_be_on():
@@ -107,7 +223,7 @@ class SmartLuxSensor(SensorEntity):
             else:
                 return "Standby"
         
-        elif self._sensor_type == "last_automation_action":
+        elif sensor_type == "last_automation_action":
             action = self._coordinator.last_automation_action or "None"
             
             # Show human-readable cooldown status
@@ -119,66 +235,43 @@ class SmartLuxSensor(SensorEntity):
                     return action
             return action
         
-        elif self._sensor_type == "motion_timer":
-            if not self._coordinator.last_motion_time:
-                return None
-            
-            from homeassistant.util import dt as dt_util
-            now = dt_util.now()
-            time_since = (now - self._coordinator.last_motion_time).total_seconds() / 60
-            return round(self._coordinator.keep_on_minutes - time_since, 1)
+        elif sensor_type == "motion_timer":
+            # Deadline timestamp - the frontend counts down, no refresh needed
+            return self._coordinator.motion_deadline
         
-        elif self._sensor_type == "motion_status":
-            motion_state = self._coordinator.hass.states.get(self._coordinator.motion_sensor)
-            if not motion_state:
+        elif sensor_type == "motion_status":
+            snapshot = self._coordinator.snapshot
+            if snapshot.motion is None:
                 return "Sensor Unavailable"
             
-            if motion_state.state == "on":
+            if snapshot.motion_detected:
                 return "Motion Detected"
             elif self._coordinator.should_lights_be_on():
                 return "In Timer Period"
             else:
                 return "No Motion"
         
-        elif self._sensor_type == "lights_status":
-            lights_on = 0
-            lights_total = len(self._coordinator.light_entities)
-            avg_brightness = 0
-            
-            for light_entity in self._coordinator.light_entities:
-                light_state = self._coordinator.hass.states.get(light_entity)
-                if light_state and light_state.state == "on":
-                    lights_on += 1
-                    brightness = light_state.attributes.get("brightness", 255)
-                    avg_brightness += brightness
+        elif sensor_type == "lights_status":
+            snapshot = self._coordinator.snapshot
+            lights_on = snapshot.lights_on
+            lights_total = len(snapshot.lights)
             
             if lights_on == 0:
                 return "All Off"
-            elif lights_on == lights_total:
-                avg_brightness = int(avg_brightness / lights_on)
+            avg_brightness = int(snapshot.average_brightness)
+            if lights_on == lights_total:
                 return f"All On ({avg_brightness}/255)"
-            else:
-                avg_brightness = int(avg_brightness / lights_on) if lights_on > 0 else 0
-                return f"{lights_on}/{lights_total} On ({avg_brightness}/255)"
+            return f"{lights_on}/{lights_total} On ({avg_brightness}/255)"
         
         return None
 
     def _calculate_average_error(self) -> Optional[float]:
-        """Calculate average prediction error."""
-        if len(self._coordinator.samples) < 5:
-            return None
-        
-        brightness_vals, lux_vals = self._coordinator._filter_samples()
-        if len(brightness_vals) < 5:
+        """Get average prediction error over the last 20 filtered samples."""
+        stats = self._coordinator.model_stats
+        if stats.sample_count < 5 or stats.filtered_count < 5:
             return None
         
-        errors = []
-        for brightness, lux in zip(brightness_vals[-20:], lux_vals[-20:]):  # Last 20 samples
-            predicted_lux = self._coordinator.regression_a * brightness + self._coordinator.regression_b
-            error = abs(lux - predicted_lux)
-            errors.append(error)
-        
-        return round(sum(errors) / len(errors), 1) if errors else None
+        return round(stats.recent_residual_mean, 1)
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
@@ -189,21 +282,36 @@ class SmartLuxSensor(SensorEntity):
             attrs.update({
                 "regression_a": round(self._coordinator.regression_a, 4),
                 "regression_b": round(self._coordinator.regression_b, 1),
-                "quality_status": self._get_quality_status(),
+                "quality_status": self._coordinator.model_stats.quality_bucket,
+                "light_model_quality": round(self._coordinator.light_quality, 3),
+                "light_weights": {
+                    entity_id: round(weight, 4)
+                    for entity_id, weight in zip(
+                        self._coordinator.light_entities, self._coordinator.light_weights or []
+                    )
+                },
+            })
+        
+        elif self._sensor_type == "average_error":
+            stats = self._coordinator.model_stats
+            attrs.update({
+                "mean_error_all_samples": round(stats.residual_mean, 1) if stats.residual_mean is not None else None,
+                "max_error": round(stats.residual_max, 1) if stats.residual_max is not None else None,
+                "outlier_count": stats.outlier_count,
+                "model_version": stats.version,
             })
         
         elif self._sensor_type == "predicted_lux":
             # Additional info for predicted lux sensor
-            lights_on = sum(1 for light_entity in self._coordinator.light_entities 
-                          if self._coordinator.hass.states.get(light_entity) 
-                          and self._coordinator.hass.states.get(light_entity).state == "on")
-            
             attrs.update({
-                "lights_on_count": lights_on,
+                "lights_on_count": self._coordinator.snapshot.lights_on,
                 "total_lights": len(self._coordinator.light_entities),
                 "regression_ready": self._coordinator.regression_quality >= 0.1,
                 "learning_phase": self._coordinator.sample_count < 10,
                 "fallback_to_sensor": self._coordinator.predicted_lux is None,
+                "raw_lux": self._coordinator.snapshot.lux,
+                "estimate_std": round(self._coordinator.lux_filter.std, 1) if self._coordinator.lux_filter.std is not None else None,
+                "noise_suppressed": self._coordinator.noise_suppressed,
             })
         
         elif self._sensor_type == "smart_mode_status":
@@ -211,6 +319,10 @@ class SmartLuxSensor(SensorEntity):
                 "regression_quality": round(self._coordinator.regression_quality, 3),
                 "min_required_quality": self._coordinator.min_regression_quality,
                 "can_use_smart_mode": self._coordinator.is_smart_mode_active,
+                "per_light_model": self._coordinator.is_light_model_active,
+                "adjustment_cycles": self._coordinator.convergence.as_dict(),
+                "controller": self._coordinator.controller_type,
+                "pi_integral": round(self._coordinator.controller.integral, 1),
             })
         
         elif self._sensor_type == "sample_count":
@@ -228,11 +340,7 @@ class SmartLuxSensor(SensorEntity):
         
         elif self._sensor_type == "target_lux":
             # Get home mode if available
-            mode = "normal"
-            if self._coordinator.home_mode_select:
-                mode_state = self._coordinator.hass.states.get(self._coordinator.home_mode_select)
-                if mode_state:
-                    mode = mode_state.state
+            mode = self._coordinator.snapshot.mode or "normal"
             
             attrs.update({
                 "home_mode": mode,
@@ -241,21 +349,20 @@ class SmartLuxSensor(SensorEntity):
             })
         
         elif self._sensor_type == "motion_timer":
-            motion_state = self._coordinator.hass.states.get(self._coordinator.motion_sensor)
             attrs.update({
                 "keep_on_minutes": self._coordinator.keep_on_minutes,
-                "motion_currently_detected": motion_state.state == "on" if motion_state else False,
+                "motion_currently_detected": self._coordinator.snapshot.motion_detected,
                 "last_motion_time": self._coordinator.last_motion_time.isoformat() if self._coordinator.last_motion_time else None,
             })
         
         elif self._sensor_type == "motion_status":
-            motion_state = self._coordinator.hass.states.get(self._coordinator.motion_sensor)
+            motion = self._coordinator.snapshot.motion
             from homeassistant.util import dt as dt_util
             now = dt_util.now()
             
             attrs.update({
                 "motion_sensor_entity": self._coordinator.motion_sensor,
-                "motion_sensor_state": motion_state.state if motion_state else "unknown",
+                "motion_sensor_state": motion if motion is not None else "unknown",
                 "should_lights_be_on": self._coordinator.should_lights_be_on(),
                 "auto_control_enabled": self._coordinator.auto_control_enabled,
                 "last_motion_trigger": self._coordinator.last_motion_time.isoformat() if self._coordinator.last_motion_time else None,
@@ -263,25 +370,15 @@ class SmartLuxSensor(SensorEntity):
             })
         
         elif self._sensor_type == "lights_status":
-            lights_info = []
-            
-            for light_entity in self._coordinator.light_entities:
-                light_state = self._coordinator.hass.states.get(light_entity)
-                if light_state:
-                    brightness = light_state.attributes.get("brightness", 255) if light_state.state == "on" else 0
-                    lights_info.append({
-                        "entity_id": light_entity,
-                        "state": light_state.state,
-                        "brightness": brightness,
-                        "friendly_name": light_state.attributes.get("friendly_name", light_entity)
-                    })
-                else:
-                    lights_info.append({
-                        "entity_id": light_entity,
-                        "state": "unavailable",
-                        "brightness": 0,
-                        "friendly_name": light_entity
-                    })
+            lights_info = [
+                {
+                    "entity_id": light.entity_id,
+                    "state": light.state if light.state is not None else "unavailable",
+                    "brightness": light.effective_brightness,
+                    "friendly_name": light.friendly_name,
+                }
+                for light in self._coordinator.snapshot.lights
+            ]
             
             attrs.update({
                 "controlled_by_automation": self._coordinator.lights_controlled_by_automation,
@@ -289,33 +386,60 @@ class SmartLuxSensor(SensorEntity):
                 "lights_detail": lights_info,
                 "auto_control_enabled": self._coordinator.auto_control_enabled,
                 "last_action": self._coordinator.last_automation_action,
-                "brightness_cooldown_seconds": self._coordinator.brightness_cooldown_seconds,
+                "brightness_cooldown_seconds": round(self._coordinator.cooldown_seconds, 1),
+                "sensor_lag": self._coordinator.sensor_lag.as_dict(),
                 "last_brightness_change": self._coordinator.last_brightness_change_time.isoformat() if self._coordinator.last_brightness_change_time else None,
                 "last_brightness_value": self._coordinator.last_brightness_change_value,
+                "service_calls_saved": self._coordinator.service_calls_saved,
             })
+            if self._coordinator.latency is not None:
+                attrs["latency"] = self._coordinator.latency.as_dict()
         
         return attrs
 
-    def _get_quality_status(self) -> str:
-        """Get quality status description."""
-        quality = self._coordinator.regression_quality
-        if quality >= 0.8:
-            return "Excellent"
-        elif quality >= 0.6:
-            return "Good"
-        elif quality >= 0.4:
-            return "Fair"
-        else:
-            return "Poor"
-
     def _get_last_sample_time(self) -> Optional[str]:
         """Get timestamp of last sample."""
-        if not self._coordinator.samples:
-            return None
-        
-        return self._coordinator.samples[-1][2].isoformat()
+        last_sample_time = self._coordinator.model_stats.last_sample_time
+        return last_sample_time.isoformat() if last_sample_time else None
+ 
+
+
+class SmartLuxDiagnosticSensor(SmartLuxSensor):
+    """One diagnostic entity that collects the values of all diagnostic sensor types.
+
+    Lets rooms drop the individual diagnostic sensors while keeping their
+    values at hand. The attributes are not recorded, only the state is.
+    Each collected value uses its own sensor type's threshold.
+    """
+
+    _unrecorded_attributes = SmartLuxSensor._unrecorded_attributes | frozenset(
+        sensor_type for sensor_type, config in SENSOR_TYPES.items() if config["diagnostic"]
+    )
+
+    def __init__(self, coordinator) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, DIAGNOSTIC_SENSOR_TYPE, DIAGNOSTIC_SENSOR)
+
+    @property
+    def native_value(self) -> Any:
+        """Return the smart mode status as the state."""
+        return self._value_for("smart_mode_status")
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the diagnostic sensor values."""
+        return {
+            sensor_type: self._value_for(sensor_type)
+            for sensor_type, config in SENSOR_TYPES.items()
+            if config["diagnostic"]
+        }
 
-    async def async_update(self) -> None:
-        """Update the sensor."""
-        # The coordinator handles the data updates
-        pass 
\ No newline at end of file
+    def _attributes_changed(self, attributes: Dict[str, Any]) -> bool:
+        """Check if any collected value moved by at least its sensor type's threshold."""
+        written = self._written_attributes
+        if written is None:
+            return True
+        return any(
+            self._moved(value, written.get(sensor_type), SENSOR_TYPES[sensor_type]["threshold"])
+            for sensor_type, value in attributes.items()
+        )
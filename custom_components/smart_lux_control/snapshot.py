@@ -0,0 +1,147 @@
+"""Room state mirror for Smart Lux Control."""
+from __future__ import annotations
+
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+from homeassistant.core import State
+
+UNAVAILABLE_STATES = ("unknown", "unavailable")
+
+
+class LightSnapshot(NamedTuple):
+    """State of one controlled light."""
+
+    entity_id: str
+    state: Optional[str]  # None when the entity does not exist
+    brightness: Optional[int]  # Reported brightness, None when off or not reported
+    friendly_name: str
+
+    @classmethod
+    def from_state(cls, entity_id: str, state: Optional[State]) -> "LightSnapshot":
+        """Create the snapshot from a state object."""
+        if state is None:
+            return cls(entity_id, None, None, entity_id)
+        brightness = state.attributes.get("brightness") if state.state == "on" else None
+        return cls(
+            entity_id,
+            state.state,
+            brightness,
+            state.attributes.get("friendly_name", entity_id),
+        )
+
+    @property
+    def is_on(self) -> bool:
+        """Return if the light is on."""
+        return self.state == "on"
+
+    @property
+    def effective_brightness(self) -> int:
+        """Brightness as used for control - an on light without a brightness counts as full."""
+        if not self.is_on:
+            return 0
+        return self.brightness if self.brightness is not None else 255
+
+
+class RoomSnapshot(NamedTuple):
+    """Immutable view of the entities a room coordinator works with.
+
+    The coordinator replaces it from its state_changed listeners, so reads
+    never touch the state machine. The light aggregates are kept up to date
+    on every replacement instead of being recomputed by each reader.
+    """
+
+    lights: Tuple[LightSnapshot, ...]
+    lux: Optional[float]  # None when unknown, unavailable or not numeric
+    motion: Optional[str]  # None when the entity does not exist
+    mode: Optional[str]
+    lights_on: int
+    brightness_total: int  # Sum of effective_brightness over lights that are on
+    reported_count: int  # Lights that are on and report a brightness
+    reported_total: int  # Sum of reported brightness
+    light_index: Dict[str, int]  # Shared between versions, never mutated
+
+    @classmethod
+    def from_states(
+        cls,
+        light_entities: Sequence[str],
+        lights: Sequence[Optional[State]],
+        lux: Optional[State],
+        motion: Optional[State],
+        mode: Optional[State],
+    ) -> "RoomSnapshot":
+        """Create the snapshot from state objects."""
+        light_snapshots = tuple(
+            LightSnapshot.from_state(entity_id, state) for entity_id, state in zip(light_entities, lights)
+        )
+        on = [light for light in light_snapshots if light.is_on]
+        reported = [light.brightness for light in on if light.brightness is not None]
+        return cls(
+            lights=light_snapshots,
+            lux=_lux_value(lux),
+            motion=motion.state if motion else None,
+            mode=mode.state if mode else None,
+            lights_on=len(on),
+            brightness_total=sum(light.effective_brightness for light in on),
+            reported_count=len(reported),
+            reported_total=sum(reported),
+            light_index={entity_id: index for index, entity_id in enumerate(light_entities)},
+        )
+
+    def with_light(self, entity_id: str, state: Optional[State]) -> "RoomSnapshot":
+        """Get a copy with one light replaced - aggregates are updated in O(1)."""
+        index = self.light_index[entity_id]
+        old = self.lights[index]
+        new = LightSnapshot.from_state(entity_id, state)
+        if new == old:
+            return self
+
+        lights = self.lights[:index] + (new,) + self.lights[index + 1:]
+        return self._replace(
+            lights=lights,
+            lights_on=self.lights_on - old.is_on + new.is_on,
+            brightness_total=self.brightness_total - old.effective_brightness + new.effective_brightness,
+            reported_count=self.reported_count - (old.brightness is not None) + (new.brightness is not None),
+            reported_total=self.reported_total - (old.brightness or 0) + (new.brightness or 0),
+        )
+
+    def with_lux(self, state: Optional[State]) -> "RoomSnapshot":
+        """Get a copy with a new lux reading."""
+        return self._replace(lux=_lux_value(state))
+
+    def with_motion(self, state: Optional[State]) -> "RoomSnapshot":
+        """Get a copy with a new motion state."""
+        return self._replace(motion=state.state if state else None)
+
+    def with_mode(self, state: Optional[State]) -> "RoomSnapshot":
+        """Get a copy with a new home mode."""
+        return self._replace(mode=state.state if state else None)
+
+    @property
+    def motion_detected(self) -> bool:
+        """Return if the motion sensor reports motion."""
+        return self.motion == "on"
+
+    @property
+    def average_brightness(self) -> Optional[float]:
+        """Average brightness of the lights that are on, None when all are off."""
+        return self.brightness_total / self.lights_on if self.lights_on else None
+
+    @property
+    def average_reported_brightness(self) -> Optional[float]:
+        """Average brightness of the lights that report one, None when none do."""
+        return self.reported_total / self.reported_count if self.reported_count else None
+
+    @property
+    def existing_lights(self) -> Tuple[str, ...]:
+        """Entity IDs of the lights that exist in the state machine."""
+        return tuple(light.entity_id for light in self.lights if light.state is not None)
+
+
+def _lux_value(state: Optional[State]) -> Optional[float]:
+    """Get the numeric lux value of a state."""
+    if state is None or state.state in UNAVAILABLE_STATES:
+        return None
+    try:
+        return float(state.state)
+    except ValueError:
+        return None
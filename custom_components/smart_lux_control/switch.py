@@ -6,7 +6,8 @@ from typing import Any, Dict
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN
@@ -40,14 +41,39 @@ async def async_setup_entry(
 class SmartLuxBaseSwitch(SwitchEntity):
     """Base class for Smart Lux Control switches."""
 
+    _attr_should_poll = False
+
     def __init__(self, coordinator, switch_type: str, name_suffix: str) -> None:
         """Initialize the switch."""
         self._coordinator = coordinator
         self._switch_type = switch_type
+        self._written_state: Any = None
         
         self._attr_name = f"{coordinator.room_name} {name_suffix}"
         self._attr_unique_id = f"{DOMAIN}_{coordinator.room_name}_{switch_type}"
 
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to coordinator updates."""
+        self._written_state = self._current_state()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, self._coordinator.update_signal, self._async_handle_update
+            )
+        )
+
+    @callback
+    def _async_handle_update(self) -> None:
+        """Write the state if anything shown by the switch changed."""
+        state = self._current_state()
+        if state == self._written_state:
+            return
+        self._written_state = state
+        self.async_write_ha_state()
+
+    def _current_state(self) -> tuple:
+        """Get everything the switch shows."""
+        return (self.is_on, self.available, self.extra_state_attributes)
+
     @property
     def device_info(self) -> Dict[str, Any]:
         """Return device information."""
@@ -81,12 +107,12 @@ class SmartModeSwitch(SmartLuxBaseSwitch):
     async def async_turn_on(self, **kwargs) -> None:
         """Turn on smart mode."""
         self._coordinator.set_smart_mode(True)
-        await self._coordinator._async_save_data()
+        self._coordinator.async_schedule_save()
 
     async def async_turn_off(self, **kwargs) -> None:
         """Turn off smart mode."""
         self._coordinator.set_smart_mode(False)
-        await self._coordinator._async_save_data()
+        self._coordinator.async_schedule_save()
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
@@ -148,12 +174,12 @@ class AutoControlSwitch(SmartLuxBaseSwitch):
     async def async_turn_on(self, **kwargs) -> None:
         """Turn on auto control."""
         self._coordinator.enable_auto_control(True)
-        await self._coordinator._async_save_data()
+        self._coordinator.async_schedule_save()
 
     async def async_turn_off(self, **kwargs) -> None:
         """Turn off auto control."""
         self._coordinator.enable_auto_control(False)
-        await self._coordinator._async_save_data()
+        self._coordinator.async_schedule_save()
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
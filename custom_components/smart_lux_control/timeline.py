@@ -0,0 +1,139 @@
+"""Precomputed target lux timeline for Smart Lux Control."""
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence, Tuple
+
+
+class TargetLuxTimeline:
+    """Piecewise-linear target lux as a function of a UNIX timestamp.
+
+    The timeline is a sorted list of knots. Between two knots the value is
+    interpolated linearly, two knots at the same time form a step, and
+    outside the knots the nearest knot value is held. Lookups are a single
+    bisect - no state reads or datetime parsing.
+    """
+
+    __slots__ = ("_times", "_values", "valid_from", "valid_until")
+
+    def __init__(
+        self,
+        knots: Sequence[Tuple[float, float]],
+        valid_from: float = float("-inf"),
+        valid_until: float = float("inf"),
+    ) -> None:
+        """Initialize the timeline from (timestamp, lux) knots."""
+        if not knots:
+            raise ValueError("Timeline needs at least one knot")
+        knots = sorted(knots, key=lambda knot: knot[0])  # Stable - keeps step order
+        self._times: List[float] = [t for t, _ in knots]
+        self._values: List[float] = [float(v) for _, v in knots]
+        self.valid_from = valid_from
+        self.valid_until = valid_until
+
+    @classmethod
+    def constant(cls, lux: float) -> "TargetLuxTimeline":
+        """Create a timeline with a fixed target (home mode override)."""
+        return cls([(0.0, lux)])
+
+    @classmethod
+    def from_sun(
+        cls,
+        next_rising: float,
+        next_setting: float,
+        buffer_seconds: float,
+        lux_day: float,
+        lux_night: float,
+    ) -> "TargetLuxTimeline":
+        """Create a day/night timeline from the sun.sun next rising/setting times.
+
+        The day ramps from night to day over buffer_seconds after sunrise and
+        back to night over buffer_seconds before sunset. The timeline covers
+        the previous and the next sunrise; it is rebuilt when sun.sun rolls
+        its next_rising/next_setting over.
+        """
+        rises = sorted((next_rising - 86400, next_rising))
+        sets = sorted((next_setting - 86400, next_setting))
+
+        knots: List[Tuple[float, float]] = []
+        for rise in rises:
+            sunset = next((s for s in sets if s > rise), None)
+            if sunset is None:
+                continue
+            # Short days - the two ramps meet in the middle
+            ramp = min(buffer_seconds, (sunset - rise) / 2)
+            knots.extend((
+                (rise, lux_night),
+                (rise + ramp, lux_day),
+                (sunset - ramp, lux_day),
+                (sunset, lux_night),
+            ))
+
+        if not knots:
+            return cls.constant(lux_night)
+        return cls(knots)
+
+    @classmethod
+    def from_hours(
+        cls, now: datetime, lux_day: float, lux_night: float
+    ) -> "TargetLuxTimeline":
+        """Create a day/night timeline from fixed hours (06:00-23:00 is day).
+
+        Used when sun.sun is not available, so it expires at midnight instead
+        of being rebuilt on a sun.sun change.
+        """
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        knots: List[Tuple[float, float]] = []
+        for day in (0, 1):
+            start = (midnight + timedelta(days=day, hours=6)).timestamp()
+            end = (midnight + timedelta(days=day, hours=23)).timestamp()
+            knots.extend(((start, lux_night), (start, lux_day), (end, lux_day), (end, lux_night)))
+        return cls(
+            knots,
+            valid_from=midnight.timestamp(),
+            valid_until=(midnight + timedelta(days=1)).timestamp(),
+        )
+
+    def covers(self, timestamp: float) -> bool:
+        """Check if the timeline is valid at timestamp."""
+        return self.valid_from <= timestamp < self.valid_until
+
+    def value_at(self, timestamp: float) -> float:
+        """Get the target lux at timestamp."""
+        times = self._times
+        index = bisect_right(times, timestamp)
+        if index == 0:
+            return self._values[0]
+        if index == len(times):
+            return self._values[-1]
+
+        t0, t1 = times[index - 1], times[index]
+        v0, v1 = self._values[index - 1], self._values[index]
+        if v0 == v1 or t1 == t0:
+            return v0
+        return v0 + (v1 - v0) * (timestamp - t0) / (t1 - t0)
+
+    def next_change(self, timestamp: float, ramp_step: float) -> Optional[float]:
+        """Get the next timestamp at which value_at() returns a different value.
+
+        Inside a ramp the value changes continuously, so it is followed in
+        ramp_step increments. Returns None when the target no longer changes.
+        """
+        times = self._times
+        index = bisect_right(times, timestamp)
+        if index == len(times):
+            return None
+
+        next_knot = times[index]
+        if index > 0 and self._values[index - 1] != self._values[index] and times[index - 1] != next_knot:
+            return min(next_knot, timestamp + ramp_step)
+
+        # Skip knots that do not change the value (e.g. start of a flat day)
+        current = self.value_at(timestamp)
+        for knot_index in range(index, len(times)):
+            if self._values[knot_index] != current or (
+                knot_index + 1 < len(times) and self._values[knot_index + 1] != current
+            ):
+                return times[knot_index]
+        return None
@@ -0,0 +1,30 @@
+"""Offline simulation of Smart Lux Control.
+
+Runs SmartLuxCoordinator against simulated lights, a lux sensor, daylight
+and scripted motion on a virtual clock, so a whole day takes seconds and
+needs no Home Assistant instance (only the homeassistant package the
+component imports).
+
+    from simulation import run_day
+    print(run_day(hours=24, warmup_hours=24).format())
+"""
+from .clock import SimulationStalled, VirtualClockLoop, WallClock
+from .devices import DIMMING_CURVES, Daylight, MotionScript, SimLight, SimLuxSensor
+from .hass import SimHass, patch_homeassistant
+from .runner import Simulation, SimulationReport, run_day
+
+__all__ = [
+    "DIMMING_CURVES",
+    "Daylight",
+    "MotionScript",
+    "SimHass",
+    "SimLight",
+    "SimLuxSensor",
+    "Simulation",
+    "SimulationReport",
+    "SimulationStalled",
+    "VirtualClockLoop",
+    "WallClock",
+    "patch_homeassistant",
+    "run_day",
+]
@@ -0,0 +1,46 @@
+"""Command line entry point: python -m simulation."""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+
+from .devices import SimLight
+from .runner import LIGHT_ENTITY, run_day
+
+
+def main() -> None:
+    """Run a simulated day and print the report."""
+    parser = argparse.ArgumentParser(description="Simulate Smart Lux Control in one room on a virtual clock.")
+    parser.add_argument("--hours", type=float, default=24.0, help="simulated hours to report on")
+    parser.add_argument("--warmup", type=float, default=0.0, help="hours simulated first to let the model learn")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lights", type=int, default=3, help="number of lights")
+    parser.add_argument("--curve", default="linear", help="dimming curve: linear, gamma or sqrt")
+    parser.add_argument("--latency", type=float, default=0.3, help="light command latency in seconds")
+    parser.add_argument("--sensor-interval", type=float, default=5.0, help="seconds between lux readings")
+    parser.add_argument("--sensor-lag", type=float, default=1.5, help="lux sensor lag in seconds")
+    parser.add_argument("--controller", choices=("step", "pi"), default="step")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="show the component's log")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    lights = [
+        SimLight(LIGHT_ENTITY.format(index), 480 / args.lights, curve=args.curve, latency=args.latency)
+        for index in range(args.lights)
+    ]
+    report = run_day(
+        args.hours,
+        args.warmup,
+        lights=lights,
+        sensor_interval=args.sensor_interval,
+        sensor_lag=args.sensor_lag,
+        config={"controller": args.controller},
+        seed=args.seed,
+    )
+    print(json.dumps(report.as_dict(), indent=2) if args.json else report.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Virtual clock for the Smart Lux Control simulation."""
+from __future__ import annotations
+
+import asyncio
+import selectors
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional, Tuple
+
+
+class SimulationStalled(RuntimeError):
+    """Nothing is scheduled and nothing can wake the loop any more."""
+
+
+class _VirtualSelector:
+    """Selector that jumps the clock instead of sleeping.
+
+    Real file descriptors (the loop's self-pipe) are still polled, but
+    without blocking. Whenever the loop would wait for its next timer, the
+    clock is moved forward by the timeout so the timer is due right away.
+    """
+
+    def __init__(self, loop: "VirtualClockLoop") -> None:
+        """Initialize the selector."""
+        self._loop = loop
+        self._selector = selectors.DefaultSelector()
+
+    def select(self, timeout: Optional[float] = None) -> List[Tuple[Any, int]]:
+        """Poll without blocking, then advance the clock to the next timer."""
+        events = self._selector.select(0)
+        if events or timeout == 0:
+            return events
+        if timeout is None:
+            raise SimulationStalled("Nothing scheduled - the simulation would wait forever")
+        self._loop.advance(timeout)
+        return []
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate registration and cleanup to the real selector."""
+        return getattr(self._selector, name)
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """Event loop running on virtual time.
+
+    loop.time() starts at 0 and only moves when every task is waiting for a
+    timer, so asyncio.sleep(), wait_for() timeouts and call_at() callbacks
+    fire in order without any real waiting. A simulated day takes as long
+    as the callbacks in it need to run.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the loop at virtual time 0."""
+        self._virtual_time = 0.0
+        super().__init__(_VirtualSelector(self))
+
+    def time(self) -> float:
+        """Get the virtual monotonic time in seconds."""
+        return self._virtual_time
+
+    def advance(self, seconds: float) -> None:
+        """Move the clock forward."""
+        if seconds > 0:
+            self._virtual_time += seconds
+
+
+class WallClock:
+    """Wall-clock time derived from the loop's virtual time."""
+
+    __slots__ = ("loop", "start")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, start: datetime) -> None:
+        """Initialize the clock - start is the wall time at loop time 0."""
+        self.loop = loop
+        self.start = start.astimezone(timezone.utc)
+
+    def utcnow(self) -> datetime:
+        """Get the current UTC time."""
+        return self.start + timedelta(seconds=self.loop.time())
+
+    def now(self, time_zone: Any = None) -> datetime:
+        """Get the current time in time_zone (UTC by default)."""
+        return self.utcnow().astimezone(time_zone or timezone.utc)
+
+    def seconds_of_day(self, when: Optional[float] = None) -> float:
+        """Get the seconds since midnight UTC at loop time when (now by default)."""
+        moment = self.utcnow() if when is None else self.at(when)
+        return moment.hour * 3600 + moment.minute * 60 + moment.second + moment.microsecond / 1e6
+
+    def at(self, seconds: float) -> datetime:
+        """Get the wall time at loop time seconds."""
+        return self.start + timedelta(seconds=seconds)
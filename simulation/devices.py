@@ -0,0 +1,263 @@
+"""Simulated lights, lux sensor, daylight and motion for Smart Lux Control."""
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+from collections import deque
+from datetime import timedelta
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from .hass import SimHass, SimServiceCall
+
+# Fraction of full output at a brightness fraction
+DIMMING_CURVES: Dict[str, Callable[[float], float]] = {
+    "linear": lambda level: level,
+    "gamma": lambda level: level ** 2.2,  # Perceptual dimming - dark at low brightness
+    "sqrt": math.sqrt,  # Bright early, flat at the top
+}
+
+
+class SimLight:
+    """Dimmable light with a command latency and a dimming curve.
+
+    A command takes latency seconds to reach the lamp; the new state is
+    reported then and the output ramps over the requested transition. With
+    report_steps > 0 the lamp also reports that many intermediate
+    brightness values during the transition, like many Zigbee bulbs do.
+    """
+
+    def __init__(
+        self,
+        entity_id: str,
+        max_lux: float,
+        curve: str = "linear",
+        latency: float = 0.3,
+        report_steps: int = 0,
+    ) -> None:
+        """Initialize the light - max_lux is its contribution at the sensor at full brightness."""
+        self.entity_id = entity_id
+        self.max_lux = max_lux
+        self.curve = DIMMING_CURVES[curve]
+        self.latency = latency
+        self.report_steps = report_steps
+        self.brightness = 0  # Last commanded brightness, 0 when off
+        # Output ramps: (start, from brightness, end, to brightness), newest last
+        self._ramps: Deque[Tuple[float, float, float, float]] = deque([(0.0, 0.0, 0.0, 0.0)], maxlen=32)
+
+    def output_at(self, when: float) -> float:
+        """Get the brightness the lamp emitted at loop time when."""
+        for start, begin, end, target in reversed(self._ramps):
+            if start <= when:
+                if when >= end:
+                    return target
+                return begin + (target - begin) * (when - start) / (end - start)
+        return self._ramps[0][1]
+
+    def lux_at(self, when: float) -> float:
+        """Get the lamp's lux at the sensor at loop time when."""
+        return self.max_lux * self.curve(self.output_at(when) / 255)
+
+    async def async_command(self, hass: SimHass, brightness: int, transition: float) -> None:
+        """Apply a turn_on/turn_off after the command latency."""
+        await asyncio.sleep(self.latency)
+        now = hass.loop.time()
+        begin = self.output_at(now)
+        self.brightness = brightness
+        self._ramps.append((now, begin, now + transition, float(brightness)))
+
+        steps = self.report_steps if transition > 0 and brightness else 0
+        for step in range(1, steps + 1):
+            level = round(begin + (brightness - begin) * step / (steps + 1))
+            if level > 0:
+                hass.states.async_set(self.entity_id, "on", {"brightness": level})
+            await asyncio.sleep(transition / (steps + 1))
+        self.report(hass)
+
+    def report(self, hass: SimHass) -> None:
+        """Report the commanded state."""
+        if self.brightness:
+            hass.states.async_set(self.entity_id, "on", {"brightness": self.brightness})
+        else:
+            hass.states.async_set(self.entity_id, "off", {})
+
+
+class Daylight:
+    """Daylight reaching the sensor - a sine between sunrise and sunset."""
+
+    __slots__ = ("sunrise_hour", "sunset_hour", "peak_lux")
+
+    def __init__(self, sunrise_hour: float = 6.5, sunset_hour: float = 19.0, peak_lux: float = 250.0) -> None:
+        """Initialize the daylight model."""
+        self.sunrise_hour = sunrise_hour
+        self.sunset_hour = sunset_hour
+        self.peak_lux = peak_lux
+
+    def lux(self, seconds_of_day: float) -> float:
+        """Get the daylight lux at a time of day."""
+        hour = seconds_of_day / 3600
+        if not self.sunrise_hour < hour < self.sunset_hour:
+            return 0.0
+        phase = (hour - self.sunrise_hour) / (self.sunset_hour - self.sunrise_hour)
+        return self.peak_lux * math.sin(math.pi * phase)
+
+
+class SimLuxSensor:
+    """Lux sensor with lag and noise.
+
+    Every interval seconds it reports what it saw lag seconds earlier
+    (daylight plus every light), with Gaussian noise of noise lux plus
+    relative_noise of the reading.
+    """
+
+    def __init__(
+        self,
+        entity_id: str,
+        lights: Sequence[SimLight],
+        daylight: Daylight,
+        interval: float = 5.0,
+        lag: float = 1.5,
+        noise: float = 2.0,
+        relative_noise: float = 0.02,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_id = entity_id
+        self.lights = lights
+        self.daylight = daylight
+        self.interval = interval
+        self.lag = lag
+        self.noise = noise
+        self.relative_noise = relative_noise
+        self.readings = 0
+        self._random = random.Random(seed)
+        self._listeners: List[Callable[[float, float], None]] = []
+
+    def true_lux(self, hass: SimHass, when: float) -> float:
+        """Get the noise-free lux at the sensor at loop time when."""
+        return self.daylight.lux(hass.clock.seconds_of_day(when)) + sum(light.lux_at(when) for light in self.lights)
+
+    def add_listener(self, listener: Callable[[float, float], None]) -> None:
+        """Call listener(true lux, reading) after every report."""
+        self._listeners.append(listener)
+
+    def report(self, hass: SimHass) -> None:
+        """Publish one reading."""
+        now = hass.loop.time()
+        seen = self.true_lux(hass, now - self.lag)
+        reading = max(0.0, seen + self._random.gauss(0, self.noise + self.relative_noise * seen))
+        self.readings += 1
+        hass.states.async_set(self.entity_id, f"{reading:.1f}", {"unit_of_measurement": "lx"})
+        true_lux = self.true_lux(hass, now)
+        for listener in self._listeners:
+            listener(true_lux, reading)
+
+    async def async_run(self, hass: SimHass) -> None:
+        """Report every interval seconds until cancelled."""
+        while True:
+            self.report(hass)
+            await asyncio.sleep(self.interval)
+
+
+class MotionScript:
+    """Scripted room occupancy driving a motion sensor.
+
+    periods are (start hour, minutes) of presence, repeated every day.
+    While someone is present the sensor is on, with a short off gap every
+    gap_every minutes - a PIR sensor clearing while a person sits still.
+    """
+
+    DEFAULT_PERIODS: Tuple[Tuple[float, float], ...] = (
+        (6.75, 45),  # Morning
+        (13.0, 20),  # Lunch
+        (17.5, 120),  # Afternoon and dusk
+        (20.0, 150),  # Evening
+    )
+
+    def __init__(
+        self,
+        entity_id: str,
+        periods: Optional[Sequence[Tuple[float, float]]] = None,
+        gap_every: float = 10.0,
+        gap_seconds: float = 60.0,
+    ) -> None:
+        """Initialize the script."""
+        self.entity_id = entity_id
+        self.periods = tuple(periods if periods is not None else self.DEFAULT_PERIODS)
+        self.gap_every = gap_every
+        self.gap_seconds = gap_seconds
+
+    def events(self, days: int) -> List[Tuple[float, str]]:
+        """Get (seconds since the first midnight, state) for days of occupancy."""
+        events: List[Tuple[float, str]] = []
+        for day in range(days):
+            for start_hour, minutes in self.periods:
+                start = day * 86400 + start_hour * 3600
+                end = start + minutes * 60
+                events.append((start, "on"))
+                gap_start = start + self.gap_every * 60
+                while self.gap_every > 0 and gap_start + self.gap_seconds < end:
+                    events.append((gap_start, "off"))
+                    events.append((gap_start + self.gap_seconds, "on"))
+                    gap_start += self.gap_every * 60
+                events.append((end, "off"))
+        return sorted(events)
+
+    def schedule(self, hass: SimHass, days: int) -> None:
+        """Schedule the motion states on the loop, relative to the first midnight."""
+        midnight = hass.clock.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        offset = (midnight - hass.clock.utcnow()).total_seconds()
+        for seconds, state in self.events(days):
+            delay = seconds + offset
+            if delay >= 0:
+                hass.loop.call_later(delay, hass.states.async_set, self.entity_id, state, {"device_class": "motion"})
+
+
+def register_light_services(hass: SimHass, lights: Sequence[SimLight]) -> None:
+    """Register light.turn_on/turn_off (and homeassistant.update_entity) for the simulated lights."""
+    by_id = {light.entity_id: light for light in lights}
+
+    def _targets(call: SimServiceCall) -> List[SimLight]:
+        entity_ids = call.data.get("entity_id", [])
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+        return [by_id[entity_id] for entity_id in entity_ids if entity_id in by_id]
+
+    async def _turn_on(call: SimServiceCall) -> None:
+        brightness = int(call.data.get("brightness", 255))
+        transition = float(call.data.get("transition", 0))
+        await asyncio.gather(*(light.async_command(hass, brightness, transition) for light in _targets(call)))
+
+    async def _turn_off(call: SimServiceCall) -> None:
+        transition = float(call.data.get("transition", 0))
+        await asyncio.gather(*(light.async_command(hass, 0, transition) for light in _targets(call)))
+
+    async def _update_entity(call: SimServiceCall) -> None:
+        for light in _targets(call):
+            light.report(hass)
+
+    hass.services.async_register("light", "turn_on", _turn_on)
+    hass.services.async_register("light", "turn_off", _turn_off)
+    hass.services.async_register("homeassistant", "update_entity", _update_entity)
+
+
+def sun_attributes(hass: SimHass, daylight: Daylight) -> Tuple[str, Dict[str, str], float]:
+    """Get the sun.sun state, its attributes and seconds until it changes."""
+    now = hass.clock.utcnow()
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    rising = midnight + timedelta(hours=daylight.sunrise_hour)
+    setting = midnight + timedelta(hours=daylight.sunset_hour)
+    if rising <= now:
+        rising += timedelta(days=1)
+    if setting <= now:
+        setting += timedelta(days=1)
+    state = "above_horizon" if setting < rising else "below_horizon"
+    attributes = {"next_rising": rising.isoformat(), "next_setting": setting.isoformat()}
+    return state, attributes, (min(rising, setting) - now).total_seconds()
+
+
+def run_sun(hass: SimHass, daylight: Daylight) -> None:
+    """Keep sun.sun up to date - set now and again at every sunrise and sunset."""
+    state, attributes, seconds = sun_attributes(hass, daylight)
+    hass.states.async_set("sun.sun", state, attributes)
+    hass.loop.call_later(seconds + 0.001, run_sun, hass, daylight)
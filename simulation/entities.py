@@ -0,0 +1,81 @@
+"""Entity layer of the Home Assistant stand-in."""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Any, Iterator, List
+
+from .hass import SimConfigEntry, SimHass, async_dispatcher_connect
+
+
+class _EntityRegistry:
+    """Entity registry without entries - the platforms only look up and remove stale ones."""
+
+    def async_get_entity_id(self, *args: Any) -> None:
+        """No entity is registered."""
+        return None
+
+    def async_remove(self, entity_id: str) -> None:
+        """Nothing to remove."""
+
+
+class _RegistryModule:
+    """Replaces the entity_registry module in the platforms."""
+
+    _registry = _EntityRegistry()
+
+    @classmethod
+    def async_get(cls, hass: SimHass) -> _EntityRegistry:
+        """Get the registry."""
+        return cls._registry
+
+
+def _write_state(hass: SimHass, entity: Any) -> None:
+    """Write an entity's state like async_write_ha_state - value and attributes only."""
+    if hasattr(entity, "native_value"):
+        state = entity.native_value
+    else:
+        state = "on" if entity.is_on else "off"
+    hass.states.async_set(entity.entity_id, state, entity.extra_state_attributes)
+
+
+@contextmanager
+def patch_platforms(hass: SimHass) -> Iterator[None]:
+    """Point the sensor and switch platforms at the stand-in, restored on exit."""
+    from custom_components.smart_lux_control import sensor, switch
+
+    patches = [
+        (sensor, "async_dispatcher_connect", async_dispatcher_connect),
+        (switch, "async_dispatcher_connect", async_dispatcher_connect),
+        (sensor, "er", _RegistryModule),
+    ]
+    originals = [(module, name, getattr(module, name)) for module, name, _ in patches]
+    try:
+        for module, name, replacement in patches:
+            setattr(module, name, replacement)
+        yield
+    finally:
+        for module, name, original in originals:
+            setattr(module, name, original)
+
+
+async def async_setup_entities(hass: SimHass, entry: SimConfigEntry) -> List[Any]:
+    """Set up the room's sensors and switches and subscribe them to the coordinator.
+
+    Must run inside patch_platforms(). Entities are not added to a real
+    entity platform; their state writes go straight to the state machine.
+    """
+    from custom_components.smart_lux_control import sensor, switch
+
+    entities: List[Any] = []
+    for platform in (sensor, switch):
+        added: List[Any] = []
+        await platform.async_setup_entry(hass, entry, added.extend)
+        domain = platform.__name__.rsplit(".", 1)[-1]
+        for entity in added:
+            entity.hass = hass
+            entity.entity_id = f"{domain}.{entity.unique_id}"
+            entity.async_write_ha_state = lambda entity=entity: _write_state(hass, entity)
+            await entity.async_added_to_hass()
+            entity.async_write_ha_state()
+        entities.extend(added)
+    return entities
@@ -0,0 +1,379 @@
+"""Minimal Home Assistant stand-in for the Smart Lux Control simulation.
+
+Only what SmartLuxCoordinator touches is provided: the state machine, the
+service registry, the event bus, Store, the event trackers and the
+dispatcher. Time follows the loop's clock - virtual in the simulation,
+real in the load test.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Set, Union
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import State
+from homeassistant.exceptions import ServiceNotFound
+
+from .clock import WallClock
+
+
+class SimEvent:
+    """Bus event - the coordinator only reads event_type and data."""
+
+    __slots__ = ("event_type", "data", "time_fired")
+
+    def __init__(self, event_type: str, data: Dict[str, Any], time_fired: datetime) -> None:
+        """Initialize the event."""
+        self.event_type = event_type
+        self.data = data
+        self.time_fired = time_fired
+
+
+class SimServiceCall:
+    """Service call passed to simulated service handlers."""
+
+    __slots__ = ("domain", "service", "data")
+
+    def __init__(self, domain: str, service: str, data: Dict[str, Any]) -> None:
+        """Initialize the call."""
+        self.domain = domain
+        self.service = service
+        self.data = data
+
+
+class SimConfigEntry:
+    """Config entry holding only the room's configuration."""
+
+    def __init__(self, data: Dict[str, Any], entry_id: str = "simulation") -> None:
+        """Initialize the entry."""
+        self.entry_id = entry_id
+        self.data = data
+        self.options: Dict[str, Any] = {}
+        self.title = f"Smart Lux Control - {data.get('room_name')}"
+
+
+class SimConfig:
+    """hass.config - only the config directory is used."""
+
+    def __init__(self, config_dir: str) -> None:
+        """Initialize the config."""
+        self.config_dir = config_dir
+        self.time_zone = "UTC"
+
+    def path(self, *parts: str) -> str:
+        """Get a path inside the config directory."""
+        return os.path.join(self.config_dir, *parts)
+
+
+class SimBus:
+    """Event bus - listeners run inline, coroutine listeners as tasks."""
+
+    def __init__(self, hass: "SimHass") -> None:
+        """Initialize the bus."""
+        self._hass = hass
+        self._listeners: Dict[str, List[Callable[[SimEvent], Any]]] = {}
+        self.fired: Counter = Counter()
+
+    def async_listen(self, event_type: str, listener: Callable[[SimEvent], Any]) -> Callable[[], None]:
+        """Listen for event_type, returns the unsubscribe callback."""
+        listeners = self._listeners.setdefault(event_type, [])
+        listeners.append(listener)
+
+        def remove() -> None:
+            if listener in listeners:
+                listeners.remove(listener)
+
+        return remove
+
+    def async_fire(self, event_type: str, event_data: Optional[Dict[str, Any]] = None) -> None:
+        """Fire an event."""
+        self.fired[event_type] += 1
+        listeners = self._listeners.get(event_type)
+        if not listeners:
+            return
+        event = SimEvent(event_type, event_data or {}, self._hass.clock.utcnow())
+        for listener in list(listeners):
+            self._hass.async_run_job(listener, event)
+
+
+class SimStates:
+    """State machine - setting a state fires state_changed like Home Assistant does."""
+
+    def __init__(self, hass: "SimHass") -> None:
+        """Initialize the state machine."""
+        self._hass = hass
+        self._states: Dict[str, State] = {}
+        self._trackers: Dict[str, List[Callable[[SimEvent], Any]]] = {}
+
+    def get(self, entity_id: str) -> Optional[State]:
+        """Get the state of an entity."""
+        return self._states.get(entity_id.lower())
+
+    def async_all(self, domain_filter: Union[str, Iterable[str], None] = None) -> List[State]:
+        """Get all states, optionally of some domains only."""
+        if domain_filter is None:
+            return list(self._states.values())
+        domains = {domain_filter} if isinstance(domain_filter, str) else set(domain_filter)
+        return [state for state in self._states.values() if state.domain in domains]
+
+    def async_set(
+        self,
+        entity_id: str,
+        new_state: Any,
+        attributes: Optional[Dict[str, Any]] = None,
+        force_update: bool = False,
+    ) -> None:
+        """Set a state - unchanged states and attributes fire nothing."""
+        entity_id = entity_id.lower()
+        new_state = str(new_state)
+        attributes = dict(attributes or {})
+        old_state = self._states.get(entity_id)
+        same_state = old_state is not None and old_state.state == new_state
+        if same_state and old_state.attributes == attributes and not force_update:
+            return
+
+        now = self._hass.clock.utcnow()
+        state = State(
+            entity_id,
+            new_state,
+            attributes,
+            last_changed=old_state.last_changed if same_state else now,
+            last_updated=now,
+        )
+        self._states[entity_id] = state
+        event = SimEvent(
+            EVENT_STATE_CHANGED,
+            {"entity_id": entity_id, "old_state": old_state, "new_state": state},
+            now,
+        )
+        self._hass.bus.fired[EVENT_STATE_CHANGED] += 1
+        for action in list(self._trackers.get(entity_id, ())):
+            self._hass.async_run_job(action, event)
+
+    def async_track(self, entity_ids: Iterable[str], action: Callable[[SimEvent], Any]) -> Callable[[], None]:
+        """Call action on state changes of entity_ids, returns the unsubscribe callback."""
+        tracked = [entity_id.lower() for entity_id in entity_ids]
+        for entity_id in tracked:
+            self._trackers.setdefault(entity_id, []).append(action)
+
+        def remove() -> None:
+            for entity_id in tracked:
+                actions = self._trackers.get(entity_id, [])
+                if action in actions:
+                    actions.remove(action)
+
+        return remove
+
+
+class SimServices:
+    """Service registry - counts every call by service."""
+
+    def __init__(self, hass: "SimHass") -> None:
+        """Initialize the registry."""
+        self._hass = hass
+        self._handlers: Dict[str, Callable[[SimServiceCall], Any]] = {}
+        self._listeners: List[Callable[[SimServiceCall], None]] = []
+        self.calls: Counter = Counter()
+
+    def async_register(self, domain: str, service: str, handler: Callable[[SimServiceCall], Any], *args: Any, **kwargs: Any) -> None:
+        """Register a service handler."""
+        self._handlers[f"{domain}.{service}"] = handler
+
+    def async_listen(self, listener: Callable[[SimServiceCall], None]) -> None:
+        """Call listener(call) before every service call is handled."""
+        self._listeners.append(listener)
+
+    def has_service(self, domain: str, service: str) -> bool:
+        """Check if a service is registered."""
+        return f"{domain}.{service}" in self._handlers
+
+    async def async_call(
+        self,
+        domain: str,
+        service: str,
+        service_data: Optional[Dict[str, Any]] = None,
+        blocking: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        """Call a service - blocking calls wait for the handler to finish."""
+        name = f"{domain}.{service}"
+        handler = self._handlers.get(name)
+        if handler is None:
+            raise ServiceNotFound(domain, service)
+        self.calls[name] += 1
+        call = SimServiceCall(domain, service, dict(service_data or {}))
+        for listener in self._listeners:
+            listener(call)
+        result = handler(call)
+        if asyncio.iscoroutine(result):
+            if blocking:
+                await result
+            else:
+                self._hass.async_create_task(result)
+
+
+class SimStore:
+    """In-memory Store with the same debounced save as the real one."""
+
+    def __init__(self, hass: "SimHass", version: int, key: str, *args: Any, **kwargs: Any) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self.version = version
+        self.key = key
+        self._delayed: Optional[asyncio.TimerHandle] = None
+
+    async def async_load(self) -> Optional[Dict[str, Any]]:
+        """Load the stored data."""
+        return self.hass.storage.get(self.key)
+
+    async def async_save(self, data: Dict[str, Any]) -> None:
+        """Save data right away."""
+        self._cancel_delayed()
+        self._write(data)
+
+    def async_delay_save(self, data_func: Callable[[], Dict[str, Any]], delay: float = 0) -> None:
+        """Save data_func() after delay seconds, a newer request replaces a pending one."""
+        self._cancel_delayed()
+        self._delayed = self.hass.loop.call_later(delay, self._write_delayed, data_func)
+
+    def _write_delayed(self, data_func: Callable[[], Dict[str, Any]]) -> None:
+        """Run a delayed save."""
+        self._delayed = None
+        self._write(data_func())
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        """Keep the data and count the write."""
+        self.hass.storage[self.key] = data
+        self.hass.store_writes[self.key] += 1
+
+    def _cancel_delayed(self) -> None:
+        """Drop a pending delayed save."""
+        if self._delayed is not None:
+            self._delayed.cancel()
+            self._delayed = None
+
+
+class SimHass:
+    """The parts of HomeAssistant the coordinator uses."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, clock: WallClock, config_dir: str) -> None:
+        """Initialize the stand-in."""
+        self.loop = loop
+        self.clock = clock
+        self.config = SimConfig(config_dir)
+        self.data: Dict[str, Any] = {}
+        self.bus = SimBus(self)
+        self.states = SimStates(self)
+        self.services = SimServices(self)
+        self.storage: Dict[str, Dict[str, Any]] = {}
+        self.store_writes: Counter = Counter()
+        self.dispatched: Counter = Counter()
+        self.dispatcher: Dict[str, List[Callable[..., Any]]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def async_run_job(self, target: Callable[..., Any], *args: Any) -> None:
+        """Run a callback inline or schedule a coroutine function as a task."""
+        result = target(*args)
+        if asyncio.iscoroutine(result):
+            self.async_create_task(result)
+
+    def async_create_task(self, target: Awaitable[Any], name: Optional[str] = None, **kwargs: Any) -> asyncio.Task:
+        """Create a task tracked until it finishes."""
+        task = self.loop.create_task(target, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def async_create_background_task(self, target: Awaitable[Any], name: str, **kwargs: Any) -> asyncio.Task:
+        """Create a background task - same as a regular one here."""
+        return self.async_create_task(target, name)
+
+    def async_add_executor_job(self, target: Callable[..., Any], *args: Any) -> asyncio.Future:
+        """Run an executor job inline - threads would not follow the virtual clock."""
+        future = self.loop.create_future()
+        try:
+            future.set_result(target(*args))
+        except Exception as err:
+            future.set_exception(err)
+        return future
+
+    async def async_cancel_tasks(self) -> None:
+        """Cancel tasks still running at the end of the simulation."""
+        tasks = [task for task in self._tasks if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def async_track_state_change_event(
+    hass: SimHass, entity_ids: Union[str, Iterable[str]], action: Callable[[SimEvent], Any]
+) -> Callable[[], None]:
+    """Stand-in for homeassistant.helpers.event.async_track_state_change_event."""
+    if isinstance(entity_ids, str):
+        entity_ids = [entity_ids]
+    return hass.states.async_track(entity_ids, action)
+
+
+def async_track_point_in_time(
+    hass: SimHass, action: Callable[[datetime], Any], point_in_time: datetime
+) -> Callable[[], None]:
+    """Stand-in for homeassistant.helpers.event.async_track_point_in_time."""
+    delay = (point_in_time - hass.clock.utcnow()).total_seconds()
+    handle = hass.loop.call_later(
+        max(0.0, delay), lambda: hass.async_run_job(action, hass.clock.utcnow())
+    )
+    return handle.cancel
+
+
+def async_dispatcher_connect(hass: SimHass, signal: str, target: Callable[..., Any]) -> Callable[[], None]:
+    """Stand-in for homeassistant.helpers.dispatcher.async_dispatcher_connect."""
+    targets = hass.dispatcher.setdefault(signal, [])
+    targets.append(target)
+
+    def remove() -> None:
+        if target in targets:
+            targets.remove(target)
+
+    return remove
+
+
+def async_dispatcher_send(hass: SimHass, signal: str, *args: Any) -> None:
+    """Stand-in for homeassistant.helpers.dispatcher.async_dispatcher_send."""
+    hass.dispatched[signal] += 1
+    for target in list(hass.dispatcher.get(signal, ())):
+        hass.async_run_job(target, *args)
+
+
+@contextmanager
+def patch_homeassistant(hass: SimHass) -> Iterator[None]:
+    """Point the component's Home Assistant hooks and clock at the stand-in.
+
+    The component binds Store and the event helpers at import time, so the
+    names are replaced in its modules; dt_util is patched in place because
+    the component imports it locally. Everything is restored on exit.
+    """
+    import custom_components.smart_lux_control as component
+    from custom_components.smart_lux_control import journal
+    from homeassistant.util import dt as dt_util
+
+    patches = [
+        (component, "Store", SimStore),
+        (component, "async_track_state_change_event", async_track_state_change_event),
+        (component, "async_track_point_in_time", async_track_point_in_time),
+        (component, "async_dispatcher_send", async_dispatcher_send),
+        (journal, "Store", SimStore),
+        (dt_util, "utcnow", hass.clock.utcnow),
+        (dt_util, "now", hass.clock.now),
+    ]
+    originals = [(module, name, getattr(module, name)) for module, name, _ in patches]
+    try:
+        for module, name, replacement in patches:
+            setattr(module, name, replacement)
+        yield
+    finally:
+        for module, name, original in originals:
+            setattr(module, name, original)
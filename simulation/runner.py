@@ -0,0 +1,240 @@
+"""Run Smart Lux Control against a simulated room."""
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from .clock import VirtualClockLoop, WallClock
+from .devices import Daylight, MotionScript, SimLight, SimLuxSensor, register_light_services, run_sun
+from .hass import SimConfigEntry, SimEvent, SimHass, patch_homeassistant
+
+LIGHT_ENTITY = "light.sim_{}"
+LUX_SENSOR = "sensor.sim_lux"
+MOTION_SENSOR = "binary_sensor.sim_motion"
+START = datetime(2024, 6, 1, tzinfo=timezone.utc)  # Midnight - the first day starts dark
+
+
+def summarize(values: Sequence[float]) -> Dict[str, Optional[float]]:
+    """Get count, mean, p50/p95/p99 and max of values.
+
+    The same percentiles as the integration's latency histograms.
+    """
+    if not values:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    ordered = sorted(values)
+
+    def _at(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 2)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 2),
+        "p50": _at(0.5),
+        "p95": _at(0.95),
+        "p99": _at(0.99),
+        "max": round(ordered[-1], 2),
+    }
+
+
+class SimulationReport(NamedTuple):
+    """Result of a simulation run - metrics cover the time after the warmup."""
+
+    hours: float
+    wall_seconds: float
+    motion_to_light: Dict[str, Optional[float]]  # Seconds from motion in a dark room to a light reporting on
+    motion_without_light: int  # Motion in a dark room that needed no light
+    convergence: Dict[str, Optional[float]]  # Seconds from motion to the lux within tolerance of the target
+    unconverged: int  # Occupancies that ended before the lux reached the target
+    in_tolerance: Optional[float]  # Share of lit sensor readings within tolerance
+    service_calls: Dict[str, int]
+    lux_readings: int
+    lux_handled: int
+    samples: int
+    store_writes: int
+    adjustment_cycles: Dict[str, Any]  # The coordinator's own convergence tracker
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the report as a JSON-friendly dict."""
+        return self._asdict()
+
+    def format(self) -> str:
+        """Get a short human-readable summary."""
+        calls = ", ".join(f"{name}={count}" for name, count in sorted(self.service_calls.items())) or "none"
+        in_tolerance = f"{self.in_tolerance:.1%}" if self.in_tolerance is not None else "n/a"
+        return "\n".join((
+            f"Simulated {self.hours:g} h in {self.wall_seconds:.2f} s",
+            f"Motion to light [s]: {self.motion_to_light} (no light needed: {self.motion_without_light})",
+            f"Convergence [s]: {self.convergence} (unconverged: {self.unconverged})",
+            f"Within tolerance while lit: {in_tolerance}",
+            f"Service calls: {calls} (total {sum(self.service_calls.values())})",
+            f"Lux readings: {self.lux_readings}, handled: {self.lux_handled}",
+            f"Samples: {self.samples}, store writes: {self.store_writes}",
+            f"Adjustment cycles: {self.adjustment_cycles}",
+        ))
+
+
+class Simulation:
+    """A simulated room driven by one SmartLuxCoordinator.
+
+    Lights, the lux sensor, daylight and occupancy can be replaced to build
+    other scenarios; config overrides the room's config entry data.
+    """
+
+    def __init__(
+        self,
+        lights: Optional[Sequence[SimLight]] = None,
+        daylight: Optional[Daylight] = None,
+        motion: Optional[MotionScript] = None,
+        sensor_interval: float = 5.0,
+        sensor_lag: float = 1.5,
+        sensor_noise: float = 2.0,
+        config: Optional[Dict[str, Any]] = None,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the scenario."""
+        self.lights = list(lights) if lights is not None else [
+            SimLight(LIGHT_ENTITY.format(index), max_lux) for index, max_lux in enumerate((220, 160, 120))
+        ]
+        self.daylight = daylight or Daylight()
+        self.motion = motion or MotionScript(MOTION_SENSOR)
+        self.sensor = SimLuxSensor(
+            LUX_SENSOR,
+            self.lights,
+            self.daylight,
+            interval=sensor_interval,
+            lag=sensor_lag,
+            noise=sensor_noise,
+            seed=seed,
+        )
+        self.config = {
+            "room_name": "sim",
+            "light_entity": [light.entity_id for light in self.lights],
+            "lux_sensor": LUX_SENSOR,
+            "motion_sensor": self.motion.entity_id,
+            **(config or {}),
+        }
+        self._reset_metrics()
+
+    def _reset_metrics(self) -> None:
+        """Start collecting metrics from scratch."""
+        self._motion_started: Optional[float] = None  # Motion in a dark room, light not on yet
+        self._episode_started: Optional[float] = None  # Lights came on, lux not within tolerance yet
+        self._latencies: List[float] = []
+        self._convergence: List[float] = []
+        self._without_light = 0
+        self._unconverged = 0
+        self._lit_readings = 0
+        self._lit_in_tolerance = 0
+
+    async def async_run(self, hours: float = 24.0, warmup_hours: float = 0.0) -> SimulationReport:
+        """Run the room for warmup_hours plus hours of virtual time."""
+        from custom_components.smart_lux_control import SmartLuxCoordinator
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory() as config_dir:
+            hass = SimHass(loop, WallClock(loop, START - timedelta(seconds=loop.time())), config_dir)
+            with patch_homeassistant(hass):
+                register_light_services(hass, self.lights)
+                for light in self.lights:
+                    light.report(hass)
+                hass.states.async_set(self.motion.entity_id, "off", {"device_class": "motion"})
+                run_sun(hass, self.daylight)
+                self.sensor.report(hass)
+
+                coordinator = SmartLuxCoordinator(hass, SimConfigEntry(self.config))
+                self.coordinator = coordinator
+                await coordinator.async_setup()
+
+                self.motion.schedule(hass, int((warmup_hours + hours) // 24) + 1)
+                hass.states.async_track([self.motion.entity_id], self._motion_changed)
+                hass.states.async_track([light.entity_id for light in self.lights], self._light_changed)
+                self.sensor.add_listener(self._lux_reported)
+                sensor_task = hass.async_create_background_task(self.sensor.async_run(hass), "sim lux sensor")
+
+                await asyncio.sleep(warmup_hours * 3600)
+                self._reset_metrics()
+                calls_before = Counter(hass.services.calls)
+                writes_before = sum(hass.store_writes.values())
+                readings_before = self.sensor.readings
+                handled_before = coordinator.lux_events.handled
+
+                await asyncio.sleep(hours * 3600)
+                sensor_task.cancel()
+                await coordinator.async_unload()
+                await hass.async_cancel_tasks()
+
+                return SimulationReport(
+                    hours=hours,
+                    wall_seconds=round(time.perf_counter() - started, 3),
+                    motion_to_light=summarize(self._latencies),
+                    motion_without_light=self._without_light,
+                    convergence=summarize(self._convergence),
+                    unconverged=self._unconverged,
+                    in_tolerance=(
+                        round(self._lit_in_tolerance / self._lit_readings, 4) if self._lit_readings else None
+                    ),
+                    service_calls=dict(hass.services.calls - calls_before),
+                    lux_readings=self.sensor.readings - readings_before,
+                    lux_handled=coordinator.lux_events.handled - handled_before,
+                    samples=len(coordinator.samples),
+                    store_writes=sum(hass.store_writes.values()) - writes_before,
+                    adjustment_cycles=coordinator.convergence.as_dict(),
+                )
+
+    @property
+    def _lit(self) -> bool:
+        """Check if any simulated light is on."""
+        return any(light.brightness for light in self.lights)
+
+    def _now(self) -> float:
+        """Get the loop time."""
+        return asyncio.get_running_loop().time()
+
+    def _motion_changed(self, event: SimEvent) -> None:
+        """Start a latency measurement on motion in a dark room."""
+        old_state, new_state = event.data["old_state"], event.data["new_state"]
+        if new_state.state == "on" and (old_state is None or old_state.state != "on"):
+            if not self._lit and self._motion_started is None and self._episode_started is None:
+                self._motion_started = self._now()
+        elif new_state.state == "off" and self._motion_started is not None and not self._lit:
+            # Nobody asked for light - bright enough already
+            self._without_light += 1
+            self._motion_started = None
+
+    def _light_changed(self, event: SimEvent) -> None:
+        """Finish a latency measurement once a light reports on."""
+        new_state = event.data["new_state"]
+        if new_state.state == "on" and self._motion_started is not None:
+            self._latencies.append(self._now() - self._motion_started)
+            self._episode_started = self._motion_started
+            self._motion_started = None
+
+    def _lux_reported(self, true_lux: float, reading: float) -> None:
+        """Track convergence and tolerance on every sensor reading."""
+        if not self._lit:
+            if self._episode_started is not None:
+                self._unconverged += 1
+                self._episode_started = None
+            return
+
+        coordinator = self.coordinator
+        within = abs(true_lux - coordinator.get_target_lux()) <= coordinator.deviation_margin
+        self._lit_readings += 1
+        self._lit_in_tolerance += within
+        if within and self._episode_started is not None:
+            self._convergence.append(self._now() - self._episode_started)
+            self._episode_started = None
+
+
+def run_day(hours: float = 24.0, warmup_hours: float = 0.0, **kwargs: Any) -> SimulationReport:
+    """Run a Simulation(**kwargs) on a fresh virtual clock loop and get its report."""
+    loop = VirtualClockLoop()
+    try:
+        return loop.run_until_complete(Simulation(**kwargs).async_run(hours, warmup_hours))
+    finally:
+        loop.close()
@@ -0,0 +1,93 @@
+"""Latest-value event coalescing."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.smart_lux_control.coalescer import LatestValueCoalescer
+from simulation.clock import VirtualClockLoop
+
+
+def _run(scenario):
+    """Run scenario(coalescer, handled) on a virtual clock; handled gets (time, value)."""
+    loop = VirtualClockLoop()
+    hass = SimpleNamespace(async_create_background_task=lambda coro, name: loop.create_task(coro))
+    handled = []
+
+    async def _handler(value):
+        handled.append((round(loop.time(), 3), value))
+
+    async def _main():
+        coalescer = LatestValueCoalescer(hass, _handler, 2.0, "test", merge=lambda pending, new: pending + new)
+        await scenario(coalescer)
+        await asyncio.sleep(10)
+        return coalescer
+
+    try:
+        coalescer = loop.run_until_complete(_main())
+    finally:
+        loop.close()
+    return coalescer, handled
+
+
+def test_values_during_the_rest_are_merged_into_one_run():
+    async def scenario(coalescer):
+        coalescer.async_push([1])
+        await asyncio.sleep(0.5)
+        coalescer.async_push([2])
+        coalescer.async_push([3])
+
+    coalescer, handled = _run(scenario)
+    assert handled == [(0.0, [1]), (2.0, [2, 3])]
+    assert (coalescer.received, coalescer.handled, coalescer.coalesced) == (3, 2, 1)
+
+
+def test_urgent_value_cuts_the_rest_short():
+    async def scenario(coalescer):
+        coalescer.async_push([1])
+        await asyncio.sleep(0.5)
+        coalescer.async_push([2])
+        await asyncio.sleep(0.5)
+        coalescer.async_push([3], urgent=True)
+
+    _, handled = _run(scenario)
+    assert handled == [(0.0, [1]), (1.0, [2, 3])]
+
+
+def test_first_value_after_a_quiet_period_is_handled_at_once():
+    async def scenario(coalescer):
+        coalescer.async_push([1])
+        await asyncio.sleep(5)
+        coalescer.async_push([2])
+
+    _, handled = _run(scenario)
+    assert handled == [(0.0, [1]), (5.0, [2])]
+
+
+def test_handler_errors_do_not_stop_the_consumer():
+    loop = VirtualClockLoop()
+    hass = SimpleNamespace(async_create_background_task=lambda coro, name: loop.create_task(coro))
+    handled = []
+
+    async def _handler(value):
+        if value == "bad":
+            raise ValueError(value)
+        handled.append(value)
+
+    async def _main():
+        coalescer = LatestValueCoalescer(hass, _handler, 1.0, "test")
+        coalescer.async_push("bad")
+        await asyncio.sleep(0.1)
+        coalescer.async_push("good")
+        await asyncio.sleep(2)
+        coalescer.async_push("dropped")
+        coalescer.async_cancel()
+        await asyncio.sleep(2)
+        return coalescer
+
+    try:
+        coalescer = loop.run_until_complete(_main())
+    finally:
+        loop.close()
+    assert handled == ["good"]
+    assert coalescer.handled == 2
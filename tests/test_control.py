@@ -0,0 +1,124 @@
+"""Control loop helpers."""
+import random
+
+import pytest
+
+from custom_components.smart_lux_control.control import (
+    LAG_GRACE_SECONDS,
+    LAG_MAX_SECONDS,
+    LAG_MIN_SAMPLES,
+    FeedforwardPIController,
+    LuxKalmanFilter,
+    SensorLagEstimator,
+)
+
+
+def test_proportional_term_cancels_unexplained_lux():
+    controller = FeedforwardPIController(kp=1.0, ki=0.1, integral_limit=100)
+    # 40 lx of daylight the model does not know about - aim 40 lx lower
+    assert controller.aim(300, 240, 200) == pytest.approx(260)
+    assert controller.integral == 0  # Not integrated before the first own output
+
+
+def test_integral_collects_error_after_own_outputs_only():
+    controller = FeedforwardPIController(kp=0.0, ki=0.5, integral_limit=100)
+    controller.aim(300, 280, 280)
+    controller.applied(0)
+    assert controller.aim(300, 280, 280) == pytest.approx(300 + 0.5 * 20)
+    assert controller.aim(300, 290, 290) == pytest.approx(300 + 0.5 * 30)
+
+    controller.reset()
+    assert controller.aim(300, 280, 280) == pytest.approx(300)
+
+
+def test_integral_is_clamped():
+    controller = FeedforwardPIController(kp=0.0, ki=1.0, integral_limit=50)
+    controller.applied(0)
+    for _ in range(10):
+        controller.aim(300, 200, 200)
+    assert controller.integral == 50
+    for _ in range(10):
+        controller.aim(100, 400, 400)
+    assert controller.integral == -50
+
+
+def test_saturated_output_freezes_the_integral_in_its_direction():
+    controller = FeedforwardPIController(kp=0.0, ki=1.0, integral_limit=100)
+    controller.applied(1)  # Capped while more light was wanted
+    controller.aim(300, 280, 280)
+    assert controller.integral == 0
+    controller.aim(300, 310, 310)  # Too bright now - unwinding is allowed
+    assert controller.integral == -10
+
+
+def test_lag_uses_the_default_until_enough_delays_are_seen():
+    lag = SensorLagEstimator(10)
+    for _ in range(LAG_MIN_SAMPLES - 1):
+        lag.record("up", 2.0)
+    assert lag.cooldown("up") == 10
+    lag.record("up", 2.0)
+    assert lag.cooldown("up") == pytest.approx(2.0 + LAG_GRACE_SECONDS)
+    assert lag.cooldown("down") == 10  # Learned per direction
+    assert lag.cooldown(None) == 10
+
+
+def test_lag_cooldown_is_a_high_percentile_of_the_delays():
+    lag = SensorLagEstimator(10)
+    for seconds in range(1, 11):  # 1..10 s
+        lag.record("down", float(seconds))
+    assert lag.cooldown("down") == pytest.approx(9.1 + LAG_GRACE_SECONDS)
+    stats = lag.as_dict()["down"]
+    assert (stats["samples"], stats["median"], stats["p90"]) == (10, 5.5, 9.1)
+
+
+def test_lag_ignores_impossible_delays_and_restores_from_storage():
+    lag = SensorLagEstimator(10)
+    for seconds in (-1.0, LAG_MAX_SECONDS + 1, 1.5, 2.5, 3.5, 2.0, 3.0):
+        lag.record("up", seconds)
+    lag.record("sideways", 1.0)
+    assert lag.as_dict()["up"]["samples"] == 5
+
+    restored = SensorLagEstimator(10)
+    restored.load({**lag.to_storage(), "down": ["x", 1.0]})
+    assert restored.cooldown("up") == lag.cooldown("up")
+    assert restored.as_dict()["down"]["samples"] == 1
+
+
+def test_kalman_estimate_averages_noise_away():
+    rng = random.Random(5)
+    kalman = LuxKalmanFilter()
+    assert kalman.std is None
+    readings = [200 + rng.gauss(0, 6) for _ in range(200)]
+    for second, reading in enumerate(readings):
+        kalman.update(reading, float(second))
+
+    assert abs(kalman.value - 200) < 5
+    assert kalman.std < 6
+
+
+def test_kalman_command_moves_the_estimate_once():
+    kalman = LuxKalmanFilter()
+    kalman.command(100, 0.0)
+    assert kalman.value is None  # Nothing to move yet
+    kalman.update(100, 0.0)
+    before = kalman.std
+    kalman.command(150, 1.0)
+    assert kalman.value == 250
+    assert kalman.std > before
+
+    # A reading that shows the change confirms it instead of adding it again
+    assert kalman.update(252, 2.0) == pytest.approx(251, abs=2)
+
+
+def test_kalman_restarts_on_a_jump_or_an_unmodeled_command():
+    kalman = LuxKalmanFilter()
+    for second in range(10):
+        kalman.update(100, float(second))
+    assert kalman.update(600, 10.0) == 600  # Blinds opened - far outside the spread
+
+    kalman.command(None, 11.0)
+    assert kalman.std is None
+    assert kalman.update(420, 12.0) == 420
+
+    kalman.reset()
+    assert kalman.value is None
@@ -0,0 +1,30 @@
+"""Control passes of one room must not overlap."""
+from custom_components.smart_lux_control import SmartLuxCoordinator
+from simulation.devices import SimLight
+from simulation.runner import LIGHT_ENTITY, run_day
+
+
+def test_commands_do_not_overlap_with_fast_sensor(monkeypatch):
+    """A lux change handled while a command is verified must not start another command."""
+    set_brightness = SmartLuxCoordinator._async_set_brightness
+    calls = {"count": 0, "in_flight": 0, "overlapping": 0, "not_pending": 0}
+
+    async def _counted(self, brightness):
+        calls["count"] += 1
+        calls["overlapping"] += calls["in_flight"] > 0
+        calls["not_pending"] += not (self._lag_pending and self.last_brightness_change_time)
+        calls["in_flight"] += 1
+        try:
+            return await set_brightness(self, brightness)
+        finally:
+            calls["in_flight"] -= 1
+
+    monkeypatch.setattr(SmartLuxCoordinator, "_async_set_brightness", _counted)
+    # Readings every 0.5 s arrive several times while a 1.5 s light command is verified
+    lights = [SimLight(LIGHT_ENTITY.format(index), max_lux, latency=1.5) for index, max_lux in enumerate((220, 160, 120))]
+    report = run_day(10, lights=lights, sensor_interval=0.5, sensor_lag=0.2)
+
+    assert calls["count"] > 10
+    assert calls["overlapping"] == 0
+    assert calls["not_pending"] == 0
+    assert report.in_tolerance > 0.9
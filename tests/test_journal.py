@@ -0,0 +1,117 @@
+"""Append-only sample journal."""
+import os
+
+import pytest
+
+from custom_components.smart_lux_control.journal import RECORD, SampleJournal
+from simulation.clock import VirtualClockLoop, WallClock
+from simulation.hass import SimHass, patch_homeassistant
+from simulation.runner import START
+
+
+@pytest.fixture
+def hass(tmp_path):
+    """Home Assistant stand-in on a virtual clock, its storage in tmp_path."""
+    loop = VirtualClockLoop()
+    hass = SimHass(loop, WallClock(loop, START), str(tmp_path))
+    with patch_homeassistant(hass):
+        yield hass
+    loop.close()
+
+
+def _journal(hass, samples, compact_after=100):
+    """Journal whose snapshot source is the samples list."""
+    return SampleJournal(hass, "room_samples", 1, compact_after, lambda: list(samples))
+
+
+def _run(hass, coro):
+    return hass.loop.run_until_complete(coro)
+
+
+def _append(hass, journal, samples, records):
+    for record in records:
+        samples.append(record)
+        journal.async_append(*record)
+    _run(hass, journal.async_close())
+
+
+def test_nothing_stored_loads_none(hass):
+    assert _run(hass, _journal(hass, []).async_load()) is None
+
+
+def test_replay_restores_appended_samples(hass):
+    samples = []
+    journal = _journal(hass, samples)
+    _run(hass, journal.async_load())
+    _append(hass, journal, samples, [(float(index), 10.5 * index, 1000 + index) for index in range(10)])
+
+    assert _run(hass, _journal(hass, []).async_load()) == samples
+
+
+def test_torn_tail_is_dropped_and_trimmed(hass):
+    samples = []
+    journal = _journal(hass, samples)
+    _run(hass, journal.async_load())
+    _append(hass, journal, samples, [(1.0, 2.0, 3), (4.0, 5.0, 6)])
+    with open(journal._path, "ab") as file:
+        file.write(RECORD.pack(3, 7.0, 8.0, 9)[:-5])
+
+    assert _run(hass, _journal(hass, []).async_load()) == samples
+    assert os.path.getsize(journal._path) == 2 * RECORD.size
+
+
+def test_sequence_going_backwards_ends_the_replay(hass):
+    samples = []
+    journal = _journal(hass, samples)
+    _run(hass, journal.async_load())
+    _append(hass, journal, samples, [(1.0, 2.0, 3), (4.0, 5.0, 6)])
+    with open(journal._path, "ab") as file:
+        file.write(RECORD.pack(1, 7.0, 8.0, 9))
+
+    assert _run(hass, _journal(hass, []).async_load()) == samples
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(hass):
+    samples = []
+    journal = _journal(hass, samples, compact_after=5)
+    _run(hass, journal.async_load())
+    _append(hass, journal, samples, [(float(index), float(index), index) for index in range(7)])
+    _run(hass, journal.async_close())  # Waits for the compaction started by the flush
+
+    assert not os.path.exists(journal._path)
+    assert _run(hass, _journal(hass, []).async_load()) == samples
+
+    # Evicted samples are gone from the source - the snapshot follows it
+    del samples[:3]
+    _run(hass, journal.async_compact())
+    assert _run(hass, _journal(hass, []).async_load()) == samples
+
+
+def test_crash_between_snapshot_and_truncation_replays_nothing_twice(hass):
+    samples = []
+    journal = _journal(hass, samples)
+    _run(hass, journal.async_load())
+    _append(hass, journal, samples, [(float(index), float(index), index) for index in range(4)])
+    with open(journal._path, "rb") as file:
+        journal_data = file.read()
+
+    _run(hass, journal.async_compact())
+    with open(journal._path, "wb") as file:
+        file.write(journal_data)  # The truncation never happened
+
+    reloaded = _journal(hass, [])
+    assert _run(hass, reloaded.async_load()) == samples
+    # New records continue after the replayed sequence numbers
+    reloaded.async_append(9.0, 9.0, 9)
+    _run(hass, reloaded.async_close())
+    assert _run(hass, _journal(hass, []).async_load()) == samples + [(9.0, 9.0, 9)]
+
+
+def test_reset_drops_everything(hass):
+    samples = []
+    journal = _journal(hass, samples)
+    _run(hass, journal.async_load())
+    _append(hass, journal, samples, [(1.0, 1.0, 1)])
+    _run(hass, journal.async_reset())
+
+    assert _run(hass, _journal(hass, []).async_load()) == []
@@ -0,0 +1,73 @@
+"""Cached model statistics of a room coordinator."""
+import pytest
+
+from custom_components.smart_lux_control import SmartLuxCoordinator
+from simulation.clock import VirtualClockLoop, WallClock
+from simulation.hass import SimConfigEntry, SimHass, patch_homeassistant
+from simulation.runner import LUX_SENSOR, MOTION_SENSOR, START
+
+
+@pytest.fixture
+def coordinator(tmp_path):
+    """Room coordinator on the Home Assistant stand-in, automation off."""
+    loop = VirtualClockLoop()
+    hass = SimHass(loop, WallClock(loop, START), str(tmp_path))
+    with patch_homeassistant(hass):
+        hass.states.async_set(LUX_SENSOR, "100")
+        hass.states.async_set(MOTION_SENSOR, "off")
+        coordinator = SmartLuxCoordinator(hass, SimConfigEntry({
+            "room_name": "test",
+            "light_entity": ["light.test"],
+            "lux_sensor": LUX_SENSOR,
+            "motion_sensor": MOTION_SENSOR,
+            "auto_control_enabled": False,
+        }))
+        loop.run_until_complete(coordinator.async_setup())
+        yield coordinator
+        loop.run_until_complete(coordinator.async_unload())
+        loop.run_until_complete(hass.async_cancel_tasks())
+    loop.close()
+
+
+def _add(coordinator, count, start=0):
+    for index in range(start, start + count):
+        coordinator._append_sample(10 + index * 2, 30 + index * 5 + (index % 3) * 4, 1_700_000_000 + index)
+
+
+def test_stats_are_cached_per_model_version(coordinator):
+    _add(coordinator, 30)
+    stats = coordinator.model_stats
+    assert coordinator.model_stats is stats
+
+    _add(coordinator, 1, start=30)
+    updated = coordinator.model_stats
+    assert updated is not stats
+    assert updated.version > stats.version
+    assert updated.sample_count == stats.sample_count + 1
+
+    coordinator.regression_a, coordinator.regression_b = 2.0, 25.0
+    coordinator._model_version += 1  # As the regression and adaptive learning do
+    assert coordinator.model_stats.residual_mean != updated.residual_mean
+
+
+def test_cached_stats_match_a_fresh_computation(coordinator):
+    _add(coordinator, 50)
+    coordinator._update_regression()
+    stats = coordinator.model_stats
+
+    brightness, lux = coordinator._filter_samples()
+    a, b = coordinator.regression_a, coordinator.regression_b
+    residuals = [abs(y - (a * x + b)) for x, y in zip(brightness, lux)]
+    assert stats == coordinator._compute_model_stats()
+    assert stats.filtered_count + stats.outlier_count == stats.sample_count == 50
+    assert stats.residual_mean == pytest.approx(sum(residuals) / len(residuals))
+    assert stats.recent_residual_mean == pytest.approx(sum(residuals[-20:]) / 20)
+    assert stats.last_sample_time == coordinator.samples[-1].timestamp
+
+
+def test_clearing_samples_invalidates_the_stats(coordinator):
+    _add(coordinator, 20)
+    assert coordinator.model_stats.sample_count == 20
+    coordinator.hass.loop.run_until_complete(coordinator.async_clear_samples())
+    assert coordinator.model_stats.sample_count == 0
+    assert coordinator.model_stats.residual_mean is None
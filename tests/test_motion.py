@@ -0,0 +1,25 @@
+"""Motion sensor handling."""
+from simulation.clock import VirtualClockLoop
+from simulation.devices import MotionScript
+from simulation.runner import MOTION_SENSOR, Simulation
+
+
+class DropoutMotion(MotionScript):
+    """Occupancy ending with the sensor going unavailable instead of off."""
+
+    def events(self, days):
+        return [(seconds, "unavailable" if state == "off" else state) for seconds, state in super().events(days)]
+
+
+def test_lights_turn_off_when_motion_sensor_goes_unavailable():
+    """Motion going from on to unavailable starts the keep-on countdown like off does."""
+    simulation = Simulation(motion=DropoutMotion(MOTION_SENSOR, periods=((20.0, 30),), gap_every=0))
+    loop = VirtualClockLoop()
+    try:
+        report = loop.run_until_complete(simulation.async_run(22))
+    finally:
+        loop.close()
+
+    assert report.service_calls.get("light.turn_on")
+    assert report.service_calls.get("light.turn_off") == 1
+    assert not any(light.brightness for light in simulation.lights)
@@ -0,0 +1,175 @@
+"""Regression helpers."""
+import math
+import random
+
+import pytest
+
+from custom_components.smart_lux_control.regression import LightRegression, RunningRegression, solve_brightness, t_quantile
+
+
+def _least_squares(points):
+    """Slope, intercept and R² computed from scratch."""
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    syy = sum((y - mean_y) ** 2 for _, y in points)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    slope = sxy / sxx
+    return slope, mean_y - slope * mean_x, sxy * sxy / (sxx * syy)
+
+
+def _points(count, seed=0):
+    rng = random.Random(seed)
+    return [(x, 2.1 * x + 35 + rng.gauss(0, 12)) for x in (rng.uniform(1, 255) for _ in range(count))]
+
+
+def test_running_regression_matches_batch_fit():
+    points = _points(200)
+    regression = RunningRegression()
+    for x, y in points:
+        regression.add(x, y)
+
+    assert regression.fit() == pytest.approx(_least_squares(points), rel=1e-9)
+
+
+def test_sliding_window_matches_fit_of_the_window():
+    """Evicting the oldest sample leaves the same statistics as fitting the window alone."""
+    points = _points(1000, seed=1)
+    window = 100
+    regression = RunningRegression()
+    for index, (x, y) in enumerate(points):
+        regression.add(x, y)
+        if index >= window:
+            regression.remove(*points[index - window])
+
+    assert regression.count == window
+    fresh = RunningRegression()
+    for x, y in points[-window:]:
+        fresh.add(x, y)
+    for name in RunningRegression.__slots__:
+        assert getattr(regression, name) == pytest.approx(getattr(fresh, name), rel=1e-9, abs=1e-6)
+    assert regression.fit() == pytest.approx(_least_squares(points[-window:]), rel=1e-9)
+
+
+def test_residual_std_of_any_line():
+    points = _points(50, seed=2)
+    regression = RunningRegression()
+    for x, y in points:
+        regression.add(x, y)
+
+    for slope, intercept in (regression.fit()[:2], (2.0, 40.0)):
+        sse = sum((y - slope * x - intercept) ** 2 for x, y in points)
+        assert regression.residual_std(slope, intercept) == pytest.approx(math.sqrt(sse / (len(points) - 2)))
+
+
+def test_degenerate_windows():
+    regression = RunningRegression()
+    assert regression.fit() is None
+    regression.add(100, 300)
+    regression.add(100, 320)
+    assert regression.fit() is None  # No spread in brightness
+    assert regression.residual_std(1.0, 0.0) is None
+
+    regression.add(200, 500)
+    regression.remove(100, 300)
+    regression.remove(100, 320)
+    regression.remove(200, 500)
+    assert regression.count == 0
+    assert (regression.mean_x, regression.m2_x, regression.c_xy) == (0.0, 0.0, 0.0)
+
+
+@pytest.mark.parametrize(
+    ("confidence", "dof", "expected"),
+    [
+        (0.95, 1, 12.706),
+        (0.95, 2, 4.303),
+        (0.95, 5, 2.571),
+        (0.95, 10, 2.228),
+        (0.95, 29, 2.045),
+        (0.95, 30, 2.042),
+        (0.95, 120, 1.980),
+        (0.99, 5, 4.032),
+        (0.90, 3, 2.353),
+    ],
+)
+def test_t_quantile_matches_tables(confidence, dof, expected):
+    assert t_quantile(confidence, dof) == pytest.approx(expected, abs=1e-3)
+
+
+def test_t_quantile_without_degrees_of_freedom_is_normal():
+    assert t_quantile(0.95, 0) == pytest.approx(1.95996, abs=1e-5)
+
+
+def _lux(weights, intercept, brightness):
+    return sum(w * b for w, b in zip(weights, brightness)) + intercept
+
+
+def test_light_regression_recovers_independent_lights():
+    weights, intercept = [1.2, 0.8, 0.5], 20.0
+    rng = random.Random(3)
+    model = LightRegression(3)
+    for _ in range(4):
+        brightness = [rng.uniform(0, 255) for _ in weights]
+        model.add(brightness, _lux(weights, intercept, brightness))
+    assert model.fit() is None  # Three lights and an intercept need five samples
+
+    for _ in range(40):
+        brightness = [rng.choice([0, rng.uniform(1, 255)]) for _ in weights]
+        model.add(brightness, _lux(weights, intercept, brightness))
+    fitted, fitted_intercept, r_squared = model.fit()
+    assert fitted == pytest.approx(weights, rel=1e-4)
+    assert fitted_intercept == pytest.approx(intercept, abs=0.05)
+    assert r_squared == pytest.approx(1.0)
+
+
+def test_lights_dimmed_together_share_the_effect_evenly():
+    model = LightRegression(3)
+    for brightness in range(10, 250, 10):
+        model.add([brightness] * 3, 1.5 * brightness + 10)
+    fitted, intercept, _ = model.fit()
+    assert fitted == pytest.approx([0.5, 0.5, 0.5], rel=1e-3)
+    assert intercept == pytest.approx(10, abs=0.5)
+
+
+def test_forgetting_follows_a_changed_light():
+    rng = random.Random(4)
+    model = LightRegression(2, forgetting=1 - 1 / 50)
+    for weights in ([1.0, 1.0], [1.0, 0.4]):  # The second lamp aged
+        for _ in range(400):
+            brightness = [rng.uniform(0, 255), rng.uniform(0, 255)]
+            model.add(brightness, _lux(weights, 5.0, brightness) + rng.gauss(0, 2))
+    fitted, _, _ = model.fit()
+    assert fitted == pytest.approx([1.0, 0.4], abs=0.03)
+
+
+def test_light_regression_storage_round_trip():
+    model = LightRegression(2)
+    for brightness in ([10, 200], [150, 30], [90, 90], [0, 255]):
+        model.add(brightness, _lux([1.0, 0.5], 3.0, brightness))
+    restored = LightRegression(2)
+    assert restored.load(model.as_dict())
+    assert restored.fit() == model.fit()
+    assert not LightRegression(3).load(model.as_dict())
+    assert not restored.load({"weight": 1})
+
+
+def test_solve_brightness_reaches_the_target_with_the_smallest_change():
+    weights, intercept, current = [2.0, 1.0, 0.5], 10.0, [50.0, 50.0, 50.0]
+    result = solve_brightness(weights, intercept, 300.0, current, [1] * 3, [255] * 3)
+
+    assert _lux(weights, intercept, result) == pytest.approx(300.0)
+    changes = [value - start for value, start in zip(result, current)]
+    assert [change / weight for change, weight in zip(changes, weights)] == pytest.approx([changes[0] / 2.0] * 3)
+
+
+def test_solve_brightness_pins_lights_at_their_bounds():
+    weights, intercept = [2.0, 1.0, -0.5], 0.0
+    result = solve_brightness(weights, intercept, 400.0, [100.0, 100.0, 80.0], [1, 1, 1], [120, 255, 255])
+
+    assert result[0] == 120  # Pinned at its high bound, the other light makes up the rest
+    assert result[2] == 80  # A light that does not add light stays where it is
+    assert _lux(weights, intercept, result) == pytest.approx(400.0)
+
+    unreachable = solve_brightness(weights, intercept, 5000.0, [100.0, 100.0, 80.0], [1, 1, 1], [255, 255, 255])
+    assert unreachable == [255, 255, 80]
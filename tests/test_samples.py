@@ -0,0 +1,62 @@
+"""Sample ring buffer."""
+import pytest
+
+from custom_components.smart_lux_control.samples import SampleBuffer
+
+
+def _rows(buffer):
+    return [(sample.brightness, sample.lux, sample.epoch) for sample in buffer]
+
+
+def test_append_evicts_the_oldest_sample_once_full():
+    buffer = SampleBuffer(3)
+    evicted = [buffer.append(index, index * 10, 1000 + index) for index in range(5)]
+
+    assert evicted[:3] == [None, None, None]
+    assert [(sample.brightness, sample.epoch) for sample in evicted[3:]] == [(0, 1000), (1, 1001)]
+    assert len(buffer) == 3
+    assert _rows(buffer) == [(2, 20, 1002), (3, 30, 1003), (4, 40, 1004)]
+
+
+def test_views_follow_the_window_across_wraps():
+    buffer = SampleBuffer(4)
+    for index in range(11):
+        buffer.append(index, index + 0.5, index)
+        expected = list(range(max(0, index - 3), index + 1))
+        assert list(buffer.brightness_view()) == expected
+        assert list(buffer.lux_view()) == [value + 0.5 for value in expected]
+        assert list(buffer.epoch_view()) == expected
+
+
+def test_indexing_and_slicing():
+    buffer = SampleBuffer(5)
+    for index in range(7):
+        buffer.append(index, 100 + index, index)
+
+    assert buffer[0].brightness == 2
+    assert buffer[-1].brightness == 6
+    assert [sample.brightness for sample in buffer[-3:]] == [4, 5, 6]
+    brightness, lux, timestamp = buffer[-1]
+    assert (brightness, lux) == (6, 106)
+    assert timestamp == buffer[-1].timestamp
+    with pytest.raises(IndexError):
+        buffer[5]
+
+
+def test_values_are_stored_as_float32():
+    buffer = SampleBuffer(1)
+    buffer.append(0.1, 123.456, 1)
+    assert buffer[0].brightness == pytest.approx(0.1, rel=1e-7)
+    assert buffer[0].brightness != 0.1
+
+
+def test_clear_and_capacity():
+    buffer = SampleBuffer(2)
+    buffer.append(1, 1, 1)
+    buffer.clear()
+    assert not buffer
+    assert list(buffer.brightness_view()) == []
+    assert buffer.append(2, 2, 2) is None
+
+    with pytest.raises(ValueError):
+        SampleBuffer(0)
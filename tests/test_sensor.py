@@ -0,0 +1,76 @@
+"""Sensor state writes."""
+from types import SimpleNamespace
+
+from custom_components.smart_lux_control.sensor import SmartLuxDiagnosticSensor, SmartLuxSensor
+
+
+class _Sensor(SmartLuxSensor):
+    """Sensor with settable value and attributes that counts state writes."""
+
+    value = 0.0
+    attributes: dict = {}
+    writes = 0
+
+    @property
+    def native_value(self):
+        return self.value
+
+    @property
+    def extra_state_attributes(self):
+        return dict(self.attributes)
+
+    def async_write_ha_state(self):
+        self.writes += 1
+
+
+class _DiagnosticSensor(SmartLuxDiagnosticSensor):
+    """Diagnostics entity with settable state and collected values."""
+
+    value = _Sensor.value
+    attributes = _Sensor.attributes
+    writes = 0
+    native_value = _Sensor.native_value
+    extra_state_attributes = _Sensor.extra_state_attributes
+    async_write_ha_state = _Sensor.async_write_ha_state
+
+
+def _sensor(cls, sensor_type, value, attributes):
+    if cls is _DiagnosticSensor:
+        sensor = cls(SimpleNamespace(room_name="test"))
+    else:
+        sensor = cls(SimpleNamespace(room_name="test"), sensor_type)
+    sensor.value = value
+    sensor.attributes = attributes
+    sensor._written_value = sensor.native_value
+    sensor._written_attributes = sensor._stable_attributes(sensor.extra_state_attributes)
+    return sensor
+
+
+def test_value_below_threshold_is_not_written():
+    sensor = _sensor(_Sensor, "predicted_lux", 100.0, {})
+    sensor.value = 104.0
+    sensor._async_handle_update()
+    assert sensor.writes == 0
+    sensor.value = 105.0
+    sensor._async_handle_update()
+    assert sensor.writes == 1
+
+
+def test_volatile_attributes_do_not_trigger_writes():
+    sensor = _sensor(_Sensor, "predicted_lux", 100.0, {"raw_lux": 98.0, "estimate_std": 2.1, "lights_on_count": 2})
+    sensor.attributes = {"raw_lux": 101.5, "estimate_std": 1.9, "lights_on_count": 2}
+    sensor._async_handle_update()
+    assert sensor.writes == 0
+    sensor.attributes = {"raw_lux": 101.5, "estimate_std": 1.9, "lights_on_count": 3}
+    sensor._async_handle_update()
+    assert sensor.writes == 1
+
+
+def test_diagnostic_values_use_their_thresholds():
+    sensor = _sensor(_DiagnosticSensor, None, "active", {"regression_quality": 0.8, "sample_count": 40})
+    sensor.attributes = {"regression_quality": 0.805, "sample_count": 40}
+    sensor._async_handle_update()
+    assert sensor.writes == 0
+    sensor.attributes = {"regression_quality": 0.805, "sample_count": 41}
+    sensor._async_handle_update()
+    assert sensor.writes == 1
@@ -0,0 +1,59 @@
+"""Room resolution of the services."""
+import asyncio
+from types import SimpleNamespace
+
+from custom_components.smart_lux_control import _resolve_rooms, async_unload_entry
+from custom_components.smart_lux_control.const import DATA_ROOMS, DOMAIN
+
+
+class _Coordinator:
+    """Room coordinator stand-in."""
+
+    def __init__(self, room_name, entry_id, area_ids=()):
+        self.room_name = room_name
+        self.entry = SimpleNamespace(entry_id=entry_id)
+        self.area_ids = set(area_ids)
+        self.unloaded = False
+
+    async def async_unload(self):
+        self.unloaded = True
+
+
+def _hass(*coordinators):
+    async def _unload_platforms(entry, platforms):
+        return True
+
+    hass = SimpleNamespace(
+        data={DOMAIN: {}, DATA_ROOMS: {}},
+        config_entries=SimpleNamespace(async_unload_platforms=_unload_platforms),
+    )
+    for coordinator in coordinators:
+        hass.data[DOMAIN][coordinator.entry.entry_id] = coordinator
+        hass.data[DATA_ROOMS].setdefault(coordinator.room_name, {})[coordinator.entry.entry_id] = coordinator
+    return hass
+
+
+def _call(**data):
+    return SimpleNamespace(data=data)
+
+
+def test_room_names_resolve_to_every_entry_with_that_name():
+    first, second, other = _Coordinator("salon", "a"), _Coordinator("salon", "b"), _Coordinator("kuchnia", "c", {"k"})
+    hass = _hass(first, second, other)
+
+    assert _resolve_rooms(hass, _call(room_name="salon")) == ([first, second], [])
+    assert _resolve_rooms(hass, _call(room_name=["salon", "garaz"])) == ([first, second], ["garaz"])
+    assert _resolve_rooms(hass, _call(room_name="salon", area_id="k")) == ([first, second, other], [])
+    assert _resolve_rooms(hass, _call(room_name="all"))[0] == [first, second, other]
+
+
+def test_unloading_one_of_two_rooms_with_the_same_name_keeps_the_other():
+    first, second = _Coordinator("salon", "a"), _Coordinator("salon", "b")
+    hass = _hass(first, second)
+
+    assert asyncio.run(async_unload_entry(hass, first.entry))
+    assert first.unloaded
+    assert _resolve_rooms(hass, _call(room_name="salon")) == ([second], [])
+
+    assert asyncio.run(async_unload_entry(hass, second.entry))
+    assert hass.data[DATA_ROOMS] == {}
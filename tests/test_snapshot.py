@@ -0,0 +1,62 @@
+"""Room state snapshot."""
+import random
+
+from homeassistant.core import State
+
+from custom_components.smart_lux_control.snapshot import RoomSnapshot
+
+LIGHTS = ["light.a", "light.b", "light.c"]
+
+
+def _light(entity_id, state, brightness=None):
+    if state is None:
+        return None
+    attributes = {"brightness": brightness} if brightness is not None else {}
+    return State(entity_id, state, attributes)
+
+
+def _snapshot(lights, lux="120", motion="off"):
+    return RoomSnapshot.from_states(
+        LIGHTS, lights, State("sensor.lux", lux), State("binary_sensor.motion", motion), None
+    )
+
+
+def test_aggregates():
+    snapshot = _snapshot([_light("light.a", "on", 100), _light("light.b", "on"), _light("light.c", "off", 50)])
+
+    assert snapshot.lights_on == 2
+    assert snapshot.brightness_total == 100 + 255  # An on light without brightness counts as full
+    assert snapshot.average_brightness == (100 + 255) / 2
+    assert snapshot.average_reported_brightness == 100
+    assert snapshot.lights[2].brightness is None  # Off lights report no brightness
+
+
+def test_with_light_keeps_aggregates_equal_to_a_rebuild():
+    rng = random.Random(0)
+    states = {entity_id: None for entity_id in LIGHTS}
+    snapshot = _snapshot([None, None, None])
+    for _ in range(300):
+        entity_id = rng.choice(LIGHTS)
+        states[entity_id] = _light(
+            entity_id, rng.choice(["on", "off", "unavailable", None]), rng.choice([None, 1, 128, 255])
+        )
+        snapshot = snapshot.with_light(entity_id, states[entity_id])
+        assert snapshot == _snapshot([states[entity_id] for entity_id in LIGHTS])
+
+
+def test_unchanged_light_returns_the_same_snapshot():
+    snapshot = _snapshot([_light("light.a", "on", 80), None, None])
+    assert snapshot.with_light("light.a", _light("light.a", "on", 80)) is snapshot
+    assert snapshot.existing_lights == ("light.a",)
+
+
+def test_lux_and_motion():
+    assert _snapshot([None] * 3, lux="unavailable").lux is None
+    assert _snapshot([None] * 3, lux="dark").lux is None
+    snapshot = _snapshot([None] * 3, lux="12.5", motion="on")
+    assert snapshot.lux == 12.5
+    assert snapshot.motion_detected
+    assert snapshot.with_lux(State("sensor.lux", "30")).lux == 30.0
+    assert not snapshot.with_motion(State("binary_sensor.motion", "unavailable")).motion_detected
+    assert snapshot.with_motion(None).motion is None
+    assert _snapshot([None] * 3).average_brightness is None
@@ -0,0 +1,107 @@
+"""Target lux timeline."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.smart_lux_control.timeline import TargetLuxTimeline
+
+DAY, NIGHT = 400.0, 150.0
+BUFFER = 1800.0
+NEXT_RISING, NEXT_SETTING = 100000.0, 140000.0
+RISE, SET = NEXT_RISING - 86400, NEXT_SETTING - 86400  # Today's sun
+
+
+@pytest.fixture
+def sun():
+    return TargetLuxTimeline.from_sun(NEXT_RISING, NEXT_SETTING, BUFFER, DAY, NIGHT)
+
+
+def test_empty_timeline_is_rejected():
+    with pytest.raises(ValueError):
+        TargetLuxTimeline([])
+
+
+def test_constant_timeline():
+    timeline = TargetLuxTimeline.constant(60)
+    assert timeline.value_at(-1e9) == timeline.value_at(1e9) == 60
+    assert timeline.covers(0) and timeline.covers(1e12)
+    assert timeline.next_change(0, 60) is None
+
+
+def test_values_are_interpolated_between_knots_and_held_outside():
+    timeline = TargetLuxTimeline([(20, 300), (10, 100)])  # Knot order does not matter
+    assert timeline.value_at(0) == 100
+    assert timeline.value_at(10) == 100
+    assert timeline.value_at(15) == pytest.approx(200)
+    assert timeline.value_at(20) == 300
+    assert timeline.value_at(30) == 300
+
+
+def test_two_knots_at_the_same_time_are_a_step():
+    timeline = TargetLuxTimeline([(0, 100), (10, 100), (10, 300), (20, 300)])
+    assert timeline.value_at(9.999) == 100
+    assert timeline.value_at(10) == 300
+    assert timeline.next_change(5, 1) == 10
+    assert timeline.next_change(10, 1) is None
+
+
+def test_sun_ramps_up_after_sunrise_and_down_before_sunset(sun):
+    assert sun.value_at(RISE - 1) == NIGHT
+    assert sun.value_at(RISE + BUFFER / 2) == pytest.approx((DAY + NIGHT) / 2)
+    assert sun.value_at(RISE + BUFFER) == DAY
+    assert sun.value_at((RISE + SET) / 2) == DAY
+    assert sun.value_at(SET - BUFFER / 2) == pytest.approx((DAY + NIGHT) / 2)
+    assert sun.value_at(SET) == NIGHT
+    assert sun.value_at(NEXT_RISING + BUFFER) == DAY
+    assert sun.value_at(NEXT_SETTING + 1) == NIGHT
+
+
+def test_sun_after_sunset_only_covers_the_next_day():
+    # sun.sun reports next_setting before next_rising at night
+    timeline = TargetLuxTimeline.from_sun(NEXT_RISING, NEXT_RISING - 10000, BUFFER, DAY, NIGHT)
+    assert timeline.value_at(NEXT_RISING - 20000) == DAY
+    assert timeline.value_at(NEXT_RISING - 10000) == NIGHT
+    assert timeline.value_at(NEXT_RISING + BUFFER) == NIGHT
+
+
+def test_short_day_ramps_meet_in_the_middle():
+    timeline = TargetLuxTimeline.from_sun(NEXT_RISING, NEXT_RISING + 1000, BUFFER, DAY, NIGHT)
+    assert timeline.value_at(NEXT_RISING + 250) == pytest.approx((DAY + NIGHT) / 2)
+    assert timeline.value_at(NEXT_RISING + 500) == DAY
+    assert timeline.value_at(NEXT_RISING + 750) == pytest.approx((DAY + NIGHT) / 2)
+    assert timeline.value_at(NEXT_RISING + 1000) == NIGHT
+
+
+def test_next_change_follows_ramps_in_steps(sun):
+    assert sun.next_change(RISE + 100, 60) == RISE + 160
+    assert sun.next_change(RISE + BUFFER - 30, 60) == RISE + BUFFER  # Clamped to the knot
+    assert sun.next_change(SET - 100, 60) == SET - 40
+
+
+def test_next_change_skips_flat_knots(sun):
+    assert sun.next_change(RISE - 5000, 60) == RISE
+    assert sun.next_change(RISE + BUFFER, 60) == SET - BUFFER
+    assert sun.next_change(SET, 60) == NEXT_RISING
+    assert sun.next_change(NEXT_SETTING, 60) is None
+
+
+def test_hours_timeline_steps_at_six_and_eleven_and_expires_at_midnight():
+    now = datetime(2024, 6, 1, 12, 30, tzinfo=timezone.utc)
+    midnight = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    timeline = TargetLuxTimeline.from_hours(now, DAY, NIGHT)
+
+    def at(hours):
+        return (midnight + timedelta(hours=hours)).timestamp()
+
+    assert timeline.value_at(at(5.99)) == NIGHT
+    assert timeline.value_at(at(6)) == DAY
+    assert timeline.value_at(at(22.99)) == DAY
+    assert timeline.value_at(at(23)) == NIGHT
+    assert timeline.value_at(at(30)) == DAY
+    assert timeline.next_change(at(12), 60) == at(23)
+    assert timeline.next_change(at(23), 60) == at(30)
+
+    assert timeline.covers(at(0))
+    assert timeline.covers(at(23.99))
+    assert not timeline.covers(at(24))
+    assert not timeline.covers(at(-0.01))